@@ -0,0 +1,34 @@
+"""added full text search vectors
+
+Revision ID: 7c1e9a52d3f0
+Revises: 94152c297342
+Create Date: 2026-10-19 10:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1e9a52d3f0'
+down_revision: Union[str, None] = '94152c297342'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('interviews', sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed("setweight(to_tsvector('english', coalesce(skills, '')), 'A') || setweight(to_tsvector('english', coalesce(resume_text, '')), 'B') || setweight(to_tsvector('english', coalesce(feedback, '')), 'C')", persisted=True), nullable=True))
+    op.create_index('ix_interviews_search_vector', 'interviews', ['search_vector'], unique=False, postgresql_using='gin')
+    op.add_column('interview_question_and_responses', sa.Column('answer_search_vector', postgresql.TSVECTOR(), sa.Computed("to_tsvector('english', coalesce(answer, ''))", persisted=True), nullable=True))
+    op.create_index('ix_interview_question_and_responses_answer_search_vector', 'interview_question_and_responses', ['answer_search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_interview_question_and_responses_answer_search_vector', table_name='interview_question_and_responses', postgresql_using='gin')
+    op.drop_column('interview_question_and_responses', 'answer_search_vector')
+    op.drop_index('ix_interviews_search_vector', table_name='interviews', postgresql_using='gin')
+    op.drop_column('interviews', 'search_vector')
@@ -8,6 +8,12 @@ class Settings:
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(
         os.getenv("ACCESS_TOKEN_EXPIRATION_MINUTES", "3")
     )
+    # Verified tokens whose claims are kept, so repeat requests skip the
+    # signature check. 0 to verify every request.
+    AUTH_CLAIMS_CACHE_SIZE: int = int(os.getenv("AUTH_CLAIMS_CACHE_SIZE", "10000"))
+    AUTH_JOB_IDS_CACHE_SIZE: int = int(os.getenv("AUTH_JOB_IDS_CACHE_SIZE", "10000"))
+    # Sent as X-Operator-Key to read platform-wide stats. Unset disables them.
+    OPERATOR_API_KEY: str = os.getenv("OPERATOR_API_KEY", "")
     CORS_ORIGINS: list = os.getenv(
         "CORS_ORIGINS",
         "http://localhost:8080,http://localhost:5173,http://127.0.0.1:8080,http://127.0.0.1:5173",
@@ -18,7 +24,86 @@ class Settings:
 
     # OpenAI Settings
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
+    OPENAI_MAX_RETRIES: int = int(os.getenv("OPENAI_MAX_RETRIES", "2"))
+    LLM_LEDGER_FLUSH_INTERVAL_SECONDS: float = float(
+        os.getenv("LLM_LEDGER_FLUSH_INTERVAL_SECONDS", "5")
+    )
+    LLM_LEDGER_BATCH_SIZE: int = int(os.getenv("LLM_LEDGER_BATCH_SIZE", "100"))
+    # fermion (remote batch API) or local (rlimited subprocesses on this host)
+    CODE_EXECUTION_BACKEND: str = os.getenv("CODE_EXECUTION_BACKEND", "fermion")
+    CODE_EXECUTION_FALLBACK_TO_LOCAL: bool = (
+        os.getenv("CODE_EXECUTION_FALLBACK_TO_LOCAL", "false").lower() == "true"
+    )
+    DSA_RESULT_BATCH_WINDOW_MS: float = float(
+        os.getenv("DSA_RESULT_BATCH_WINDOW_MS", "10")
+    )
+    DSA_RESULT_BATCH_SIZE: int = int(os.getenv("DSA_RESULT_BATCH_SIZE", "200"))
+    # Batched execution callbacks must be signed with this (HMAC-SHA256 of the
+    # body, hex, in X-Callback-Signature). Unset rejects them all.
+    DSA_CALLBACK_SECRET: str = os.getenv("DSA_CALLBACK_SECRET", "")
+    DSA_STORED_OUTPUT_MAX_CHARS: int = int(
+        os.getenv("DSA_STORED_OUTPUT_MAX_CHARS", "16384")
+    )
+    DSA_RUN_FIRST_WAVE_SIZE: int = int(os.getenv("DSA_RUN_FIRST_WAVE_SIZE", "2"))
+    LOCAL_EXECUTION_CONCURRENCY: int = int(
+        os.getenv("LOCAL_EXECUTION_CONCURRENCY", "0")
+    )
+    # Local runs use the unprivileged uids from here up, one per concurrent run
+    LOCAL_EXECUTION_UID_BASE: int = int(
+        os.getenv("LOCAL_EXECUTION_UID_BASE", "61000")
+    )
+    # Development only: run candidate code locally even when it cannot be
+    # sandboxed (API not running as root)
+    LOCAL_EXECUTION_ALLOW_UNSANDBOXED: bool = (
+        os.getenv("LOCAL_EXECUTION_ALLOW_UNSANDBOXED", "false").lower() == "true"
+    )
     FERMION_API_KEY: str = os.getenv("FERMION_API_KEY", "")
+    FERMION_API_URL: str = os.getenv(
+        "FERMION_API_URL", "https://backend.codedamn.com/api/public"
+    )
+    FERMION_HTTP_POOL_SIZE: int = int(os.getenv("FERMION_HTTP_POOL_SIZE", "100"))
+    FERMION_HTTP_TIMEOUT_SECONDS: float = float(
+        os.getenv("FERMION_HTTP_TIMEOUT_SECONDS", "15")
+    )
+    FERMION_HTTP_MAX_RETRIES: int = int(os.getenv("FERMION_HTTP_MAX_RETRIES", "2"))
+    FERMION_CIRCUIT_FAILURE_THRESHOLD: int = int(
+        os.getenv("FERMION_CIRCUIT_FAILURE_THRESHOLD", "5")
+    )
+    FERMION_CIRCUIT_RESET_SECONDS: float = float(
+        os.getenv("FERMION_CIRCUIT_RESET_SECONDS", "30")
+    )
+    # local (files under STORAGE_LOCAL_ROOT) or s3 (any S3 compatible store)
+    STORAGE_BACKEND: str = os.getenv("STORAGE_BACKEND", "local")
+    STORAGE_LOCAL_ROOT: str = os.getenv("STORAGE_LOCAL_ROOT", "uploads")
+    # Recordings are assembled and transcoded here, then published to storage
+    RECORDING_SPOOL_DIR: str = os.getenv(
+        "RECORDING_SPOOL_DIR", os.path.join(STORAGE_LOCAL_ROOT, "interview_video")
+    )
+    S3_BUCKET: str = os.getenv("S3_BUCKET")
+    S3_ENDPOINT_URL: str = os.getenv("S3_ENDPOINT_URL")
+    S3_REGION: str = os.getenv("S3_REGION")
+    S3_ACCESS_KEY_ID: str = os.getenv("S3_ACCESS_KEY_ID")
+    S3_SECRET_ACCESS_KEY: str = os.getenv("S3_SECRET_ACCESS_KEY")
+    S3_PRESIGN_EXPIRY_SECONDS: int = int(os.getenv("S3_PRESIGN_EXPIRY_SECONDS", "3600"))
+    # Storage class archived media is copied into, such as GLACIER_IR
+    S3_ARCHIVE_STORAGE_CLASS: str = os.getenv(
+        "S3_ARCHIVE_STORAGE_CLASS", "STANDARD_IA"
+    )
+    # webp or jpeg
+    SCREENSHOT_FORMAT: str = os.getenv("SCREENSHOT_FORMAT", "webp")
+    SCREENSHOT_QUALITY: int = int(os.getenv("SCREENSHOT_QUALITY", "60"))
+    SCREENSHOT_THUMBNAIL_WIDTH: int = int(os.getenv("SCREENSHOT_THUMBNAIL_WIDTH", "320"))
+    # Frames whose difference hashes differ in at most this many of 64 bits are
+    # treated as duplicates of the previous one
+    SCREENSHOT_DEDUP_DISTANCE: int = int(os.getenv("SCREENSHOT_DEDUP_DISTANCE", "4"))
+    UPLOAD_MAX_BODY_MB: float = float(os.getenv("UPLOAD_MAX_BODY_MB", "10"))
+    UPLOAD_MAX_RESUME_MB: float = float(os.getenv("UPLOAD_MAX_RESUME_MB", "10"))
+    UPLOAD_MAX_IMAGE_MB: float = float(os.getenv("UPLOAD_MAX_IMAGE_MB", "10"))
+    # Whisper rejects files over 25 MB
+    UPLOAD_MAX_AUDIO_MB: float = float(os.getenv("UPLOAD_MAX_AUDIO_MB", "25"))
+    UPLOAD_MAX_VIDEO_CHUNK_MB: float = float(
+        os.getenv("UPLOAD_MAX_VIDEO_CHUNK_MB", "50")
+    )
     BREVO_API_KEY: str = os.getenv("BREVO_API_KEY")
     MAIL_SENDER_NAME: str = os.getenv("MAIL_SENDER_NAME")
     MAIL_SENDER_EMAIL: str = os.getenv("MAIL_SENDER_EMAIL")
@@ -27,5 +112,63 @@ class Settings:
         os.getenv("OTP_EXPIRY_DURATION_SECONDS", "300")
     )
 
+    # postgres (LISTEN/NOTIFY, safe across workers) or memory (single process)
+    PUBSUB_BACKEND: str = os.getenv("PUBSUB_BACKEND", "postgres")
+    WS_HEARTBEAT_INTERVAL_SECONDS: float = float(
+        os.getenv("WS_HEARTBEAT_INTERVAL_SECONDS", "15")
+    )
+    WS_HEARTBEAT_TIMEOUT_SECONDS: float = float(
+        os.getenv("WS_HEARTBEAT_TIMEOUT_SECONDS", "45")
+    )
+    WS_SEND_QUEUE_SIZE: int = int(os.getenv("WS_SEND_QUEUE_SIZE", "64"))
+    WS_SEND_TIMEOUT_SECONDS: float = float(os.getenv("WS_SEND_TIMEOUT_SECONDS", "5"))
+    # ffmpeg processes run at once per worker, 0 for one per core
+    TRANSCODE_WORKERS: int = int(os.getenv("TRANSCODE_WORKERS", "0"))
+    TRANSCODE_MAX_ATTEMPTS: int = int(os.getenv("TRANSCODE_MAX_ATTEMPTS", "3"))
+    TRANSCODE_TIMEOUT_SECONDS: float = float(
+        os.getenv("TRANSCODE_TIMEOUT_SECONDS", "1800")
+    )
+    TRANSCODE_POLL_SECONDS: float = float(os.getenv("TRANSCODE_POLL_SECONDS", "5"))
+    # Recordings segmented live while they upload, 0 for one per core. Beyond
+    # this they are converted after the interview ends.
+    LIVE_TRANSCODE_MAX: int = int(os.getenv("LIVE_TRANSCODE_MAX", "0"))
+    LIVE_TRANSCODE_IDLE_SECONDS: float = float(
+        os.getenv("LIVE_TRANSCODE_IDLE_SECONDS", "10")
+    )
+
+    # Days interview media is kept for recruiters without their own policy,
+    # 0 to keep it forever
+    RETENTION_DEFAULT_VIDEO_DAYS: int = int(
+        os.getenv("RETENTION_DEFAULT_VIDEO_DAYS", "0")
+    )
+    RETENTION_DEFAULT_SCREENSHOT_DAYS: int = int(
+        os.getenv("RETENTION_DEFAULT_SCREENSHOT_DAYS", "0")
+    )
+    RETENTION_DEFAULT_RESUME_DAYS: int = int(
+        os.getenv("RETENTION_DEFAULT_RESUME_DAYS", "0")
+    )
+    RETENTION_DEFAULT_REPORT_DAYS: int = int(
+        os.getenv("RETENTION_DEFAULT_REPORT_DAYS", "0")
+    )
+    # delete, or archive (moved under archive/ on storage)
+    RETENTION_DEFAULT_ACTION: str = os.getenv("RETENTION_DEFAULT_ACTION", "delete")
+    RETENTION_INTERVAL_SECONDS: float = float(
+        os.getenv("RETENTION_INTERVAL_SECONDS", "600")
+    )
+    RETENTION_BATCH_SIZE: int = int(os.getenv("RETENTION_BATCH_SIZE", "200"))
+    MEDIA_DELETION_MAX_ATTEMPTS: int = int(
+        os.getenv("MEDIA_DELETION_MAX_ATTEMPTS", "5")
+    )
+    # A failed deletion waits this long before its second attempt, doubling
+    # after every further failure
+    MEDIA_DELETION_RETRY_SECONDS: float = float(
+        os.getenv("MEDIA_DELETION_RETRY_SECONDS", "60")
+    )
+
+    QUESTION_POOL_SIZE: int = int(os.getenv("QUESTION_POOL_SIZE", "24"))
+    QUESTION_POOL_DEBOUNCE_SECONDS: float = float(
+        os.getenv("QUESTION_POOL_DEBOUNCE_SECONDS", "5")
+    )
+
 
 settings = Settings()
@@ -0,0 +1,13 @@
+from app.config import settings
+from app.lib.http_client import PooledHTTPClient
+
+client = PooledHTTPClient(
+    "Code execution service",
+    settings.FERMION_API_URL,
+    headers={"FERMION-API-KEY": settings.FERMION_API_KEY},
+    pool_size=settings.FERMION_HTTP_POOL_SIZE,
+    total_timeout=settings.FERMION_HTTP_TIMEOUT_SECONDS,
+    max_retries=settings.FERMION_HTTP_MAX_RETRIES,
+    failure_threshold=settings.FERMION_CIRCUIT_FAILURE_THRESHOLD,
+    reset_timeout=settings.FERMION_CIRCUIT_RESET_SECONDS,
+)
@@ -2,9 +2,14 @@ import httpx
 import openai
 
 from app.config import settings
+from app.lib.llm_ledger import InstrumentedOpenAI
 
 
-client = openai.AsyncOpenAI(
-    api_key=settings.OPENAI_API_KEY, http_client=httpx.AsyncClient()
+client = InstrumentedOpenAI(
+    openai.AsyncOpenAI(
+        api_key=settings.OPENAI_API_KEY,
+        http_client=httpx.AsyncClient(),
+        max_retries=0,
+    )
 )
 print("OpenAI client initialized successfully")
@@ -0,0 +1,13 @@
+from app.config import settings
+from app.database import engine
+from app.lib.connection_manager import InterviewConnectionManager
+from app.lib.pubsub import InMemoryBroker, PostgresBroker
+
+if settings.PUBSUB_BACKEND == "memory":
+    broker = InMemoryBroker()
+else:
+    broker = PostgresBroker(
+        engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+    )
+
+interview_connection_manager = InterviewConnectionManager(broker)
@@ -0,0 +1,15 @@
+from app.config import settings
+from app.lib.storage import LocalStorage, S3Storage
+
+if settings.STORAGE_BACKEND == "s3":
+    storage = S3Storage(
+        settings.S3_BUCKET,
+        f"{settings.URL}/uploads",
+        endpoint_url=settings.S3_ENDPOINT_URL,
+        region=settings.S3_REGION,
+        access_key_id=settings.S3_ACCESS_KEY_ID,
+        secret_access_key=settings.S3_SECRET_ACCESS_KEY,
+        archive_storage_class=settings.S3_ARCHIVE_STORAGE_CLASS,
+    )
+else:
+    storage = LocalStorage(settings.STORAGE_LOCAL_ROOT, f"{settings.URL}/uploads")
@@ -1,29 +1,135 @@
-from fastapi import Request, HTTPException
+import contextlib
+import hmac
+
+from fastapi import Depends, Request, HTTPException
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app import database
+from app.config import settings
+from app.lib.lru_cache import ClaimsCache, LRUCache
 from app.lib.errors import CustomException
+from app.models import Job
 from app.utils import jwt
 
+FOREIGN_KEY_VIOLATION = "23503"
 
-def authorize_recruiter(request: Request):
-    try:
-        authorization_header = request.headers.get("authorization")
-        if not authorization_header:
+claims_cache = ClaimsCache(settings.AUTH_CLAIMS_CACHE_SIZE)
+# Recruiter id to the ids of their jobs. A job never changes owner and ids
+# are not reused, so an entry can only be missing jobs created since, or
+# still list deleted ones.
+job_ids_cache = LRUCache(settings.AUTH_JOB_IDS_CACHE_SIZE)
+
+
+def _claims(request: Request):
+    """Claims of the request's bearer token, verified once per token."""
+    authorization_header = request.headers.get("authorization")
+    if not authorization_header or not authorization_header.startswith("Bearer "):
+        raise CustomException(code=401, message="Unauthorized")
+    token = authorization_header[len("Bearer ") :]
+
+    claims = claims_cache.get(token)
+    if claims is None:
+        try:
+            claims = jwt.decode(token)
+        except jwt.exceptions.ExpiredSignatureError:
+            raise CustomException("Authentication token expired", code=401)
+        except jwt.exceptions.InvalidTokenError:
             raise CustomException(code=401, message="Unauthorized")
-        token = authorization_header.split("Bearer ")[1]
-        decoded_data = jwt.decode(token)
+        claims_cache.put(token, claims)
+    return claims
 
-        return decoded_data["id"]
-    except jwt.exceptions.ExpiredSignatureError:
-        raise CustomException("Authentication token expired", code=401)
+
+def authorize_recruiter(request: Request):
+    claims = _claims(request)
+    if "id" not in claims:
+        raise CustomException(code=401, message="Unauthorized")
+    return claims["id"]
 
 
 def authorize_candidate(request: Request):
-    try:
-        authorization_header = request.headers.get("authorization")
-        if not authorization_header:
-            raise CustomException(code=401, message="Unauthorized")
-        token = authorization_header.split("Bearer ")[1]
-        decoded_data = jwt.decode(token)
+    claims = _claims(request)
+    if "interview_id" not in claims:
+        raise CustomException(code=401, message="Unauthorized")
+    return claims["interview_id"]
+
+
+def authorize_operator(request: Request):
+    """Platform operators, who may read stats across every customer."""
+    if not settings.OPERATOR_API_KEY:
+        raise CustomException(code=403, message="Forbidden")
+    key = request.headers.get("x-operator-key", "")
+    if not hmac.compare_digest(key, settings.OPERATOR_API_KEY):
+        raise CustomException(code=401, message="Unauthorized")
+
+
+class RecruiterPrincipal:
+    """The recruiter making a request, with the ids of the jobs they own.
+
+    Job ids are shared between requests through `job_ids_cache`, so most
+    ownership checks need no query. A job missing from the cached ids is
+    looked up again once, in case it was created since, possibly by another
+    process.
+    """
+
+    def __init__(self, id: int, db: Session):
+        self.id = id
+        self._db = db
+        self._job_ids = job_ids_cache.get(id)
+        self._loaded = False
+
+    @property
+    def job_ids(self) -> frozenset:
+        if self._job_ids is None:
+            self._load()
+        return self._job_ids
+
+    def _load(self):
+        stmt = select(Job.id).where(Job.company_id == self.id)
+        self._job_ids = frozenset(self._db.execute(stmt).scalars().all())
+        self._loaded = True
+        job_ids_cache.put(self.id, self._job_ids)
+
+    def owns_job(self, job_id) -> bool:
+        if job_id is None:
+            return False
+        job_id = int(job_id)
+        if job_id in self.job_ids:
+            return True
+        if not self._loaded:
+            self._load()
+        return job_id in self._job_ids
+
+    def require_job(self, job_id):
+        if not self.owns_job(job_id):
+            raise _job_not_found()
+
+    @contextlib.contextmanager
+    def writing_to_job(self, job_id):
+        """Check the job is owned, and answer 404 as well when the statements
+        run inside fail because it was deleted after its id was cached,
+        possibly by another process."""
+        self.require_job(job_id)
+        try:
+            yield
+        except IntegrityError as e:
+            if getattr(e.orig, "pgcode", None) != FOREIGN_KEY_VIOLATION:
+                raise
+            self._db.rollback()
+            job_ids_cache.delete(self.id)
+            raise _job_not_found()
+
+
+def _job_not_found():
+    return HTTPException(
+        status_code=404,
+        detail="Job not found or you don't have permission to access it",
+    )
+
 
-        return decoded_data["interview_id"]
-    except jwt.exceptions.ExpiredSignatureError:
-        raise CustomException("Authentication token expired", code=401)
+def authorize_recruiter_principal(
+    recruiter_id=Depends(authorize_recruiter),
+    db: Session = Depends(database.get_db),
+):
+    return RecruiterPrincipal(recruiter_id, db)
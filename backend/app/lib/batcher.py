@@ -0,0 +1,61 @@
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """Coalesces items that arrive close together into one call to `handler`.
+
+    `add` waits until the batch holding the item has been handled, and raises
+    if the handler failed. A batch is handled `window_seconds` after its first
+    item arrives, or as soon as it reaches `max_size` items.
+    """
+
+    def __init__(self, handler, window_seconds: float, max_size: int):
+        self.handler = handler
+        self.window_seconds = window_seconds
+        self.max_size = max_size
+        self._pending = []
+        self._timer = None
+        self._tasks = set()
+
+    async def add(self, item):
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(
+                self.window_seconds, self._flush
+            )
+        return await future
+
+    async def stop(self):
+        self._flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        task = asyncio.create_task(self._handle(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _handle(self, batch):
+        try:
+            await self.handler([item for item, _ in batch])
+        except Exception as e:
+            logger.error(f"Failed to handle batch of {len(batch)}: {e!r}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for _, future in batch:
+            if not future.done():
+                future.set_result(None)
@@ -0,0 +1,153 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Dict
+
+from fastapi import WebSocket
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class _Connection:
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self.queue = asyncio.Queue(maxsize=settings.WS_SEND_QUEUE_SIZE)
+        self.last_seen = time.monotonic()
+        self.sender: asyncio.Task = None
+
+
+class InterviewConnectionManager:
+    """Delivers events to candidates' WebSockets from any worker.
+
+    `send_data` publishes through the broker, and every worker delivers the
+    event to the sockets it holds for that interview. An interview may have
+    several sockets (one per tab). Each socket has its own bounded queue and
+    sender task, so a slow client never blocks the publisher. Sockets that
+    stop answering heartbeats, overflow their queue or time out on a send
+    are evicted.
+    """
+
+    def __init__(self, broker, channel: str = "interview_events"):
+        self.active_connections: Dict[int, Dict[WebSocket, _Connection]] = {}
+        self.broker = broker
+        self.channel = channel
+        self._heartbeat_task = None
+        broker.subscribe(channel, self._deliver)
+
+    async def start(self):
+        self._heartbeat_task = asyncio.create_task(self._heartbeat())
+
+    async def stop(self):
+        if self._heartbeat_task:
+            self._heartbeat_task.cancel()
+        for interview_id, connections in list(self.active_connections.items()):
+            for connection in list(connections.values()):
+                self._evict(interview_id, connection, code=1001)
+
+    async def connect(self, interview_id: int, websocket: WebSocket):
+        await websocket.accept()
+        connection = _Connection(websocket)
+        connection.sender = asyncio.create_task(
+            self._send_loop(interview_id, connection)
+        )
+        self.active_connections.setdefault(interview_id, {})[websocket] = connection
+
+    def disconnect(self, interview_id: int, websocket: WebSocket):
+        connections = self.active_connections.get(interview_id)
+        if not connections:
+            return
+        connection = connections.pop(websocket, None)
+        if not connections:
+            self.active_connections.pop(interview_id, None)
+        if connection and connection.sender is not asyncio.current_task():
+            connection.sender.cancel()
+
+    def touch(self, interview_id: int, websocket: WebSocket):
+        connection = self.active_connections.get(interview_id, {}).get(websocket)
+        if connection:
+            connection.last_seen = time.monotonic()
+
+    def send_local(self, interview_id: int, websocket: WebSocket, data):
+        connection = self.active_connections.get(interview_id, {}).get(websocket)
+        if connection:
+            self._enqueue(interview_id, connection, data)
+
+    async def send_data(self, interview_id: int, data):
+        await self.send_many(interview_id, [data])
+
+    async def send_many(self, interview_id: int, events: list):
+        """Publish several events for an interview in as few broker messages
+        as fit the broker's payload limit.
+
+        Events are grouped in order. An event over the limit on its own is
+        still published alone, for the broker to deliver the long way.
+        """
+        limit = self.broker.MAX_PAYLOAD_BYTES
+        envelope = len(json.dumps({"interview_id": interview_id, "events": []}))
+        batch, size = [], envelope
+        for event in events:
+            event_size = len(json.dumps(event, default=str).encode()) + 2
+            if batch and limit is not None and size + event_size > limit:
+                await self._publish(interview_id, batch)
+                batch, size = [], envelope
+            batch.append(event)
+            size += event_size
+        if batch:
+            await self._publish(interview_id, batch)
+
+    async def _publish(self, interview_id: int, events: list):
+        await self.broker.publish(
+            self.channel, {"interview_id": interview_id, "events": events}
+        )
+
+    async def _deliver(self, message):
+        interview_id = message["interview_id"]
+        for connection in list(self.active_connections.get(interview_id, {}).values()):
+            for data in message["events"]:
+                self._enqueue(interview_id, connection, data)
+
+    def _enqueue(self, interview_id: int, connection: _Connection, data):
+        try:
+            connection.queue.put_nowait(data)
+        except asyncio.QueueFull:
+            logger.warning(f"Send queue full for interview {interview_id}, evicting")
+            self._evict(interview_id, connection)
+
+    async def _send_loop(self, interview_id: int, connection: _Connection):
+        while True:
+            data = await connection.queue.get()
+            try:
+                await asyncio.wait_for(
+                    connection.websocket.send_json(data),
+                    timeout=settings.WS_SEND_TIMEOUT_SECONDS,
+                )
+            except Exception as e:
+                logger.warning(f"Send failed for interview {interview_id}: {e!r}")
+                self._evict(interview_id, connection)
+                return
+
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(settings.WS_HEARTBEAT_INTERVAL_SECONDS)
+            now = time.monotonic()
+            for interview_id, connections in list(self.active_connections.items()):
+                for connection in list(connections.values()):
+                    if now - connection.last_seen > settings.WS_HEARTBEAT_TIMEOUT_SECONDS:
+                        logger.info(f"Heartbeat timed out for interview {interview_id}")
+                        self._evict(interview_id, connection)
+                    else:
+                        self._enqueue(interview_id, connection, {"event": "ping"})
+
+    def _evict(self, interview_id: int, connection: _Connection, code: int = 1011):
+        self.disconnect(interview_id, connection.websocket)
+        asyncio.create_task(self._close(connection.websocket, code))
+
+    @staticmethod
+    async def _close(websocket: WebSocket, code: int):
+        try:
+            await websocket.close(code=code)
+        except Exception:
+            pass
@@ -0,0 +1,213 @@
+import asyncio
+import logging
+import time
+from collections import deque
+
+import aiohttp
+
+from app.lib.errors import CustomException
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUSES = {429, 502, 503, 504}
+# Responses that mean a request was turned away before it was acted on, so
+# even a request that is not idempotent can be sent again.
+REJECTED_STATUSES = {429}
+
+
+class CircuitBreaker:
+    """Stops calling a backend after repeated failures.
+
+    Opens after `failure_threshold` consecutive failures. Once
+    `reset_timeout` has passed a single trial call is let through, and its
+    outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self):
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def release(self):
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+
+class PooledHTTPClient:
+    """A long lived `aiohttp.ClientSession` for one upstream service.
+
+    Connections are kept alive and reused across requests, so only the first
+    call pays for the TCP and TLS handshake. `start` and `stop` are called
+    from the app lifespan.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        base_url: str,
+        headers: dict = None,
+        pool_size: int = 100,
+        keepalive_timeout: float = 60,
+        connect_timeout: float = 5,
+        total_timeout: float = 30,
+        max_retries: int = 2,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30,
+        latency_window: int = 1000,
+    ):
+        self.name = name
+        self.base_url = base_url.rstrip("/")
+        self.headers = headers or {}
+        self.pool_size = pool_size
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = aiohttp.ClientTimeout(
+            total=total_timeout, sock_connect=connect_timeout
+        )
+        self.max_retries = max_retries
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.session: aiohttp.ClientSession = None
+
+        self._latencies_ms = deque(maxlen=latency_window)
+        self._counts = {"requests": 0, "errors": 0, "retries": 0, "rejected": 0}
+
+    async def start(self):
+        connector = aiohttp.TCPConnector(
+            limit=self.pool_size,
+            keepalive_timeout=self.keepalive_timeout,
+            ttl_dns_cache=300,
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector, headers=self.headers, timeout=self.timeout
+        )
+
+    async def stop(self):
+        if self.session:
+            await self.session.close()
+            self.session = None
+
+    async def post_json(self, path: str, payload, idempotent: bool = False):
+        """POST `payload` as JSON and return the decoded response.
+
+        Unless the caller says the request is `idempotent`, it is only retried
+        when it cannot have reached the service: the connection could not be
+        opened, or the service rejected it outright. A timeout or a 502/504
+        may come after the service acted on it.
+        """
+        return await self._request("POST", path, idempotent, json=payload)
+
+    def _retryable(self, error: Exception, idempotent: bool):
+        if isinstance(error, aiohttp.ClientResponseError):
+            statuses = RETRYABLE_STATUSES if idempotent else REJECTED_STATUSES
+            return error.status in statuses
+        return idempotent or isinstance(error, aiohttp.ClientConnectorError)
+
+    async def _request(self, method: str, path: str, idempotent: bool, **kwargs):
+        if not self.breaker.allow():
+            self._counts["rejected"] += 1
+            raise CustomException(
+                f"{self.name} is temporarily unavailable, please try again shortly",
+                code=503,
+            )
+
+        if self.session is None:
+            await self.start()
+
+        retries = 0
+        while True:
+            started = time.perf_counter()
+            self._counts["requests"] += 1
+            try:
+                async with self.session.request(
+                    method, self.base_url + path, **kwargs
+                ) as response:
+                    if response.status in RETRYABLE_STATUSES:
+                        raise aiohttp.ClientResponseError(
+                            response.request_info,
+                            response.history,
+                            status=response.status,
+                        )
+                    response.raise_for_status()
+                    result = await response.json()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self._latencies_ms.append((time.perf_counter() - started) * 1000)
+                if self._retryable(e, idempotent) and retries < self.max_retries:
+                    retries += 1
+                    self._counts["retries"] += 1
+                    await asyncio.sleep(min(0.2 * 2**retries, 2))
+                    continue
+                self._counts["errors"] += 1
+                # A 4xx is an answer from a healthy service, only server and
+                # transport errors count towards opening the circuit.
+                if isinstance(e, aiohttp.ClientResponseError) and e.status < 500:
+                    self.breaker.record_success()
+                else:
+                    self.breaker.record_failure()
+                logger.error(f"{self.name} {method} {path} failed: {e!r}")
+                raise CustomException(
+                    f"{self.name} request failed, please try again", code=502
+                )
+            except asyncio.CancelledError:
+                self.breaker.release()
+                raise
+            except Exception:
+                self.breaker.record_failure()
+                raise
+
+            self._latencies_ms.append((time.perf_counter() - started) * 1000)
+            self.breaker.record_success()
+            return result
+
+    def stats(self):
+        latencies = sorted(self._latencies_ms)
+
+        def percentile(p):
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))], 2)
+
+        connector = self.session.connector if self.session else None
+        return {
+            "name": self.name,
+            "circuit": self.breaker.state,
+            **self._counts,
+            "latency_ms": {
+                "samples": len(latencies),
+                "p50": percentile(0.50),
+                "p95": percentile(0.95),
+                "p99": percentile(0.99),
+                "max": round(latencies[-1], 2) if latencies else None,
+            },
+            "pool": {
+                "limit": self.pool_size,
+                "in_use": len(getattr(connector, "_acquired", ())),
+            },
+        }
@@ -0,0 +1,48 @@
+import json
+
+
+class JSONArrayStreamParser:
+    """Incrementally parses a JSON array of objects as text chunks arrive.
+
+    `feed` returns every top-level object completed by the new chunk, so the
+    caller can act on the first element long before the array is closed.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._position = 0
+        self._depth = 0
+        self._start = None
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, text: str):
+        self._buffer += text
+        objects = []
+
+        while self._position < len(self._buffer):
+            char = self._buffer[self._position]
+            self._position += 1
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == "{":
+                if self._depth == 0:
+                    self._start = self._position - 1
+                self._depth += 1
+            elif char == "}" and self._depth > 0:
+                self._depth -= 1
+                if self._depth == 0:
+                    objects.append(json.loads(self._buffer[self._start : self._position]))
+                    self._buffer = self._buffer[self._position :]
+                    self._position = 0
+                    self._start = None
+
+        return objects
@@ -0,0 +1,249 @@
+import asyncio
+import logging
+import time
+from contextvars import ContextVar
+
+import openai
+from sqlalchemy import insert
+
+from app import database
+from app.config import settings
+from app.models import LLMCall
+
+logger = logging.getLogger(__name__)
+
+# Set per request by the middleware in main.py so calls can be grouped by route.
+current_route: ContextVar[str] = ContextVar("current_route", default=None)
+
+# USD per 1K tokens as (prompt, completion), matched by model name prefix.
+MODEL_PRICING = {
+    "gpt-4o-mini": (0.00015, 0.0006),
+    "gpt-4o": (0.0025, 0.01),
+    "gpt-4": (0.03, 0.06),
+    "gpt-3.5-turbo": (0.0005, 0.0015),
+}
+
+RETRYABLE_ERRORS = (
+    openai.APIConnectionError,
+    openai.RateLimitError,
+    openai.InternalServerError,
+)
+
+_buffer = []
+_flush_requested = asyncio.Event()
+
+
+def _cost(model, prompt_tokens, completion_tokens):
+    if not model or prompt_tokens is None:
+        return None
+    for prefix in sorted(MODEL_PRICING, key=len, reverse=True):
+        if model.startswith(prefix):
+            prompt_price, completion_price = MODEL_PRICING[prefix]
+            return (
+                prompt_tokens * prompt_price + (completion_tokens or 0) * completion_price
+            ) / 1000
+    return None
+
+
+def record(
+    model,
+    endpoint,
+    latency_ms,
+    outcome,
+    retries=0,
+    prompt_tokens=None,
+    completion_tokens=None,
+    error=None,
+):
+    _buffer.append(
+        {
+            "model": model,
+            "endpoint": endpoint,
+            "route": current_route.get(),
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "latency_ms": latency_ms,
+            "retries": retries,
+            "outcome": outcome,
+            "error": error,
+            "cost_usd": _cost(model, prompt_tokens, completion_tokens),
+        }
+    )
+    if len(_buffer) >= settings.LLM_LEDGER_BATCH_SIZE:
+        _flush_requested.set()
+
+
+def _write(calls):
+    db = database.SessionLocal()
+    try:
+        db.execute(insert(LLMCall).values(calls))
+        db.commit()
+    finally:
+        db.close()
+
+
+async def flush():
+    global _buffer
+    if not _buffer:
+        return
+    calls, _buffer = _buffer, []
+    try:
+        await asyncio.to_thread(_write, calls)
+    except Exception as e:
+        logger.error(f"Failed to flush {len(calls)} LLM ledger entries: {e}")
+
+
+async def run_flusher():
+    while True:
+        try:
+            await asyncio.wait_for(
+                _flush_requested.wait(),
+                timeout=settings.LLM_LEDGER_FLUSH_INTERVAL_SECONDS,
+            )
+        except asyncio.TimeoutError:
+            pass
+        _flush_requested.clear()
+        await flush()
+
+
+class _RecordedStreamingResponse:
+    def __init__(self, manager, model, endpoint):
+        self._manager = manager
+        self._model = model
+        self._endpoint = endpoint
+
+    async def __aenter__(self):
+        started = time.perf_counter()
+        try:
+            response = await self._manager.__aenter__()
+        except Exception as e:
+            record(
+                self._model,
+                self._endpoint,
+                (time.perf_counter() - started) * 1000,
+                "error",
+                error=type(e).__name__,
+            )
+            raise
+        record(
+            self._model,
+            self._endpoint,
+            (time.perf_counter() - started) * 1000,
+            "success",
+        )
+        return response
+
+    async def __aexit__(self, *exc_info):
+        return await self._manager.__aexit__(*exc_info)
+
+
+class _RecordedStream:
+    """Passes a streamed completion through and records the call once the
+    stream ends, with the usage reported in its final chunk."""
+
+    def __init__(self, stream, model, endpoint, retries, started):
+        self._stream = stream
+        self._model = model
+        self._endpoint = endpoint
+        self._retries = retries
+        self._started = started
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        usage = None
+        outcome, error = "success", None
+        try:
+            async for chunk in self._stream:
+                usage = getattr(chunk, "usage", None) or usage
+                yield chunk
+        except BaseException as e:
+            outcome, error = "error", type(e).__name__
+            raise
+        finally:
+            record(
+                self._model,
+                self._endpoint,
+                (time.perf_counter() - self._started) * 1000,
+                outcome,
+                retries=self._retries,
+                prompt_tokens=getattr(usage, "prompt_tokens", None),
+                completion_tokens=getattr(usage, "completion_tokens", None),
+                error=error,
+            )
+
+
+class InstrumentedOpenAI:
+    """Wraps an `openai.AsyncOpenAI` client and records every API call.
+
+    Attribute access is proxied, so call sites keep using
+    `client.chat.completions.create(...)`. Retries are done here rather than
+    inside the SDK so that they can be counted. Streamed completions ask for
+    usage in their final chunk and are recorded once fully read.
+    """
+
+    def __init__(self, target, path=()):
+        self._target = target
+        self._path = path
+
+    def __getattr__(self, name):
+        return InstrumentedOpenAI(getattr(self._target, name), self._path + (name,))
+
+    def __call__(self, *args, **kwargs):
+        endpoint = ".".join(self._path[:-1])
+        model = kwargs.get("model")
+        if "with_streaming_response" in self._path:
+            return _RecordedStreamingResponse(
+                self._target(*args, **kwargs), model, endpoint
+            )
+        return self._call(endpoint, model, args, kwargs)
+
+    async def _call(self, endpoint, model, args, kwargs):
+        streamed = bool(kwargs.get("stream")) and endpoint.endswith("completions")
+        if streamed:
+            kwargs["stream_options"] = {
+                **(kwargs.get("stream_options") or {}),
+                "include_usage": True,
+            }
+        retries = 0
+        started = time.perf_counter()
+        while True:
+            try:
+                result = await self._target(*args, **kwargs)
+                break
+            except RETRYABLE_ERRORS as e:
+                if retries < settings.OPENAI_MAX_RETRIES:
+                    retries += 1
+                    await asyncio.sleep(min(0.5 * 2**retries, 8))
+                    continue
+                error = e
+            except Exception as e:
+                error = e
+            record(
+                model,
+                endpoint,
+                (time.perf_counter() - started) * 1000,
+                "error",
+                retries=retries,
+                error=type(error).__name__,
+            )
+            raise error
+
+        if streamed:
+            return _RecordedStream(result, model, endpoint, retries, started)
+
+        usage = getattr(result, "usage", None)
+        record(
+            model,
+            endpoint,
+            (time.perf_counter() - started) * 1000,
+            "success",
+            retries=retries,
+            prompt_tokens=getattr(usage, "prompt_tokens", None),
+            completion_tokens=getattr(usage, "completion_tokens", None),
+        )
+        return result
@@ -0,0 +1,53 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """Thread safe mapping that keeps the `max_size` most recently used
+    entries. Sync dependencies run in the threadpool, hence the lock."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                return None
+            if self._expired(value):
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def _expired(self, value) -> bool:
+        return False
+
+
+class ClaimsCache(LRUCache):
+    """Verified token claims, keyed by the token itself.
+
+    A token's claims never change, so once its signature has been checked
+    they can be reused until it expires. Expired entries are dropped on
+    lookup, which sends the token back through full verification and so
+    gets the usual expiry error.
+    """
+
+    def _expired(self, value) -> bool:
+        return "exp" in value and value["exp"] <= time.time()
@@ -0,0 +1,114 @@
+import mimetypes
+import re
+from email.utils import formatdate
+
+from fastapi import HTTPException, Request, Response
+from fastapi.responses import FileResponse, RedirectResponse, StreamingResponse
+
+from app.config import settings
+from app.lib.storage import cache_control
+
+CONTENT_TYPES = {
+    ".m3u8": "application/vnd.apple.mpegurl",
+    ".ts": "video/mp2t",
+    ".webm": "video/webm",
+    ".webp": "image/webp",
+}
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def _parse_range(header: str, size: int):
+    """(start, end) for a single byte range, None to send the whole object.
+
+    Raises HTTPException 416 for ranges outside the object.
+    """
+    match = RANGE_PATTERN.match(header.strip()) if header else None
+    if not match or match.groups() == ("", ""):
+        return None
+    start, end = match.groups()
+    if start == "":
+        start, end = max(size - int(end), 0), size - 1
+    else:
+        start, end = int(start), min(int(end), size - 1) if end else size - 1
+    if start > end or start >= size:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"},
+        )
+    return start, end
+
+
+def _etag_matches(header: str, etag: str):
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return etag in (tag.strip().removeprefix("W/") for tag in header.split(","))
+
+
+async def serve(storage, key: str, request: Request, private: bool = False):
+    """Respond with a stored object.
+
+    Objects on S3 are served by redirecting to a presigned URL. Local files
+    are sent with ETag revalidation and single byte ranges, and whole files
+    go through FileResponse so servers that support it can send them without
+    copying. See `cache_control` for how long responses are cached.
+    """
+    url = await storage.presign(key, settings.S3_PRESIGN_EXPIRY_SECONDS)
+    if url:
+        # The redirect can be reused while the presigned URL is valid.
+        return RedirectResponse(
+            url,
+            headers={
+                "Cache-Control": (
+                    f"private, max-age={settings.S3_PRESIGN_EXPIRY_SECONDS // 2}"
+                )
+            },
+        )
+
+    try:
+        info = await storage.stat(key)
+    except ValueError:
+        info = None
+    if info is None:
+        raise HTTPException(status_code=404, detail="File not found")
+
+    extension = "." + key.rsplit(".", 1)[-1] if "." in key else ""
+    media_type = (
+        CONTENT_TYPES.get(extension)
+        or mimetypes.guess_type(key)[0]
+        or "application/octet-stream"
+    )
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": info.etag,
+        "Last-Modified": formatdate(info.modified, usegmt=True),
+        "Cache-Control": cache_control(key, private),
+    }
+    if _etag_matches(request.headers.get("if-none-match"), info.etag):
+        return Response(status_code=304, headers=headers)
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if if_range and if_range.strip() != info.etag:
+        range_header = None
+    byte_range = _parse_range(range_header, info.size)
+
+    if byte_range is None:
+        if info.path:
+            return FileResponse(info.path, media_type=media_type, headers=headers)
+        headers["Content-Length"] = str(info.size)
+        return StreamingResponse(
+            storage.stream(key), media_type=media_type, headers=headers
+        )
+
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{info.size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        storage.stream(key, start, end),
+        status_code=206,
+        media_type=media_type,
+        headers=headers,
+    )
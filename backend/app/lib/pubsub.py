@@ -0,0 +1,201 @@
+import asyncio
+import json
+import logging
+import re
+import threading
+from collections import defaultdict
+
+import psycopg2
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PATTERN = re.compile(r"^[a-z_][a-z0-9_]*$")
+
+
+class InMemoryBroker:
+    """Single process broker, for development and tests.
+
+    Only reaches subscribers in the same process, so it must not be used when
+    running more than one worker.
+    """
+
+    MAX_PAYLOAD_BYTES = None
+
+    def __init__(self):
+        self._handlers = defaultdict(list)
+
+    def subscribe(self, channel: str, handler):
+        self._handlers[channel].append(handler)
+
+    async def publish(self, channel: str, message: dict):
+        for handler in self._handlers.get(channel, []):
+            await handler(message)
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+
+class PostgresBroker:
+    """Broker over Postgres LISTEN/NOTIFY, shared by every worker and node.
+
+    Each process holds one dedicated LISTEN connection, watched by the event
+    loop, and one connection for NOTIFY.
+
+    NOTIFY payloads are limited to 8000 bytes by Postgres. Larger messages
+    are stored in pubsub_messages and only their id is notified, which each
+    listener reads the message back by. Stored messages are removed once
+    they are older than STORED_MESSAGE_TTL_SECONDS.
+    """
+
+    MAX_PAYLOAD_BYTES = 7900
+    RECONNECT_DELAY_SECONDS = 2
+    STORED_MESSAGE_TTL_SECONDS = 300
+
+    def __init__(self, dsn: str):
+        self._dsn = dsn
+        self._handlers = defaultdict(list)
+        self._tasks = set()
+        self._loop = None
+        self._listen_connection = None
+        self._publish_connection = None
+        self._publish_lock = threading.Lock()
+        self._stopped = False
+
+    def subscribe(self, channel: str, handler):
+        if not CHANNEL_PATTERN.match(channel):
+            raise ValueError(f"Invalid channel name: {channel}")
+        self._handlers[channel].append(handler)
+        if self._listen_connection:
+            with self._listen_connection.cursor() as cursor:
+                cursor.execute(f"LISTEN {channel}")
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._stopped = False
+        await asyncio.to_thread(self._connect_listener)
+        self._loop.add_reader(self._listen_connection.fileno(), self._on_readable)
+
+    async def stop(self):
+        self._stopped = True
+        if self._listen_connection:
+            self._loop.remove_reader(self._listen_connection.fileno())
+            self._listen_connection.close()
+            self._listen_connection = None
+        if self._publish_connection:
+            self._publish_connection.close()
+            self._publish_connection = None
+
+    async def publish(self, channel: str, message: dict):
+        payload = json.dumps(message, default=str)
+        if len(payload.encode()) > self.MAX_PAYLOAD_BYTES:
+            await asyncio.to_thread(self._notify_stored, channel, payload)
+            return
+        await asyncio.to_thread(self._notify, channel, payload)
+
+    def _connect_listener(self):
+        connection = psycopg2.connect(self._dsn)
+        connection.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+        with connection.cursor() as cursor:
+            for channel in self._handlers:
+                cursor.execute(f"LISTEN {channel}")
+        self._listen_connection = connection
+
+    def _execute(self, query: str, params):
+        """Run one query on the publish connection, reconnecting once if the
+        connection was lost. Returns the first row, if any."""
+        with self._publish_lock:
+            for attempt in range(2):
+                try:
+                    if not self._publish_connection or self._publish_connection.closed:
+                        self._publish_connection = psycopg2.connect(self._dsn)
+                        self._publish_connection.set_isolation_level(
+                            ISOLATION_LEVEL_AUTOCOMMIT
+                        )
+                    with self._publish_connection.cursor() as cursor:
+                        cursor.execute(query, params)
+                        return cursor.fetchone() if cursor.description else None
+                except psycopg2.OperationalError:
+                    self._publish_connection = None
+                    if attempt:
+                        raise
+
+    def _notify(self, channel: str, payload: str):
+        self._execute("SELECT pg_notify(%s, %s)", (channel, payload))
+
+    def _notify_stored(self, channel: str, payload: str):
+        # Storing and notifying in one statement means the NOTIFY is only
+        # sent once the row is visible to listeners.
+        self._execute(
+            """
+            WITH stored AS (
+                INSERT INTO pubsub_messages (channel, payload, created_at)
+                VALUES (%s, %s, now())
+                RETURNING id
+            ), expired AS (
+                DELETE FROM pubsub_messages
+                WHERE created_at < now() - make_interval(secs => %s)
+            )
+            SELECT pg_notify(%s, json_build_object('_stored_id', id)::text)
+            FROM stored
+            """,
+            (channel, payload, self.STORED_MESSAGE_TTL_SECONDS, channel),
+        )
+
+    def _load_stored(self, id: int):
+        row = self._execute("SELECT payload FROM pubsub_messages WHERE id = %s", (id,))
+        return json.loads(row[0]) if row else None
+
+    async def _dispatch_stored(self, channel: str, id: int):
+        try:
+            message = await asyncio.to_thread(self._load_stored, id)
+        except psycopg2.Error as e:
+            logger.error(f"Could not load stored message {id} for {channel}: {e}")
+            return
+        if message is None:
+            logger.error(f"Stored message {id} for {channel} has expired")
+            return
+        self._dispatch(channel, message)
+
+    def _on_readable(self):
+        try:
+            self._listen_connection.poll()
+        except psycopg2.OperationalError as e:
+            logger.error(f"Lost LISTEN connection: {e}")
+            self._loop.remove_reader(self._listen_connection.fileno())
+            self._listen_connection = None
+            self._spawn(self._reconnect())
+            return
+
+        while self._listen_connection.notifies:
+            notify = self._listen_connection.notifies.pop(0)
+            message = json.loads(notify.payload)
+            if "_stored_id" in message:
+                stored = self._dispatch_stored(notify.channel, message["_stored_id"])
+                self._spawn(stored)
+            else:
+                self._dispatch(notify.channel, message)
+
+    def _dispatch(self, channel: str, message: dict):
+        for handler in self._handlers.get(channel, []):
+            self._spawn(handler(message))
+
+    def _spawn(self, coroutine):
+        task = self._loop.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _reconnect(self):
+        while not self._stopped:
+            await asyncio.sleep(self.RECONNECT_DELAY_SECONDS)
+            try:
+                await asyncio.to_thread(self._connect_listener)
+            except psycopg2.OperationalError as e:
+                logger.error(f"Could not re-establish LISTEN connection: {e}")
+                continue
+            self._loop.add_reader(self._listen_connection.fileno(), self._on_readable)
+            logger.info("Re-established LISTEN connection")
+            return
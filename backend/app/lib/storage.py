@@ -0,0 +1,411 @@
+import asyncio
+import hashlib
+import os
+import re
+import shutil
+import uuid
+from dataclasses import dataclass
+from typing import AsyncIterator, List, Optional
+
+STREAM_BLOCK_BYTES = 256 * 1024
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+CONTENT_ADDRESSED_PATTERN = re.compile(r"/[0-9a-f]{32}\.[a-z0-9]+$")
+# Keys of assets that are not about anyone, such as quiz images. Everything
+# else belongs to a candidate.
+PUBLIC_PREFIXES = ("image/",)
+
+
+def content_key(directory: str, data: bytes, extension: str):
+    """Key named after a hash of `data`, so the object behind it never
+    changes and can be cached forever."""
+    return f"{directory}/{hashlib.sha256(data).hexdigest()[:32]}.{extension}"
+
+
+def is_content_addressed(key: str):
+    return bool(CONTENT_ADDRESSED_PATTERN.search(key))
+
+
+def cache_control(key: str, private: bool = False):
+    """Cache-Control to serve `key` with.
+
+    Content addressed public assets never change, so they are cached for a
+    year. Candidates' resumes, reports, screenshots and recordings are kept
+    out of shared caches and revalidated on every use, so they stop being
+    served once deleted. `private` is for responses that needed
+    authorization.
+    """
+    if not key.startswith(PUBLIC_PREFIXES):
+        return "private, no-cache"
+    scope = "private" if private else "public"
+    if is_content_addressed(key):
+        return IMMUTABLE_CACHE_CONTROL.replace("public", scope)
+    return f"{scope}, no-cache"
+
+
+@dataclass
+class ObjectInfo:
+    size: int
+    etag: str
+    modified: float
+    # Set when the object is a local file that can be sent as is.
+    path: str = None
+
+
+class Storage:
+    """Objects are addressed by keys such as "resume/12_report.pdf".
+
+    Every object has a stable URL under `base_url`, served by the media route,
+    which is what gets stored in the database.
+    """
+
+    name = None
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url
+
+    def url(self, key: str):
+        return f"{self.base_url}/{key}"
+
+    def key(self, url: str):
+        """Key for a stored URL, or for a path saved before storage backends
+        existed, which was relative to the uploads directory."""
+        for prefix in (f"{self.base_url}/", "uploads/"):
+            if url.startswith(prefix):
+                return url[len(prefix) :]
+        return url
+
+
+class LocalStorage(Storage):
+    """Stores objects as files under `root`, keyed by relative path.
+
+    Only one node sees the files unless `root` is on a shared volume.
+    """
+
+    name = "local"
+
+    def __init__(self, root: str, base_url: str):
+        super().__init__(base_url)
+        self.root = os.path.abspath(root)
+
+    def path(self, key: str):
+        path = os.path.abspath(os.path.join(self.root, key))
+        if not path.startswith(self.root + os.sep):
+            raise ValueError(f"Invalid storage key {key!r}")
+        return path
+
+    async def put(self, key: str, data, content_type: str = None):
+        """Store `data`, either bytes or a binary file object."""
+        await asyncio.to_thread(self._put, self.path(key), data)
+
+    def _put(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.part"
+        with open(tmp_path, "wb") as f:
+            if isinstance(data, (bytes, bytearray)):
+                f.write(data)
+            else:
+                shutil.copyfileobj(data, f)
+        os.replace(tmp_path, path)
+
+    async def put_file(self, key: str, file_path: str, content_type: str = None):
+        path = self.path(key)
+        if path == os.path.abspath(file_path):
+            return
+        with open(file_path, "rb") as f:
+            await asyncio.to_thread(self._put, path, f)
+
+    async def get(self, key: str) -> bytes:
+        def read():
+            with open(self.path(key), "rb") as f:
+                return f.read()
+
+        return await asyncio.to_thread(read)
+
+    async def stat(self, key: str) -> Optional[ObjectInfo]:
+        """None if there is no such object."""
+        path = self.path(key)
+        try:
+            result = await asyncio.to_thread(os.stat, path)
+        except FileNotFoundError:
+            return None
+        return ObjectInfo(
+            size=result.st_size,
+            etag=f'"{result.st_mtime_ns:x}-{result.st_size:x}"',
+            modified=result.st_mtime,
+            path=path,
+        )
+
+    async def size(self, key: str) -> Optional[int]:
+        """Size in bytes, or None if there is no such object."""
+        info = await self.stat(key)
+        return None if info is None else info.size
+
+    async def exists(self, key: str) -> bool:
+        return await self.size(key) is not None
+
+    async def stream(
+        self, key: str, start: int = 0, end: int = None
+    ) -> AsyncIterator[bytes]:
+        """Yield the bytes from `start` up to and including `end`."""
+        f = await asyncio.to_thread(open, self.path(key), "rb")
+        try:
+            await asyncio.to_thread(f.seek, start)
+            remaining = None if end is None else end - start + 1
+            while remaining is None or remaining > 0:
+                block_size = (
+                    STREAM_BLOCK_BYTES
+                    if remaining is None
+                    else min(STREAM_BLOCK_BYTES, remaining)
+                )
+                block = await asyncio.to_thread(f.read, block_size)
+                if not block:
+                    break
+                if remaining is not None:
+                    remaining -= len(block)
+                yield block
+        finally:
+            await asyncio.to_thread(f.close)
+
+    async def list(self, prefix: str) -> List[str]:
+        """Keys of the objects directly under the `prefix` directory."""
+
+        def listdir():
+            directory = self.path(prefix)
+            if not os.path.isdir(directory):
+                return []
+            return [
+                f"{prefix.rstrip('/')}/{name}"
+                for name in os.listdir(directory)
+                if os.path.isfile(os.path.join(directory, name))
+            ]
+
+        return await asyncio.to_thread(listdir)
+
+    async def delete(self, key: str):
+        try:
+            await asyncio.to_thread(os.remove, self.path(key))
+        except FileNotFoundError:
+            pass
+
+    async def delete_prefix(self, prefix: str):
+        await asyncio.to_thread(shutil.rmtree, self.path(prefix), True)
+
+    async def move(self, key: str, new_key: str):
+        """Rename an object, doing nothing if it does not exist."""
+        await self._move(self.path(key), self.path(new_key))
+
+    async def move_prefix(self, prefix: str, new_prefix: str):
+        await self._move(self.path(prefix), self.path(new_prefix))
+
+    async def _move(self, path: str, new_path: str):
+        def rename():
+            if not os.path.exists(path):
+                return
+            os.makedirs(os.path.dirname(new_path), exist_ok=True)
+            shutil.move(path, new_path)
+
+        await asyncio.to_thread(rename)
+
+    async def presign(self, key: str, expires_seconds: int) -> Optional[str]:
+        """Local files are served by the API itself."""
+        return None
+
+
+class S3Storage(Storage):
+    """Stores objects in an S3 compatible bucket, such as AWS S3 or MinIO.
+
+    boto3 is only imported when this backend is configured. Its client is
+    blocking, so every call runs in a worker thread. The media route redirects
+    to presigned URLs, so object bytes never pass through the API.
+    """
+
+    name = "s3"
+
+    def __init__(
+        self,
+        bucket: str,
+        base_url: str,
+        endpoint_url: str = None,
+        region: str = None,
+        access_key_id: str = None,
+        secret_access_key: str = None,
+        archive_storage_class: str = None,
+    ):
+        import boto3
+        from botocore.config import Config
+
+        super().__init__(base_url)
+        self.bucket = bucket
+        self.archive_storage_class = archive_storage_class
+        self._client = boto3.client(
+            "s3",
+            endpoint_url=endpoint_url or None,
+            region_name=region or None,
+            aws_access_key_id=access_key_id or None,
+            aws_secret_access_key=secret_access_key or None,
+            config=Config(
+                signature_version="s3v4",
+                s3={"addressing_style": "path" if endpoint_url else "auto"},
+                max_pool_connections=50,
+            ),
+        )
+
+    def _extra_args(self, key: str, content_type: str):
+        extra = {"CacheControl": cache_control(key)}
+        if content_type:
+            extra["ContentType"] = content_type
+        return extra
+
+    async def put(self, key: str, data, content_type: str = None):
+        extra = self._extra_args(key, content_type)
+        if isinstance(data, (bytes, bytearray)):
+            await asyncio.to_thread(
+                self._client.put_object,
+                Bucket=self.bucket,
+                Key=key,
+                Body=bytes(data),
+                **extra,
+            )
+        else:
+            await asyncio.to_thread(
+                self._client.upload_fileobj,
+                data,
+                self.bucket,
+                key,
+                ExtraArgs=extra or None,
+            )
+
+    async def put_file(self, key: str, file_path: str, content_type: str = None):
+        extra = self._extra_args(key, content_type)
+        await asyncio.to_thread(
+            self._client.upload_file,
+            file_path,
+            self.bucket,
+            key,
+            ExtraArgs=extra or None,
+        )
+
+    async def get(self, key: str) -> bytes:
+        def read():
+            response = self._client.get_object(Bucket=self.bucket, Key=key)
+            return response["Body"].read()
+
+        return await asyncio.to_thread(read)
+
+    async def stat(self, key: str) -> Optional[ObjectInfo]:
+        from botocore.exceptions import ClientError
+
+        try:
+            response = await asyncio.to_thread(
+                self._client.head_object, Bucket=self.bucket, Key=key
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+        return ObjectInfo(
+            size=response["ContentLength"],
+            etag=response["ETag"],
+            modified=response["LastModified"].timestamp(),
+        )
+
+    async def size(self, key: str) -> Optional[int]:
+        info = await self.stat(key)
+        return None if info is None else info.size
+
+    async def exists(self, key: str) -> bool:
+        return await self.size(key) is not None
+
+    async def stream(
+        self, key: str, start: int = 0, end: int = None
+    ) -> AsyncIterator[bytes]:
+        byte_range = f"bytes={start}-{'' if end is None else end}"
+        response = await asyncio.to_thread(
+            self._client.get_object, Bucket=self.bucket, Key=key, Range=byte_range
+        )
+        body = response["Body"]
+        try:
+            while block := await asyncio.to_thread(body.read, STREAM_BLOCK_BYTES):
+                yield block
+        finally:
+            body.close()
+
+    async def list(self, prefix: str) -> List[str]:
+        def list_keys():
+            keys = []
+            paginator = self._client.get_paginator("list_objects_v2")
+            for page in paginator.paginate(
+                Bucket=self.bucket, Prefix=f"{prefix.rstrip('/')}/", Delimiter="/"
+            ):
+                keys += [item["Key"] for item in page.get("Contents", [])]
+            return keys
+
+        return await asyncio.to_thread(list_keys)
+
+    async def delete(self, key: str):
+        await asyncio.to_thread(
+            self._client.delete_object, Bucket=self.bucket, Key=key
+        )
+
+    async def delete_prefix(self, prefix: str):
+        def delete_all():
+            paginator = self._client.get_paginator("list_objects_v2")
+            for page in paginator.paginate(
+                Bucket=self.bucket, Prefix=f"{prefix.rstrip('/')}/"
+            ):
+                objects = [{"Key": item["Key"]} for item in page.get("Contents", [])]
+                if objects:
+                    self._client.delete_objects(
+                        Bucket=self.bucket, Delete={"Objects": objects, "Quiet": True}
+                    )
+
+        await asyncio.to_thread(delete_all)
+
+    async def move(self, key: str, new_key: str):
+        """Copy to `new_key`, in the archive storage class when one is set,
+        then delete the original. Does nothing if it does not exist."""
+        from botocore.exceptions import ClientError
+
+        extra = {}
+        if self.archive_storage_class:
+            extra["StorageClass"] = self.archive_storage_class
+        try:
+            await asyncio.to_thread(
+                self._client.copy,
+                {"Bucket": self.bucket, "Key": key},
+                self.bucket,
+                new_key,
+                ExtraArgs=extra or None,
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                return
+            raise
+        await self.delete(key)
+
+    async def move_prefix(self, prefix: str, new_prefix: str):
+        def list_all():
+            keys = []
+            paginator = self._client.get_paginator("list_objects_v2")
+            for page in paginator.paginate(
+                Bucket=self.bucket, Prefix=f"{prefix.rstrip('/')}/"
+            ):
+                keys += [item["Key"] for item in page.get("Contents", [])]
+            return keys
+
+        prefix = prefix.rstrip("/")
+        for key in await asyncio.to_thread(list_all):
+            await self.move(key, new_prefix.rstrip("/") + key[len(prefix) :])
+
+    async def presign(self, key: str, expires_seconds: int) -> Optional[str]:
+        return await asyncio.to_thread(
+            self._client.generate_presigned_url,
+            "get_object",
+            # Overrides the header stored with objects put before it changed.
+            Params={
+                "Bucket": self.bucket,
+                "Key": key,
+                "ResponseCacheControl": cache_control(key),
+            },
+            ExpiresIn=expires_seconds,
+        )
@@ -0,0 +1,151 @@
+import re
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+
+# How much of a body is kept to find and check the start of the file in it.
+SNIFF_LIMIT_BYTES = 64 * 1024
+SNIFF_BYTES = 16
+
+MAGIC = {
+    "pdf": lambda head: head.startswith(b"%PDF-"),
+    "png": lambda head: head.startswith(b"\x89PNG\r\n\x1a\n"),
+    "jpeg": lambda head: head.startswith(b"\xff\xd8\xff"),
+    "webp": lambda head: head[:4] == b"RIFF" and head[8:12] == b"WEBP",
+    "webm": lambda head: head.startswith(b"\x1a\x45\xdf\xa3"),
+    "ogg": lambda head: head.startswith(b"OggS"),
+    "wav": lambda head: head[:4] == b"RIFF" and head[8:12] == b"WAVE",
+    "mp3": lambda head: head.startswith(b"ID3")
+    or (len(head) > 1 and head[0] == 0xFF and head[1] & 0xE0 == 0xE0),
+    "mp4": lambda head: head[4:8] == b"ftyp",
+}
+BOUNDARY_PATTERN = re.compile(r'boundary="?([^";]+)"?')
+FILENAME_PATTERN = re.compile(rb'filename="[^"]+"')
+FORM_CONTENT_TYPES = ("application/x-www-form-urlencoded", "application/json")
+
+
+@dataclass
+class UploadRule:
+    max_bytes: int
+    # Accepted file types, as keys of MAGIC. Empty to accept anything.
+    kinds: Tuple[str, ...] = ()
+
+
+class _BodyGuard:
+    """Counts body bytes as they are received and checks the first bytes of
+    the uploaded file, either the raw body or the first file part of a
+    multipart form."""
+
+    def __init__(self, rule: UploadRule, boundary: bytes = None):
+        self.rule = rule
+        self.boundary = boundary
+        self.size = 0
+        self.head = bytearray()
+        self.sniffed = not rule.kinds
+
+    def feed(self, data: bytes, more_body: bool):
+        self.size += len(data)
+        if self.size > self.rule.max_bytes:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Upload is larger than {self.rule.max_bytes} bytes",
+            )
+        if self.sniffed:
+            return
+        self.head += data[: SNIFF_LIMIT_BYTES - len(self.head)]
+        complete = not more_body or len(self.head) >= SNIFF_LIMIT_BYTES
+        file_head = self._file_head(complete)
+        if file_head is None:
+            # No file in the part of the body that is checked.
+            self.sniffed = complete
+            return
+        self.sniffed = True
+        if file_head and not any(MAGIC[kind](file_head) for kind in self.rule.kinds):
+            raise HTTPException(
+                status_code=415,
+                detail=f"Unsupported file type, expected {', '.join(self.rule.kinds)}",
+            )
+
+    def _file_head(self, complete: bool):
+        """The first bytes of the file, or None while they are not known."""
+        if self.boundary is None:
+            if len(self.head) >= SNIFF_BYTES or complete:
+                return bytes(self.head[:SNIFF_BYTES])
+            return None
+
+        position = 0
+        while True:
+            start = self.head.find(b"--" + self.boundary, position)
+            end = self.head.find(b"\r\n\r\n", start) if start != -1 else -1
+            if end == -1:
+                return None
+            if FILENAME_PATTERN.search(self.head, start, end):
+                content = self.head[end + 4 : end + 4 + SNIFF_BYTES]
+                if len(content) < SNIFF_BYTES and not complete:
+                    return None
+                # An empty file field ends straight away with the boundary.
+                if content.startswith(b"\r\n--" + self.boundary[:8]):
+                    return b""
+                return bytes(content)
+            position = end + 4
+
+
+class UploadGuardMiddleware:
+    """Enforces per endpoint body size limits and file types while the body
+    streams in, before it is buffered or spooled anywhere.
+
+    Bodies with a larger Content-Length are refused without being read. Others
+    are counted as they are received and the request fails with 413 as soon
+    as the limit is passed, or 415 once the start of the file shows it is not
+    one of the accepted types.
+    """
+
+    def __init__(
+        self, app, rules: Dict[Tuple[str, str], UploadRule], default_max_bytes: int
+    ):
+        self.app = app
+        self.rules = rules
+        self.default_rule = UploadRule(default_max_bytes)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        rule = self.rules.get((scope["method"], scope["path"]), self.default_rule)
+        headers = dict(scope["headers"])
+        content_length = headers.get(b"content-length")
+        if content_length and content_length.isdigit():
+            if int(content_length) > rule.max_bytes:
+                response = JSONResponse(
+                    status_code=413,
+                    content={
+                        "detail": f"Upload is larger than {rule.max_bytes} bytes"
+                    },
+                )
+                await response(scope, receive, send)
+                return
+
+        boundary = None
+        content_type = headers.get(b"content-type", b"").decode("latin-1")
+        if content_type.startswith("multipart/form-data"):
+            match = BOUNDARY_PATTERN.search(content_type)
+            if match:
+                boundary = match.group(1).encode("latin-1")
+            else:
+                # Not parseable as a form either; leave that to the route.
+                rule = UploadRule(rule.max_bytes)
+        elif content_type.startswith(FORM_CONTENT_TYPES):
+            # Plain form fields or JSON, with no file in them.
+            rule = UploadRule(rule.max_bytes)
+        guard = _BodyGuard(rule, boundary)
+
+        async def guarded_receive():
+            message = await receive()
+            if message["type"] == "http.request":
+                guard.feed(message.get("body", b""), message.get("more_body", False))
+            return message
+
+        await self.app(scope, guarded_receive, send)
@@ -1,16 +1,18 @@
+import asyncio
+from contextlib import asynccontextmanager
 import logging
 from os import path
 from pathlib import Path
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-from fastapi.staticfiles import StaticFiles
 import openai
 from sqlalchemy.exc import SQLAlchemyError
 from dotenv import load_dotenv
 from sqlalchemy.exc import IntegrityError
 
 from app.lib.errors import CustomException
+from app.lib.upload_guard import UploadGuardMiddleware, UploadRule
 
 load_dotenv()
 
@@ -28,18 +30,72 @@ if not openai.api_key:
     raise ValueError("OPENAI_API_KEY environment variable is not set")
 
 from .database import engine, Base
+from app.configs import fermion, pubsub
+from app.lib import llm_ledger
+from app.services import code_execution, retention, transcoding
 
 Base.metadata.create_all(bind=engine)
 
 UPLOAD_DIR = Path("uploads")
 UPLOAD_DIR.mkdir(exist_ok=True)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    ledger_flusher = asyncio.create_task(llm_ledger.run_flusher())
+    await pubsub.broker.start()
+    await fermion.client.start()
+    await pubsub.interview_connection_manager.start()
+    await transcoding.worker_pool.start()
+    retention_runner = asyncio.create_task(retention.run_retention())
+    yield
+    retention_runner.cancel()
+    await transcoding.live_transcoder.stop()
+    await transcoding.worker_pool.stop()
+    await code_execution.result_batcher.stop()
+    await pubsub.interview_connection_manager.stop()
+    await fermion.client.stop()
+    await pubsub.broker.stop()
+    ledger_flusher.cancel()
+    await llm_ledger.flush()
+
+
 app = FastAPI(
     title="EduDiagnoAI API",
     description="API for EduDiagnoAI, an AI-powered interview platform",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
+MB = 1024 * 1024
+IMAGE_KINDS = ("png", "jpeg", "webp")
+app.add_middleware(
+    UploadGuardMiddleware,
+    rules={
+        ("POST", "/api/resume/parse"): UploadRule(
+            int(settings.UPLOAD_MAX_RESUME_MB * MB), ("pdf",)
+        ),
+        ("PUT", "/api/interview/upload-resume"): UploadRule(
+            int(settings.UPLOAD_MAX_RESUME_MB * MB), ("pdf",)
+        ),
+        ("POST", "/api/audio/to-text"): UploadRule(
+            int(settings.UPLOAD_MAX_AUDIO_MB * MB),
+            ("webm", "ogg", "wav", "mp3", "mp4"),
+        ),
+        ("POST", "/api/interview/screenshot"): UploadRule(
+            int(settings.UPLOAD_MAX_IMAGE_MB * MB), IMAGE_KINDS
+        ),
+        ("POST", "/api/quiz-question"): UploadRule(
+            int(settings.UPLOAD_MAX_IMAGE_MB * MB), IMAGE_KINDS
+        ),
+        # Only the first chunk of a recording starts with a WebM header.
+        ("POST", "/api/interview/record"): UploadRule(
+            int(settings.UPLOAD_MAX_VIDEO_CHUNK_MB * MB)
+        ),
+    },
+    default_max_bytes=int(settings.UPLOAD_MAX_BODY_MB * MB),
+)
+# Added last so it wraps the upload guard and its errors still get CORS headers.
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.CORS_ORIGINS,
@@ -51,7 +107,10 @@ app.add_middleware(
 )
 
 
-app.mount("/api/uploads", StaticFiles(directory="uploads"), name="uploads")
+@app.middleware("http")
+async def set_current_route(request: Request, call_next):
+    llm_ledger.current_route.set(request.url.path)
+    return await call_next(request)
 
 
 @app.exception_handler(SQLAlchemyError)
@@ -104,6 +163,8 @@ from app.routes import (
     recruiter,
     job,
     interview,
+    llm_call,
+    media,
     resume,
     state,
     text,
@@ -142,6 +203,8 @@ app.include_router(
 app.include_router(country.router, prefix="/api/country", tags=["Country"])
 app.include_router(state.router, prefix="/api/state", tags=["State"])
 app.include_router(city.router, prefix="/api/city", tags=["City"])
+app.include_router(llm_call.router, prefix="/api/llm-call", tags=["LLM Call"])
+app.include_router(media.router, prefix="/api/uploads", tags=["Media"])
 
 
 @app.get("/api", tags=["Health"])
@@ -1,14 +1,21 @@
 from sqlalchemy import (
+    JSON,
+    BigInteger,
     Boolean,
     Column,
+    Computed,
     DateTime,
+    Float,
     ForeignKey,
+    Index,
     Integer,
+    LargeBinary,
     String,
     func,
     UniqueConstraint,
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 from .database import Base
 
 
@@ -86,6 +93,7 @@ class Job(Base):
         back_populates="job",
     )
     interview_questions = relationship("InterviewQuestion", back_populates="job")
+    question_pool = relationship("InterviewQuestionPool", back_populates="job")
 
 
 class InterviewQuestion(Base):
@@ -110,6 +118,27 @@ class InterviewQuestion(Base):
     responses = relationship("InterviewQuestionResponse", back_populates="question")
 
 
+class InterviewQuestionPool(Base):
+    __tablename__ = "interview_question_pools"
+
+    id = Column(Integer, primary_key=True)
+    question = Column(String, nullable=False)
+    question_type = Column(String, nullable=False)
+    # The custom question this entry is, or is a variant of
+    interview_question_id = Column(
+        Integer, ForeignKey("interview_questions.id", ondelete="CASCADE")
+    )
+    created_at = Column(DateTime, default=func.now())
+    job_id = Column(
+        Integer,
+        ForeignKey("jobs.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+
+    job = relationship("Job", back_populates="question_pool")
+
+
 class InterviewQuestionResponse(Base):
     __tablename__ = "interview_question_responses"
 
@@ -199,6 +228,7 @@ class DSATestCase(Base):
     id = Column(Integer, primary_key=True)
     input = Column(String)
     expected_output = Column(String)
+    revision = Column(Integer, default=1, server_default="1", nullable=False)
     dsa_question_id = Column(
         Integer, ForeignKey("dsa_questions.id", ondelete="CASCADE")
     )
@@ -212,7 +242,10 @@ class DSATestCase(Base):
 
 class Interview(Base):
     __tablename__ = "interviews"
-    __table_args__ = (UniqueConstraint("email", "job_id", name="uq_email_job"),)
+    __table_args__ = (
+        UniqueConstraint("email", "job_id", name="uq_email_job"),
+        Index("ix_interviews_search_vector", "search_vector", postgresql_using="gin"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     status = Column(String, default="incomplete")  # incomplete, completed
@@ -240,6 +273,29 @@ class Interview(Base):
     cultural_fit_score = Column(Integer)
     feedback = Column(String)
     report_file_url = Column(String)
+    # Set once the whole question set is saved. Questions without it are
+    # from a generation that was cut off.
+    questions_generated_at = Column(DateTime)
+    # When the current resume and report were stored, which their retention
+    # counts from.
+    resume_uploaded_at = Column(DateTime)
+    report_generated_at = Column(DateTime)
+    # Set for interviews whose screenshots may predate the screenshots table,
+    # and so only be on storage.
+    legacy_screenshots = Column(
+        Boolean, default=False, server_default="false", nullable=False
+    )
+    search_vector = deferred(
+        Column(
+            TSVECTOR,
+            Computed(
+                "setweight(to_tsvector('english', coalesce(skills, '')), 'A') || "
+                "setweight(to_tsvector('english', coalesce(resume_text, '')), 'B') || "
+                "setweight(to_tsvector('english', coalesce(feedback, '')), 'C')",
+                persisted=True,
+            ),
+        )
+    )
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
     job_id = Column(Integer, ForeignKey("jobs.id", ondelete="CASCADE"), nullable=False)
@@ -260,6 +316,7 @@ class Interview(Base):
     question_responses = relationship(
         "InterviewQuestionResponse", back_populates="interview"
     )
+    answer_evaluations = relationship("AnswerEvaluation", back_populates="interview")
 
 
 class InterviewQuestionAndResponse(Base):
@@ -271,6 +328,12 @@ class InterviewQuestionAndResponse(Base):
     )  # technical, behavioral, problem_solving, custom
     order_number = Column(Integer, primary_key=True)
     answer = Column(String)
+    answer_search_vector = deferred(
+        Column(
+            TSVECTOR,
+            Computed("to_tsvector('english', coalesce(answer, ''))", persisted=True),
+        )
+    )
     created_at = Column(DateTime, default=func.now())
     interview_id = Column(
         Integer,
@@ -279,16 +342,68 @@ class InterviewQuestionAndResponse(Base):
         nullable=False,
     )
 
+    __table_args__ = (
+        Index(
+            "ix_interview_question_and_responses_answer_search_vector",
+            "answer_search_vector",
+            postgresql_using="gin",
+        ),
+    )
+
     # Relationships
     interview = relationship("Interview", back_populates="question_and_responses")
 
 
+class AnswerEvaluation(Base):
+    __tablename__ = "answer_evaluations"
+
+    id = Column(Integer, primary_key=True)
+    question_order = Column(Integer)  # InterviewQuestionAndResponse.order_number
+    question_id = Column(
+        Integer, ForeignKey("interview_questions.id", ondelete="CASCADE")
+    )  # InterviewQuestionResponse.question_id
+    score = Column(Integer)
+    technical_skills_score = Column(Integer)
+    communication_skills_score = Column(Integer)
+    problem_solving_skills_score = Column(Integer)
+    cultural_fit_score = Column(Integer)
+    feedback_for_candidate = Column(String)
+    feedback_for_recruiter = Column(String)
+    suggestions = Column(JSON)
+    keywords = Column(JSON)
+    created_at = Column(DateTime, default=func.now())
+    interview_id = Column(
+        Integer,
+        ForeignKey("interviews.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+
+    __table_args__ = (
+        UniqueConstraint(
+            "interview_id", "question_order", name="uq_evaluation_interview_order"
+        ),
+        UniqueConstraint(
+            "interview_id", "question_id", name="uq_evaluation_interview_question"
+        ),
+    )
+
+    interview = relationship("Interview", back_populates="answer_evaluations")
+
+
 class DSAResponse(Base):
     __tablename__ = "dsa_responses"
 
     id = Column(Integer, primary_key=True)
     code = Column(String)
     passed = Column(Boolean, default=False)
+    language = Column(String)
+    mode = Column(String, default="submit")
+    source_hash = Column(String)
+    total_count = Column(Integer, default=0, server_default="0", nullable=False)
+    dispatched_count = Column(Integer, default=0, server_default="0", nullable=False)
+    passed_count = Column(Integer, default=0, server_default="0", nullable=False)
+    failed_count = Column(Integer, default=0, server_default="0", nullable=False)
     interview_id = Column(Integer, ForeignKey("interviews.id", ondelete="CASCADE"))
     question_id = Column(Integer, ForeignKey("dsa_questions.id", ondelete="CASCADE"))
 
@@ -317,6 +432,14 @@ class DSATestCaseResponse(Base):
     dsa_test_case_id = Column(
         Integer, ForeignKey("dsa_test_cases.id", ondelete="CASCADE"), primary_key=True
     )
+    # Revision of the test case that was dispatched, which its result is
+    # cached under
+    test_case_revision = Column(Integer)
+    # zlib compressed JSON of truncated stdout, stderr and compiler output
+    output = deferred(Column(LargeBinary))
+    cpu_time_ms = Column(Integer)
+    wall_time_ms = Column(Integer)
+    memory_kb = Column(Integer)
 
     interview_dsa_response = relationship(
         "DSAResponse",
@@ -325,6 +448,22 @@ class DSATestCaseResponse(Base):
     test_case = relationship("DSATestCase", back_populates="responses")
 
 
+class DSAExecutionCache(Base):
+    __tablename__ = "dsa_execution_cache"
+
+    language = Column(String, primary_key=True)
+    source_hash = Column(String, primary_key=True)
+    dsa_test_case_id = Column(
+        Integer, ForeignKey("dsa_test_cases.id", ondelete="CASCADE"), primary_key=True
+    )
+    test_case_revision = Column(Integer, primary_key=True)
+    status = Column(String)
+    stdout = Column(String)
+    stderr = Column(String)
+    compiler_output = Column(String)
+    created_at = Column(DateTime, default=func.now())
+
+
 class QuizResponse(Base):
     __tablename__ = "quiz_responses"
 
@@ -377,3 +516,137 @@ class City(Base):
 
     country = relationship("Country", back_populates="cities")
     state = relationship("State", back_populates="cities")
+
+
+class LLMCall(Base):
+    __tablename__ = "llm_calls"
+
+    id = Column(Integer, primary_key=True)
+    model = Column(String)
+    endpoint = Column(String)  # chat.completions, audio.transcriptions, etc.
+    route = Column(String)
+    prompt_tokens = Column(Integer)
+    completion_tokens = Column(Integer)
+    latency_ms = Column(Float)
+    retries = Column(Integer, default=0)
+    outcome = Column(String)  # success, error
+    error = Column(String)
+    cost_usd = Column(Float)
+    created_at = Column(DateTime, default=func.now(), index=True)
+
+
+class InterviewRecording(Base):
+    __tablename__ = "interview_recordings"
+
+    interview_id = Column(
+        Integer, ForeignKey("interviews.id", ondelete="CASCADE"), primary_key=True
+    )
+    status = Column(String, default="recording")  # recording, finalizing, complete
+    received_chunks = Column(Integer, default=0, nullable=False)
+    duplicate_chunks = Column(Integer, default=0, nullable=False)
+    assembled_chunks = Column(Integer, default=0, nullable=False)
+    expected_chunks = Column(Integer)
+    received_bytes = Column(BigInteger, default=0, nullable=False)
+    receive_seconds = Column(Float, default=0, nullable=False)
+    created_at = Column(DateTime, default=func.now())
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
+
+class TranscodeJob(Base):
+    __tablename__ = "transcode_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    interview_id = Column(
+        Integer,
+        ForeignKey("interviews.id", ondelete="CASCADE"),
+        unique=True,
+        nullable=False,
+    )
+    # queued, running, live, done, failed
+    status = Column(String, default="queued", index=True)
+    attempts = Column(Integer, default=0, nullable=False)
+    error = Column(String)
+    run_after = Column(DateTime, default=func.now())
+    started_at = Column(DateTime)
+    heartbeat_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    created_at = Column(DateTime, default=func.now())
+
+
+class Screenshot(Base):
+    __tablename__ = "screenshots"
+
+    id = Column(Integer, primary_key=True, index=True)
+    interview_id = Column(
+        Integer, ForeignKey("interviews.id", ondelete="CASCADE"), nullable=False
+    )
+    taken_at = Column(DateTime, nullable=False)
+    size = Column(Integer, nullable=False)
+    storage_key = Column(String, nullable=False, unique=True)
+    thumbnail_key = Column(String)
+    dhash = Column(String)  # 64 bit difference hash, as hex
+    processed_at = Column(DateTime)
+    created_at = Column(DateTime, default=func.now())
+
+    __table_args__ = (
+        Index("ix_screenshots_interview_id_taken_at", "interview_id", "taken_at", "id"),
+    )
+
+
+class RetentionPolicy(Base):
+    __tablename__ = "retention_policies"
+
+    recruiter_id = Column(
+        Integer, ForeignKey("recruiters.id", ondelete="CASCADE"), primary_key=True
+    )
+    # Days after the interview each kind of media is kept. Null falls back to
+    # the configured default, 0 keeps it forever.
+    video_days = Column(Integer)
+    screenshot_days = Column(Integer)
+    resume_days = Column(Integer)
+    report_days = Column(Integer)
+    action = Column(String, default="delete", nullable=False)  # delete, archive
+    created_at = Column(DateTime, default=func.now())
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
+
+class MediaPurge(Base):
+    __tablename__ = "media_purges"
+
+    # Not a foreign key, purges are also recorded for deleted interviews.
+    interview_id = Column(Integer, primary_key=True)
+    kind = Column(String, primary_key=True)  # video, screenshots, resume, report, all
+    purged_at = Column(DateTime, default=func.now())
+
+
+class MediaDeletion(Base):
+    __tablename__ = "media_deletions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    key = Column(String, nullable=False)
+    is_prefix = Column(Boolean, default=False, nullable=False)
+    action = Column(String, default="delete", nullable=False)  # delete, archive
+    attempts = Column(Integer, default=0, nullable=False)
+    error = Column(String)
+    # Not attempted again before this, after a failure
+    retry_after = Column(DateTime)
+    created_at = Column(DateTime, default=func.now())
+
+
+class RetentionCursor(Base):
+    __tablename__ = "retention_cursors"
+
+    name = Column(String, primary_key=True)
+    position = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
+
+class PubSubMessage(Base):
+    __tablename__ = "pubsub_messages"
+
+    # Broker messages too large for a NOTIFY payload, which carries the id
+    # instead. Read by every listener, so rows are only removed once stale.
+    id = Column(BigInteger, primary_key=True)
+    channel = Column(String, nullable=False)
+    payload = Column(String, nullable=False)
+    created_at = Column(DateTime, default=func.now(), index=True)
@@ -4,7 +4,11 @@ from sqlalchemy.orm import Session
 
 from app import database
 from app import schemas
-from app.dependencies.authorization import authorize_recruiter
+from app.dependencies.authorization import (
+    RecruiterPrincipal,
+    authorize_recruiter,
+    authorize_recruiter_principal,
+)
 from app.models import DSAQuestion, DSATestCase
 
 router = APIRouter()
@@ -14,7 +18,7 @@ router = APIRouter()
 async def create_dsa_question(
     dsa_question_data: schemas.CreateDSAQuestion,
     db: Session = Depends(database.get_db),
-    recruiter_id=Depends(authorize_recruiter),
+    recruiter: RecruiterPrincipal = Depends(authorize_recruiter_principal),
 ):
     stmt = (
         insert(DSAQuestion)
@@ -34,8 +38,9 @@ async def create_dsa_question(
             DSAQuestion.job_id,
         )
     )
-    result = db.execute(stmt)
-    db.commit()
+    with recruiter.writing_to_job(dsa_question_data.job_id):
+        result = db.execute(stmt)
+        db.commit()
     dsa_question = result.mappings().one()
 
     data = dict(dsa_question)
@@ -1,45 +1,39 @@
-import base64
-from typing import Dict
-from fastapi import APIRouter, Depends, Request, WebSocket, WebSocketDisconnect
-from sqlalchemy import and_, func, select, update
+import asyncio
+import hashlib
+import hmac
+import json
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Request,
+    WebSocket,
+    WebSocketDisconnect,
+)
+from sqlalchemy import and_, select
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
-from app import config, database, schemas
-from app.dependencies.authorization import authorize_candidate
-from app.models import DSAResponse, DSATestCase, DSATestCaseResponse, Interview
+from app import database, schemas, services
+from app.config import settings
+from app.configs import fermion
+from app.configs.pubsub import interview_connection_manager
+from app.dependencies.authorization import authorize_candidate, authorize_operator
+from app.models import DSAResponse, DSATestCase, DSATestCaseResponse
 from app.utils import jwt
 
 router = APIRouter()
 
 
-class InterviewConnectionManager:
-    def __init__(self):
-        self.active_connections: Dict[int, WebSocket] = {}
-
-    async def connect(self, interview_id: int, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections[interview_id] = websocket
-
-    def disconnect(self, interview_id: int):
-        self.active_connections.pop(interview_id, None)
-
-    async def send_data(self, interview_id: int, data):
-        websocket = self.active_connections.get(interview_id)
-        if websocket:
-            await websocket.send_json(data)
-
-
-interview_connection_manager = InterviewConnectionManager()
-
-
 @router.websocket("")
 async def ws(
     websocket: WebSocket,
-    i_token=str,
+    i_token: str = None,
 ):
     if not i_token:
-        websocket.close(reason="Cannot Authenticate")
+        await websocket.close(reason="Cannot Authenticate")
+        return
     decoded_data = jwt.decode(i_token)
 
     interview_id = decoded_data["interview_id"]
@@ -48,9 +42,18 @@ async def ws(
         interview_id=interview_id, websocket=websocket
     )
 
-    async for data in websocket.iter_json():
-        print(data)
-        await websocket.send_json({"message": "working..."})
+    try:
+        async for data in websocket.iter_json():
+            interview_connection_manager.touch(interview_id, websocket)
+            if isinstance(data, dict) and data.get("event") == "pong":
+                continue
+            interview_connection_manager.send_local(
+                interview_id, websocket, {"message": "working..."}
+            )
+    except WebSocketDisconnect:
+        pass
+    finally:
+        interview_connection_manager.disconnect(interview_id, websocket)
 
 
 @router.post("")
@@ -61,6 +64,9 @@ async def create_dsa_response(
 ):
     stmt = insert(DSAResponse).values(
         code=response_data.code,
+        language=response_data.language,
+        mode=response_data.mode,
+        source_hash=services.code_execution.source_hash(response_data.code),
         interview_id=interview_id,
         question_id=response_data.question_id,
     )
@@ -68,6 +74,9 @@ async def create_dsa_response(
         index_elements=["interview_id", "question_id"],
         set_={
             "code": stmt.excluded.code,
+            "language": stmt.excluded.language,
+            "mode": stmt.excluded.mode,
+            "source_hash": stmt.excluded.source_hash,
         },
     ).returning(DSAResponse.id)
 
@@ -75,240 +84,125 @@ async def create_dsa_response(
     db.commit()
     dsa_response_id = result.all()[0]._mapping["id"]
 
-    stmt = select(DSATestCase.id, DSATestCase.input, DSATestCase.expected_output).where(
-        DSATestCase.dsa_question_id == response_data.question_id
+    await services.code_execution.schedule(
+        dsa_response_id,
+        response_data.question_id,
+        response_data.language,
+        response_data.code,
+        response_data.mode,
+        db,
     )
-    test_cases = [dict(test_case._mapping) for test_case in db.execute(stmt).all()]
-    import aiohttp
-
-    entries = []
-    for test_case in test_cases:
-        entries.append(
-            {
-                "language": response_data.language,
-                "runConfig": {
-                    "customMatcherToUseForExpectedOutput": "IgnoreWhitespaceAtStartAndEndForEveryLine",
-                    "expectedOutputAsBase64UrlEncoded": base64.urlsafe_b64encode(
-                        test_case["expected_output"].encode()
-                    )
-                    .decode()
-                    .rstrip("="),
-                    "stdinStringAsBase64UrlEncoded": base64.urlsafe_b64encode(
-                        test_case["input"].encode()
-                    )
-                    .decode()
-                    .rstrip("="),
-                    "callbackUrlOnExecutionCompletion": config.settings.URL
-                    + "/dsa-response/callback",
-                    "shouldEnablePerProcessAndThreadCpuTimeLimit": False,
-                    "shouldEnablePerProcessAndThreadMemoryLimit": False,
-                    "shouldAllowInternetAccess": False,
-                    # "compilerFlagString": "",
-                    "maxFileSizeInKilobytesFilesCreatedOrModified": 1024,
-                    "stackSizeLimitInKilobytes": 65536,
-                    "cpuTimeLimitInMilliseconds": 2000,
-                    "wallTimeLimitInMilliseconds": 5000,
-                    "memoryLimitInKilobyte": 131072,
-                    "maxProcessesAndOrThreads": 60,
-                },
-                "sourceCodeAsBase64UrlEncoded": base64.urlsafe_b64encode(
-                    response_data.code.encode()
-                )
-                .decode()
-                .rstrip("="),
-            }
-        )
-
-    async with aiohttp.ClientSession() as session:
-        async with session.post(
-            "https://backend.codedamn.com/api/public/request-dsa-code-execution-batch",
-            headers={"FERMION-API-KEY": config.settings.FERMION_API_KEY},
-            json={"data": [{"data": {"entries": entries}}]},
-        ) as response:
-            result = await response.json()
-            taskIds = result[0]["output"]["data"]["taskIds"]
-
-            dsa_test_case_responses = []
-            for i in range(len(test_cases)):
-                dsa_test_case_responses.append(
-                    {
-                        "status": "pending",
-                        "dsa_response_id": dsa_response_id,
-                        "task_id": taskIds[i],
-                        "dsa_test_case_id": test_cases[i]["id"],
-                    }
-                )
-            stmt = insert(DSATestCaseResponse).values(dsa_test_case_responses)
-            stmt = stmt.on_conflict_do_update(
-                index_elements=["dsa_response_id", "dsa_test_case_id"],
-                set_={"status": "pending", "task_id": stmt.excluded.task_id},
-            )
-            db.execute(stmt)
-            db.commit()
 
     return {"message": "executing"}
 
 
 @router.post("/callback")
-async def execution_callback(request: Request, db: Session = Depends(database.get_db)):
+async def execution_callback(request: Request):
     data = await request.json()
-
-    taskUID = data["taskUniqueId"]
-    runStatus = data["runResult"]["runStatus"]
-    compilation_output = data["runResult"][
-        "compilerOutputAfterCompilationBase64UrlEncoded"
-    ]
-    execution_err = (
-        data["runResult"]["programRunData"]["stderrBase64UrlEncoded"]
-        if data["runResult"]["programRunData"]
-        else ""
-    )
-    output = (
-        data["runResult"]["programRunData"]["stdoutBase64UrlEncoded"]
-        if data["runResult"]["programRunData"]
-        else ""
-    )
-    input = data["runConfig"]["stdinStringAsBase64UrlEncoded"]
-
-    stmt = (
-        update(DSATestCaseResponse)
-        .values({"status": runStatus})
-        .where(DSATestCaseResponse.task_id == taskUID)
-        .returning(DSATestCaseResponse.dsa_response_id)
+    await services.code_execution.result_batcher.add(
+        services.code_execution.parse_callback(data)
     )
-    result = db.execute(stmt)
-    db.commit()
-    dsa_response_id = result.mappings().one()["dsa_response_id"]
-
-    if runStatus != "successful":
-        stmt = (
-            select(
-                Interview.id.label("interview_id"),
-                DSATestCaseResponse.dsa_test_case_id,
-                DSATestCaseResponse.status,
-                DSATestCase.expected_output,
-                DSATestCase.input,
-            )
-            .select_from(DSATestCaseResponse)
-            .join(DSAResponse, DSAResponse.id == DSATestCaseResponse.dsa_response_id)
-            .join(
-                Interview,
-                Interview.id == DSAResponse.interview_id,
-            )
-            .join(DSATestCase, DSATestCase.id == DSATestCaseResponse.dsa_test_case_id)
-            .where(DSATestCaseResponse.task_id == taskUID)
-        )
-        data = db.execute(stmt).mappings().one()
-        output: str
-
-        stmt = (
-            update(DSAResponse)
-            .values(passed=False)
-            .where(DSAResponse.id == dsa_response_id)
-        )
-        db.execute(stmt)
-        db.commit()
 
-        await interview_connection_manager.send_data(
-            data["interview_id"],
-            {
-                "taskUID": taskUID,
-                "input": base64.urlsafe_b64decode(
-                    input + ((4 - (len(input) % 4)) * "=")
-                ).decode(),
-                "event": "execution_result",
-                "status": "failed",
-                "failed_test_case": {
-                    "test_case_id": data["dsa_test_case_id"],
-                    "status": data["status"],
-                    "execution_err": (
-                        base64.urlsafe_b64decode(
-                            execution_err + ((40 - (len(execution_err) % 4)) * "=")
-                        ).decode()
-                        if execution_err
-                        else ""
-                    ),
-                    "compilation_output": (
-                        base64.urlsafe_b64decode(
-                            compilation_output
-                            + ((40 - (len(compilation_output) % 4)) * "=")
-                        ).decode()
-                        if compilation_output
-                        else ""
-                    ),
-                    "input": data["input"],
-                    "expected_output": data["expected_output"],
-                    "output": base64.urlsafe_b64decode(
-                        output + ((4 - (len(output) % 4)) * "=")
-                    ).decode(),
-                },
-            },
-        )
-        return
 
-    stmt = (
-        select(
-            func.count(DSATestCaseResponse.task_id).label("passed_count"),
-            DSAResponse.interview_id,
-        )
-        .join(DSAResponse, DSAResponse.id == DSATestCaseResponse.dsa_response_id)
-        .group_by(DSAResponse.interview_id)
-        .where(
-            and_(
-                DSATestCaseResponse.dsa_response_id == dsa_response_id,
-                DSATestCaseResponse.status == "successful",
+def _verify_callback_signature(request: Request, body: bytes):
+    if not settings.DSA_CALLBACK_SECRET:
+        raise HTTPException(status_code=403, detail="Batched callbacks are disabled")
+    expected = hmac.new(
+        settings.DSA_CALLBACK_SECRET.encode(), body, hashlib.sha256
+    ).hexdigest()
+    signature = request.headers.get("x-callback-signature", "")
+    if not hmac.compare_digest(signature, expected):
+        raise HTTPException(status_code=401, detail="Invalid callback signature")
+
+
+@router.post("/callback/batch")
+async def execution_callback_batch(request: Request):
+    body = await request.body()
+    _verify_callback_signature(request, body)
+    data = json.loads(body)
+    await asyncio.gather(
+        *(
+            services.code_execution.result_batcher.add(
+                services.code_execution.parse_callback(callback)
             )
+            for callback in data
         )
     )
-    data = db.execute(stmt).all()[0]._mapping
-    passed_count = data["passed_count"]
-    stmt = (
-        select(func.count(DSATestCase.id).label("total_count"))
-        .join(DSAResponse, DSAResponse.question_id == DSATestCase.dsa_question_id)
-        .where(DSAResponse.id == dsa_response_id)
-    )
-    total_count = db.execute(stmt).all()[0]._mapping["total_count"]
+    return {"received": len(data)}
 
-    if total_count == passed_count:
-        stmt = update(DSAResponse).values(passed=True).where(id == dsa_response_id)
-        db.execute(stmt)
-        db.commit()
 
-        await interview_connection_manager.send_data(
-            data["interview_id"],
-            {
-                "event": "execution_result",
-                "status": "successful",
-                "passed_count": passed_count,
-            },
-        )
+@router.get("/execution-stats")
+async def get_execution_stats(operator=Depends(authorize_operator)):
+    return fermion.client.stats()
 
 
 @router.get("")
 async def get_dsa_response(
     interview_id: str, question_id: str, db: Session = Depends(database.get_db)
 ):
-    stmt = select(
-        DSAResponse.id,
-        DSAResponse.code,
-        DSAResponse.passed,
-        DSAResponse.interview_id,
-        DSAResponse.question_id,
-    ).where(
-        and_(
-            DSAResponse.interview_id == int(interview_id),
-            DSAResponse.question_id == int(question_id),
-        )
-    )
-    response = db.execute(stmt).mappings().one()
     stmt = (
         select(
-            DSATestCaseResponse.status, DSATestCase.input, DSATestCase.expected_output
+            DSAResponse.id,
+            DSAResponse.code,
+            DSAResponse.passed,
+            DSAResponse.passed_count,
+            DSAResponse.failed_count,
+            DSAResponse.total_count,
+            DSAResponse.interview_id,
+            DSAResponse.question_id,
+            DSATestCaseResponse.dsa_test_case_id,
+            DSATestCaseResponse.status,
+            DSATestCaseResponse.output,
+            DSATestCaseResponse.cpu_time_ms,
+            DSATestCaseResponse.wall_time_ms,
+            DSATestCaseResponse.memory_kb,
+            DSATestCase.input,
+            DSATestCase.expected_output,
+        )
+        .outerjoin(
+            DSATestCaseResponse,
+            DSATestCaseResponse.dsa_response_id == DSAResponse.id,
         )
-        .join(DSATestCase, DSATestCase.id == DSATestCaseResponse.dsa_test_case_id)
-        .where(DSATestCaseResponse.dsa_response_id == response["id"])
+        .outerjoin(DSATestCase, DSATestCase.id == DSATestCaseResponse.dsa_test_case_id)
+        .where(
+            and_(
+                DSAResponse.interview_id == int(interview_id),
+                DSAResponse.question_id == int(question_id),
+            )
+        )
+        .order_by(DSATestCaseResponse.dsa_test_case_id)
     )
-    test_case_responses = db.execute(stmt).mappings().all()
+    rows = db.execute(stmt).mappings().all()
+    if not rows:
+        raise HTTPException(status_code=404, detail="DSA response not found")
+
+    response = {
+        key: rows[0][key]
+        for key in (
+            "id",
+            "code",
+            "passed",
+            "passed_count",
+            "failed_count",
+            "total_count",
+            "interview_id",
+            "question_id",
+        )
+    }
+    test_case_responses = [
+        {
+            "test_case_id": row["dsa_test_case_id"],
+            "status": row["status"],
+            "input": row["input"],
+            "expected_output": row["expected_output"],
+            "cpu_time_ms": row["cpu_time_ms"],
+            "wall_time_ms": row["wall_time_ms"],
+            "memory_kb": row["memory_kb"],
+            **services.code_execution.unpack_output(row["output"]),
+        }
+        for row in rows
+        if row["dsa_test_case_id"] is not None
+    ]
 
     return {"response": response, "test_case_responses": test_case_responses}
 
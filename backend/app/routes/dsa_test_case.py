@@ -4,7 +4,7 @@ from sqlalchemy.orm import Session
 
 from app import database, schemas
 from app.dependencies.authorization import authorize_recruiter
-from app.models import DSATestCase
+from app.models import DSAExecutionCache, DSATestCase
 
 router = APIRouter()
 
@@ -41,10 +41,13 @@ async def update_test_case(
     db: Session = Depends(database.get_db),
     recruiter_id=Depends(authorize_recruiter),
 ):
+    # Bumping the revision invalidates cached execution results for the case.
     stmt = (
         update(DSATestCase)
         .values(
-            input=test_case_data.input, expected_output=test_case_data.expected_output
+            input=test_case_data.input,
+            expected_output=test_case_data.expected_output,
+            revision=DSATestCase.revision + 1,
         )
         .where(DSATestCase.id == test_case_data.id)
         .returning(
@@ -55,6 +58,11 @@ async def update_test_case(
         )
     )
     result = db.execute(stmt)
+    db.execute(
+        delete(DSAExecutionCache).where(
+            DSAExecutionCache.dsa_test_case_id == test_case_data.id
+        )
+    )
     db.commit()
     test_case = result.all()[0]._mapping
     return test_case
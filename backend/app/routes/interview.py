@@ -1,11 +1,8 @@
 import datetime
 import io
 import json
-import os
 import random
-import shutil
-import subprocess
-import time
+import uuid
 from typing import Literal, LiteralString
 from fastapi import (
     APIRouter,
@@ -18,14 +15,17 @@ from fastapi import (
     UploadFile,
     status,
 )
-from fastapi.responses import FileResponse
+from sqlalchemy.exc import NoResultFound
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, asc, delete, desc, func, select, update
+from sqlalchemy import and_, asc, delete, desc, func, insert, or_, select, update
 
 from app import config, database, schemas
 from app import services
 from app.configs import openai
+from app.configs.storage import storage
+from app.lib import media
 from app.lib.errors import CustomException
+from app.lib.storage import content_key
 from app.models import (
     Interview,
     InterviewQuestion,
@@ -33,6 +33,8 @@ from app.models import (
     InterviewQuestionResponse,
     Job,
     Recruiter,
+    Screenshot,
+    TranscodeJob,
 )
 from app.services import brevo
 from app.utils import jwt
@@ -40,6 +42,8 @@ from app.dependencies.authorization import authorize_candidate, authorize_recrui
 
 router = APIRouter()
 
+SCREENSHOT_PAGE_SIZE = 24
+
 
 @router.post("")
 async def create_interview(
@@ -148,28 +152,94 @@ async def get_interview_recruiter_view(
             Interview.feedback,
             Interview.job_id,
             Interview.report_file_url,
+            Interview.legacy_screenshots,
+            TranscodeJob.status.label("video_status"),
         )
         .join(Job, Interview.job_id == Job.id)
         .join(Recruiter, Recruiter.id == Job.company_id)
+        .outerjoin(TranscodeJob, TranscodeJob.interview_id == Interview.id)
         .where(and_(Interview.id == int(id), Recruiter.id == recruiter_id))
     )
 
     result = db.execute(stmt)
     interview = dict(result.mappings().one())
-    if os.path.exists(f"uploads/interview_video/{int(id)}/video.m3u8"):
-        interview["video_url"] = (
-            f"{config.settings.URL}/uploads/interview_video/{int(id)}/video.m3u8"
-        )
-
-    interview["screenshot_urls"] = []
-    if os.path.exists(f"uploads/screenshot/{int(id)}/"):
-        for f in os.listdir(f"uploads/screenshot/{int(id)}"):
-            interview["screenshot_urls"].append(
-                f"{config.settings.URL}/uploads/screenshot/{int(id)}/{f}"
-            )
+    # Recordings converted before transcode jobs existed have no job row.
+    video_key = f"interview_video/{int(id)}/video.m3u8"
+    if interview["video_status"] == "done" or (
+        interview["video_status"] is None and await storage.exists(video_key)
+    ):
+        interview["video_url"] = storage.url(video_key)
+
+    screenshots, count = _screenshot_page(int(id), SCREENSHOT_PAGE_SIZE, 0, db)
+    interview["screenshots"] = screenshots
+    interview["screenshot_urls"] = [screenshot["url"] for screenshot in screenshots]
+    interview["screenshot_count"] = count
+    # Screenshots saved before they were indexed are only on storage.
+    if interview.pop("legacy_screenshots") and not count:
+        interview["screenshot_urls"] = [
+            storage.url(key) for key in await storage.list(f"screenshot/{int(id)}")
+        ]
+        interview["screenshot_count"] = len(interview["screenshot_urls"])
     return interview
 
 
+def _screenshot_page(interview_id: int, limit: int, offset: int, db: Session):
+    stmt = (
+        select(
+            Screenshot.id,
+            Screenshot.taken_at,
+            Screenshot.size,
+            Screenshot.storage_key,
+            Screenshot.thumbnail_key,
+            func.count().over().label("count"),
+        )
+        .where(Screenshot.interview_id == interview_id)
+        .order_by(Screenshot.taken_at, Screenshot.id)
+        .limit(limit)
+        .offset(offset)
+    )
+    rows = db.execute(stmt).mappings().all()
+    screenshots = [
+        {
+            "id": row["id"],
+            "taken_at": row["taken_at"],
+            "size": row["size"],
+            "url": storage.url(row["storage_key"]),
+            "thumbnail_url": storage.url(
+                row["thumbnail_key"] or row["storage_key"]
+            ),
+        }
+        for row in rows
+    ]
+    if rows:
+        return screenshots, rows[0]["count"]
+    if offset == 0:
+        return screenshots, 0
+    stmt = select(func.count()).where(Screenshot.interview_id == interview_id)
+    return screenshots, db.execute(stmt).scalar()
+
+
+@router.get("/screenshots")
+async def get_screenshots(
+    id: str,
+    limit: str = str(SCREENSHOT_PAGE_SIZE),
+    offset: str = "0",
+    db: Session = Depends(database.get_db),
+    recruiter_id=Depends(authorize_recruiter),
+):
+    stmt = (
+        select(Interview.id)
+        .join(Job, Interview.job_id == Job.id)
+        .where(and_(Interview.id == int(id), Job.company_id == recruiter_id))
+    )
+    if db.execute(stmt).scalar() is None:
+        raise HTTPException(status_code=404, detail="Interview not found")
+    screenshots, count = _screenshot_page(
+        int(id), min(int(limit), 100), int(offset), db
+    )
+    return {"screenshots": screenshots, "count": count}
+
+
 @router.get("/recruiter-view/all")
 async def get_interview(
     job_id: str = None,
@@ -258,6 +328,76 @@ async def get_interview(
     return {"interviews": interviews, "count": count["count"]}
 
 
+@router.get("/recruiter-view/search")
+async def search_interviews(
+    q: str,
+    job_id: str = None,
+    limit: str = "10",
+    offset: str = "0",
+    db: Session = Depends(database.get_db),
+    recruiter_id=Depends(authorize_recruiter),
+):
+    query = func.websearch_to_tsquery("english", q)
+
+    answer_rank = (
+        select(
+            InterviewQuestionAndResponse.interview_id,
+            func.sum(
+                func.ts_rank(InterviewQuestionAndResponse.answer_search_vector, query)
+            ).label("rank"),
+        )
+        .where(InterviewQuestionAndResponse.answer_search_vector.op("@@")(query))
+        .group_by(InterviewQuestionAndResponse.interview_id)
+        .subquery()
+    )
+    rank = func.ts_rank(Interview.search_vector, query) + func.coalesce(
+        answer_rank.c.rank, 0
+    )
+    condition = and_(
+        Job.company_id == recruiter_id,
+        Interview.job_id == int(job_id) if job_id else True,
+        or_(
+            Interview.search_vector.op("@@")(query),
+            answer_rank.c.interview_id.is_not(None),
+        ),
+    )
+
+    stmt = (
+        select(
+            Interview.id,
+            Interview.status,
+            Interview.first_name,
+            Interview.last_name,
+            Interview.email,
+            Interview.location,
+            Interview.work_experience,
+            Interview.skills,
+            Interview.resume_match_score,
+            Interview.overall_score,
+            Interview.job_id,
+            Interview.created_at,
+            rank.label("rank"),
+        )
+        .join(Job, Job.id == Interview.job_id)
+        .outerjoin(answer_rank, answer_rank.c.interview_id == Interview.id)
+        .where(condition)
+        .order_by(desc("rank"), desc(Interview.id))
+        .limit(int(limit))
+        .offset(int(offset))
+    )
+    count_stmt = (
+        select(func.count(Interview.id).label("count"))
+        .join(Job, Job.id == Interview.job_id)
+        .outerjoin(answer_rank, answer_rank.c.interview_id == Interview.id)
+        .where(condition)
+    )
+
+    interviews = db.execute(stmt).mappings().all()
+    count = db.execute(count_stmt).mappings().one()
+
+    return {"interviews": interviews, "count": count["count"]}
+
+
 @router.put("/upload-resume")
 async def upload_resume(
     request: Request,
@@ -270,20 +410,16 @@ async def upload_resume(
             status_code=status.HTTP_400_BAD_REQUEST, detail="No file provided"
         )
 
-    os.makedirs("uploads/resume", exist_ok=True)
-    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    file_path = os.path.join(
-        "uploads", "resume", f"{interview_id}_{timestamp}_{file.filename}"
-    )
-
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    data = await file.read()
+    key = content_key(f"resume/{interview_id}", data, "pdf")
+    await storage.put(key, data, "application/pdf")
 
     stmt = (
         update(Interview)
         .where(Interview.id == interview_id)
         .values(
-            resume_url=file_path,
+            resume_url=storage.url(key),
+            resume_uploaded_at=func.now(),
         )
         .returning(
             Interview.id,
@@ -384,18 +520,19 @@ async def verify_email(
 @router.get("/resume")
 async def get_resume(
     interview_id: str,
+    request: Request,
     recruiter_id=Depends(authorize_recruiter),
     db: Session = Depends(database.get_db),
 ):
     stmt = select(Interview.resume_url).where(Interview.id == int(interview_id))
     interview = db.execute(stmt).mappings().one()
 
-    file_path = interview["resume_url"]
+    resume_url = interview["resume_url"]
 
-    if not file_path:
+    if not resume_url:
         return {"message": "No content"}
 
-    return FileResponse(file_path, headers={"Content-Type": "application/pdf"})
+    return await media.serve(storage, storage.key(resume_url), request, private=True)
 
 
 @router.put("")
@@ -527,62 +664,36 @@ async def analyze_resume(
     return interview
 
 
-@router.put("/generate-feedback")
-async def generate_feedback(
-    request: Request,
-    db: Session = Depends(database.get_db),
-    interview_id=Depends(authorize_candidate),
+async def _evaluate_conversation(
+    interview_id: int,
+    transcript: str,
+    job_description: str,
+    job_requirements: str,
+    db: Session,
 ):
-    body = await request.json()
-    transcript = body.get("transcript", "")
-    job_requirements = body.get("job_requirements", "")
-
-    stmt = (
-        select(
-            Job.title,
-            Job.description,
-            Job.requirements,
-            Interview.resume_text,
-            Interview.first_name,
-            Interview.last_name,
-            Interview.created_at,
-            Interview.email,
-            Interview.phone,
-            Interview.location,
-            Interview.education,
-            Interview.work_experience,
-            Interview.skills,
-            Interview.resume_match_score,
-            Interview.resume_match_feedback,
-        )
-        .join(Interview)
-        .where(Interview.id == interview_id)
-    )
-    data = db.execute(stmt).mappings().one()
-
-    stmt = select(
-        InterviewQuestionAndResponse.question,
-        InterviewQuestionAndResponse.question_type,
-        InterviewQuestionAndResponse.answer,
-    ).where(InterviewQuestionAndResponse.interview_id == interview_id)
-    questions_and_responses = db.execute(stmt).mappings().all()
+    conversation = transcript or ""
+    if not conversation:
+        stmt = select(
+            InterviewQuestionAndResponse.question,
+            InterviewQuestionAndResponse.question_type,
+            InterviewQuestionAndResponse.answer,
+        ).where(InterviewQuestionAndResponse.interview_id == interview_id)
+        questions_and_responses = db.execute(stmt).mappings().all()
 
-    stmt = (
-        select(
-            InterviewQuestion.question,
-            InterviewQuestion.question_type,
-            InterviewQuestionResponse.answer,
-        )
-        .join(
-            InterviewQuestion,
-            InterviewQuestion.id == InterviewQuestionResponse.question_id,
+        stmt = (
+            select(
+                InterviewQuestion.question,
+                InterviewQuestion.question_type,
+                InterviewQuestionResponse.answer,
+            )
+            .join(
+                InterviewQuestion,
+                InterviewQuestion.id == InterviewQuestionResponse.question_id,
+            )
+            .where(InterviewQuestionResponse.interview_id == interview_id)
         )
-        .where(InterviewQuestionResponse.interview_id == interview_id)
-    )
-    custom_question_responses = db.execute(stmt).mappings().all()
+        custom_question_responses = db.execute(stmt).mappings().all()
 
-    conversation = transcript or ""
-    if not conversation:
         for question_and_response in questions_and_responses:
             conversation += f"""
                 Recruiter: {question_and_response.question} (question type: {question_and_response.question_type})
@@ -635,10 +746,10 @@ async def generate_feedback(
         {conversation}
 
         Job Description:
-        {data.description}
+        {job_description}
 
         Job Requirements:
-        {job_requirements or data.requirements}
+        {job_requirements}
 
         Important:
         - Return ONLY the JSON object, no other text
@@ -664,15 +775,58 @@ async def generate_feedback(
     )
 
     interview_analysis = response.choices[0].message.content
-    interview_data = json.loads(interview_analysis)
+    return json.loads(interview_analysis)
 
-    os.makedirs(os.path.join("uploads", "report"), exist_ok=True)
 
-    report_file_path = os.path.join(
-        "uploads",
-        "report",
-        f"{interview_id}_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf",
+@router.put("/generate-feedback")
+async def generate_feedback(
+    request: Request,
+    db: Session = Depends(database.get_db),
+    interview_id=Depends(authorize_candidate),
+):
+    body = await request.json()
+    transcript = body.get("transcript", "")
+    job_requirements = body.get("job_requirements", "")
+
+    stmt = (
+        select(
+            Job.title,
+            Job.description,
+            Job.requirements,
+            Interview.resume_text,
+            Interview.first_name,
+            Interview.last_name,
+            Interview.created_at,
+            Interview.email,
+            Interview.phone,
+            Interview.location,
+            Interview.education,
+            Interview.work_experience,
+            Interview.skills,
+            Interview.resume_match_score,
+            Interview.resume_match_feedback,
+        )
+        .join(Interview)
+        .where(Interview.id == interview_id)
+    )
+    data = db.execute(stmt).mappings().one()
+
+    # Answers are scored as they are submitted, and any still missing are
+    # scored now, so the transcript sent by the client is only scored as a
+    # whole when some evaluation failed.
+    await services.answer_evaluation.evaluate_missing(interview_id, db)
+    interview_data = services.answer_evaluation.aggregate_evaluations(
+        interview_id, db
     )
+    if interview_data is None:
+        interview_data = await _evaluate_conversation(
+            interview_id,
+            transcript,
+            data.description,
+            job_requirements or data.requirements,
+            db,
+        )
+
     from fpdf import FPDF
 
     pdf = FPDF(unit="pt")
@@ -803,7 +957,11 @@ async def generate_feedback(
     pdf.set_font("Arial", size=14)
     pdf.multi_cell(full_width, 16.8, str(data["resume_match_feedback"]), border=0)
 
-    pdf.output(report_file_path)
+    report = pdf.output(dest="S")
+    if isinstance(report, str):
+        report = report.encode("latin-1")
+    report_key = content_key(f"report/{interview_id}", report, "pdf")
+    await storage.put(report_key, report, "application/pdf")
 
     stmt = (
         update(Interview)
@@ -820,7 +978,8 @@ async def generate_feedback(
                 "problemSolving"
             ],
             cultural_fit_score=interview_data["scoreBreakdown"]["culturalFit"],
-            report_file_url=f"{config.settings.URL}/{report_file_path}",
+            report_file_url=storage.url(report_key),
+            report_generated_at=func.now(),
         )
         .returning(
             Interview.id,
@@ -861,63 +1020,77 @@ async def generate_feedback(
 @router.post("/record")
 async def record_interview(
     request: Request,
-    background_tasks: BackgroundTasks,
     finished: str = "false",
+    seq: int = None,
+    chunks: int = None,
+    db: Session = Depends(database.get_db),
     interview_id=Depends(authorize_candidate),
 ):
     if finished == "true":
-        ffmpeg_command = [
-            "ffmpeg",
-            "-i",
-            os.path.join("uploads", "interview_video", str(interview_id), "video.webm"),
-            "-r",
-            "30",
-            "-hls_time",
-            "10",
-            "-hls_list_size",
-            "0",
-            "-f",
-            "hls",
-            os.path.join("uploads", "interview_video", str(interview_id), "video.m3u8"),
-        ]
-        background_tasks.add_task(subprocess.Popen(ffmpeg_command))
+        await services.recording.finish(interview_id, chunks, db)
         return
-    data = await request.body()
-    os.makedirs(
-        os.path.join("uploads", "interview_video", str(interview_id)), exist_ok=True
-    )
-    file_path = os.path.join(
-        "uploads", "interview_video", str(interview_id), "video.webm"
+    return await services.recording.ingest_chunk(
+        interview_id, seq, request.stream(), db
     )
 
-    with open(file_path, "ab") as buffer:
-        buffer.write(data)
-    return
+
+@router.get("/recording-stats")
+async def get_recording_stats(
+    id: str,
+    db: Session = Depends(database.get_db),
+    recruiter_id=Depends(authorize_recruiter),
+):
+    stmt = (
+        select(Interview.id)
+        .join(Job, Interview.job_id == Job.id)
+        .where(and_(Interview.id == int(id), Job.company_id == recruiter_id))
+    )
+    if db.execute(stmt).scalar() is None:
+        raise HTTPException(status_code=404, detail="Interview not found")
+    try:
+        return services.recording.get_stats(int(id), db)
+    except NoResultFound:
+        raise HTTPException(status_code=404, detail="No recording for this interview")
 
 
 @router.post("/screenshot")
-async def save_screenshot(request: Request, interview_id=Depends(authorize_candidate)):
+async def save_screenshot(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(database.get_db),
+    interview_id=Depends(authorize_candidate),
+):
     try:
         data = await request.body()
         if not data:
             raise HTTPException(status_code=400, detail="No screenshot data provided")
 
-        # Create directory if it doesn't exist
-        os.makedirs(
-            os.path.join("uploads", "screenshot", str(interview_id)), exist_ok=True
-        )
-
-        # Generate filename with timestamp
-        timestamp = int(time.time())
-        file_path = os.path.join(
-            "uploads", "screenshot", str(interview_id), f"{timestamp}.png"
+        # Generate a filename that is unique even within the same second
+        taken_at = datetime.datetime.now()
+        timestamp = int(taken_at.timestamp())
+        key = (
+            f"screenshot/{interview_id}/"
+            f"{taken_at.strftime('%Y%m%d_%H%M%S_%f')}_{uuid.uuid4().hex[:8]}.png"
         )
 
         # Save the screenshot
-        with open(file_path, "wb") as f:
-            f.write(data)
+        await storage.put(key, data, "image/png")
+        screenshot_id = db.execute(
+            insert(Screenshot)
+            .values(
+                interview_id=interview_id,
+                taken_at=taken_at,
+                size=len(data),
+                storage_key=key,
+            )
+            .returning(Screenshot.id)
+        ).scalar_one()
+        db.commit()
+        background_tasks.add_task(services.screenshot.process, screenshot_id)
 
         return {"message": "Screenshot saved successfully", "timestamp": timestamp}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Failed to save screenshot: {str(e)}"
@@ -935,18 +1108,30 @@ async def delete_interview(
         delete(Interview)
         .where(Interview.job_id.in_(select(job_subq)))
         .where(Interview.id == int(id))
+        .returning(Interview.id, Interview.resume_url, Interview.report_file_url)
     )
-    db.execute(stmt)
+    interview = db.execute(stmt).mappings().one_or_none()
+    if interview is not None:
+        services.retention.queue_deleted_interview(interview, db)
     db.commit()
+    services.retention.wake()
     return
 
 
 @router.post("/interview-question-response")
 async def create_interview_question_response(
     response_data: schemas.CreateInterviewQuestionResponse,
+    background_tasks: BackgroundTasks,
     interview_id: int = Depends(authorize_candidate),
     db: Session = Depends(database.get_db),
 ):
-    return services.interview_question_response.create_interview_question_response(
+    services.interview_question_response.create_interview_question_response(
         response_data, interview_id, db
     )
+    background_tasks.add_task(
+        services.answer_evaluation.evaluate_answer,
+        interview_id,
+        response_data.answer,
+        question_id=response_data.question_id,
+    )
+    return
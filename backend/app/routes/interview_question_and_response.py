@@ -1,73 +1,53 @@
 from io import BytesIO
 import json
+import logging
 import tempfile
-from fastapi import APIRouter, Depends, File, Form, HTTPException, Request, UploadFile
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    File,
+    Form,
+    HTTPException,
+    Request,
+    UploadFile,
+)
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, select, update
+from sqlalchemy import and_, delete, func, select, update
 
-from app import database, schemas
+from app import database, schemas, services
 from app.configs import openai
 from app.dependencies.authorization import authorize_candidate, authorize_recruiter
-from app.models import Interview, InterviewQuestion, InterviewQuestionAndResponse, Job
+from app.lib.json_stream import JSONArrayStreamParser
+from app.models import (
+    AnswerEvaluation,
+    Interview,
+    InterviewQuestion,
+    InterviewQuestionAndResponse,
+    Job,
+)
 
 router = APIRouter()
 
+logger = logging.getLogger(__name__)
 
-@router.post("/generate-questions")
-async def generate_questions(
-    db: Session = Depends(database.get_db),
-    interview_id=Depends(authorize_candidate),
-):
-    stmt = (
-        select(InterviewQuestionAndResponse)
-        .where(
-            InterviewQuestionAndResponse.interview_id == interview_id
-            and InterviewQuestionAndResponse.answer == None
-        )
-        .order_by(InterviewQuestionAndResponse.order_number)
-    )
-
-    questions_and_responses = db.execute(stmt).scalars().all()
-    if len(questions_and_responses):
-        return questions_and_responses
-
-    stmt = select(Interview).where(Interview.id == interview_id)
-    interview = db.execute(stmt).scalars().one()
+DEFAULT_QUESTION = {
+    "question": "Could you please tell me about your experience as a Senior Software Engineer?",
+    "type": "general",
+}
 
-    stmt = select(Job).where(Job.id == interview.job_id)
-    job = db.execute(stmt).scalars().one()
-
-    stmt = select(InterviewQuestion.question, InterviewQuestion.question_type).where(
-        InterviewQuestion.job_id == interview.job_id
-    )
-    custom_questions = db.execute(stmt).mappings().all()
 
+def _personalized_questions_prompt(job, interview, custom_questions):
     example_questions = ""
     for question in custom_questions:
         example_questions += f"""
         Question: {question.question} (question type: {question.question_type})
 """
 
-    if not interview.resume_text and not job.description:
-        return [
-            {
-                "question": "Could you please tell me about your experience as a Senior Software Engineer?",
-                "type": "general",
-            }
-        ]
-
-    question_types = [
-        "technical",
-        "technical",
-        "technical",
-        "behavioral",
-        "behavioral",
-        "problem_solving",
-        "problem_solving",
-        "problem_solving",
-    ]
+    question_types = services.question_pool.QUESTION_TYPES
 
-    system_prompt = f"""You are an expert technical interviewer for the position of {job.title}.
+    return f"""You are an expert technical interviewer for the position of {job.title}.
 Your task is to generate interview questions based on the job description, candidate's resume, and the custom questions provided.
 
 The questions should be:
@@ -102,24 +82,79 @@ If no resume text or job description is provided, generate a basic question abou
 
 Return the questions as a JSON array of objects with "question" and "type" fields."""
 
-    response = await openai.client.chat.completions.create(
-        model="gpt-4",
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": "Generate the interview questions, making sure to include enhanced versions of the custom questions provided."},
-        ],
-        temperature=0.7,
-        max_tokens=1000,
+
+@router.post("/generate-questions")
+async def generate_questions(
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(database.get_db),
+    interview_id=Depends(authorize_candidate),
+):
+    stmt = (
+        select(InterviewQuestionAndResponse)
+        .where(
+            InterviewQuestionAndResponse.interview_id == interview_id
+            and InterviewQuestionAndResponse.answer == None
+        )
+        .order_by(InterviewQuestionAndResponse.order_number)
     )
 
-    questions = json.loads(response.choices[0].message.content)
+    questions_and_responses = db.execute(stmt).scalars().all()
+    if len(questions_and_responses):
+        return questions_and_responses
+
+    stmt = select(Interview).where(Interview.id == interview_id)
+    interview = db.execute(stmt).scalars().one()
+
+    stmt = select(Job).where(Job.id == interview.job_id)
+    job = db.execute(stmt).scalars().one()
+
+    questions = services.question_pool.sample_questions(job.id, db)
+    if questions:
+        questions[0]["question"] = (
+            f"Hello {interview.first_name}! Thank you for joining the interview "
+            f"for the {job.title} position. {questions[0]['question']}"
+        )
+    else:
+        # The job has no pool yet (e.g. created before pools existed), so
+        # personalize this interview the slow way and build the pool for the
+        # next candidate.
+        background_tasks.add_task(
+            services.question_pool.schedule_question_pool_generation, job.id
+        )
+
+        if not interview.resume_text and not job.description:
+            return [DEFAULT_QUESTION]
+
+        stmt = select(
+            InterviewQuestion.question, InterviewQuestion.question_type
+        ).where(InterviewQuestion.job_id == interview.job_id)
+        custom_questions = db.execute(stmt).mappings().all()
+
+        response = await openai.client.chat.completions.create(
+            model="gpt-4",
+            messages=[
+                {
+                    "role": "system",
+                    "content": _personalized_questions_prompt(
+                        job, interview, custom_questions
+                    ),
+                },
+                {"role": "user", "content": "Generate the interview questions, making sure to include enhanced versions of the custom questions provided."},
+            ],
+            temperature=0.7,
+            max_tokens=1000,
+        )
+
+        questions = json.loads(response.choices[0].message.content)
 
-    if not questions[0]["question"] or not questions[0]["type"]:
-        raise HTTPException(status_code=500, detail="Error while generating questions")
-    if not isinstance(questions, list):
-        questions = [
-            {"question": response.choices[0].message.content, "type": "general"}
-        ]
+        if not questions[0]["question"] or not questions[0]["type"]:
+            raise HTTPException(
+                status_code=500, detail="Error while generating questions"
+            )
+        if not isinstance(questions, list):
+            questions = [
+                {"question": response.choices[0].message.content, "type": "general"}
+            ]
 
     if not questions:
         raise HTTPException(status_code=500, detail="Failed to generate questions")
@@ -135,6 +170,7 @@ Return the questions as a JSON array of objects with "question" and "type" field
     ]
 
     db.add_all(interview_questions_and_responses)
+    interview.questions_generated_at = func.now()
     db.commit()
 
     stmt = select(InterviewQuestionAndResponse).where(
@@ -144,6 +180,171 @@ Return the questions as a JSON array of objects with "question" and "type" field
     return interview_questions_and_responses
 
 
+def _sse(event: str, data):
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def _question_and_response_data(question_and_response: InterviewQuestionAndResponse):
+    return {
+        "question": question_and_response.question,
+        "question_type": question_and_response.question_type,
+        "order_number": question_and_response.order_number,
+        "answer": question_and_response.answer,
+        "interview_id": question_and_response.interview_id,
+    }
+
+
+async def _question_events(interview_id: int):
+    """Server-sent events with each question as soon as it is generated,
+    then `done`, or `error` if generation failed.
+
+    Each question is saved before it is sent, so the candidate can answer
+    the first one while the rest are generated. The interview is marked once
+    the set is complete. A set left without the mark was cut off, and is
+    thrown away and generated again on the next request.
+    """
+    # The request scoped session is closed before a streaming body finishes,
+    # so the generator manages its own.
+    db = database.SessionLocal()
+    try:
+        stmt = select(Interview).where(Interview.id == interview_id)
+        interview = db.execute(stmt).scalars().one()
+
+        stmt = (
+            select(InterviewQuestionAndResponse)
+            .where(InterviewQuestionAndResponse.interview_id == interview_id)
+            .order_by(InterviewQuestionAndResponse.order_number)
+        )
+        questions_and_responses = db.execute(stmt).scalars().all()
+        if len(questions_and_responses) and interview.questions_generated_at:
+            for question_and_response in questions_and_responses:
+                yield _sse("question", _question_and_response_data(question_and_response))
+            yield _sse("done", {"count": len(questions_and_responses)})
+            return
+        if len(questions_and_responses):
+            _discard_questions(interview_id, db)
+
+        stmt = select(Job).where(Job.id == interview.job_id)
+        job = db.execute(stmt).scalars().one()
+
+        questions_and_responses = []
+
+        def add(question):
+            question_and_response = InterviewQuestionAndResponse(
+                question=question["question"],
+                question_type=question["type"],
+                order_number=len(questions_and_responses),
+                interview_id=interview_id,
+            )
+            event = _sse("question", _question_and_response_data(question_and_response))
+            db.add(question_and_response)
+            db.commit()
+            questions_and_responses.append(question_and_response)
+            return event
+
+        questions = services.question_pool.sample_questions(job.id, db)
+        if questions:
+            questions[0]["question"] = (
+                f"Hello {interview.first_name}! Thank you for joining the interview "
+                f"for the {job.title} position. {questions[0]['question']}"
+            )
+            for question in questions:
+                yield add(question)
+        else:
+            # The job has no pool yet (e.g. created before pools existed), so
+            # personalize this interview the slow way and build the pool for
+            # the next candidate.
+            await services.question_pool.schedule_question_pool_generation(job.id)
+
+            if not interview.resume_text and not job.description:
+                yield add(DEFAULT_QUESTION)
+            else:
+                async for question in _generate_personalized_questions(
+                    job, interview, db
+                ):
+                    if question is None:
+                        yield _sse("error", {"detail": "Failed to generate questions"})
+                        return
+                    yield add(question)
+
+        if not questions_and_responses:
+            yield _sse("error", {"detail": "Failed to generate questions"})
+            return
+        interview.questions_generated_at = func.now()
+        db.commit()
+        yield _sse("done", {"count": len(questions_and_responses)})
+    finally:
+        db.close()
+
+
+def _discard_questions(interview_id: int, db: Session):
+    """Remove a question set whose generation was cut off, along with any
+    answers and evaluations it already got, which are keyed by position."""
+    db.execute(
+        delete(AnswerEvaluation).where(
+            and_(
+                AnswerEvaluation.interview_id == interview_id,
+                AnswerEvaluation.question_order.is_not(None),
+            )
+        )
+    )
+    db.execute(
+        delete(InterviewQuestionAndResponse).where(
+            InterviewQuestionAndResponse.interview_id == interview_id
+        )
+    )
+    db.commit()
+
+
+async def _generate_personalized_questions(job, interview, db: Session):
+    """Yields each question as the model completes it, and None if the
+    model fails or returns something that is not a JSON array of objects."""
+    stmt = select(InterviewQuestion.question, InterviewQuestion.question_type).where(
+        InterviewQuestion.job_id == interview.job_id
+    )
+    custom_questions = db.execute(stmt).mappings().all()
+
+    parser = JSONArrayStreamParser()
+    try:
+        stream = await openai.client.chat.completions.create(
+            model="gpt-4",
+            messages=[
+                {
+                    "role": "system",
+                    "content": _personalized_questions_prompt(
+                        job, interview, custom_questions
+                    ),
+                },
+                {"role": "user", "content": "Generate the interview questions, making sure to include enhanced versions of the custom questions provided."},
+            ],
+            temperature=0.7,
+            max_tokens=1000,
+            stream=True,
+        )
+        async for chunk in stream:
+            content = chunk.choices[0].delta.content if chunk.choices else None
+            if not content:
+                continue
+            for question in parser.feed(content):
+                if not isinstance(question, dict):
+                    continue
+                if not question.get("question") or not question.get("type"):
+                    continue
+                yield question
+    except Exception as e:
+        logger.error(f"Failed to generate questions for interview {interview.id}: {e!r}")
+        yield None
+
+
+@router.post("/generate-questions/stream")
+async def stream_questions(interview_id=Depends(authorize_candidate)):
+    return StreamingResponse(
+        _question_events(interview_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("")
 async def get_interview_question_and_response(
     interview_id: str,
@@ -161,6 +362,7 @@ async def get_interview_question_and_response(
 @router.put("/submit-text-response")
 async def text_update_answer(
     data: schemas.UpdateInterviewQuestionResponse,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(database.get_db),
     interview_id=Depends(authorize_candidate),
 ):
@@ -196,4 +398,12 @@ async def text_update_answer(
     db.commit()
     question_and_response = result.mappings().one()
 
+    background_tasks.add_task(
+        services.answer_evaluation.evaluate_answer,
+        interview_id,
+        question_and_response["answer"],
+        question=question_and_response["question"],
+        question_type=question_and_response["question_type"],
+        question_order=question_and_response["order_number"],
+    )
     return question_and_response
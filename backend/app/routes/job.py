@@ -1,14 +1,19 @@
 from typing import Literal
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, BackgroundTasks, Depends, Request
 from sqlalchemy.orm import Session
 from sqlalchemy import asc, case, delete, desc, select, and_, update, func
 from fastapi import HTTPException, status
 from fastapi.responses import JSONResponse
 
-from app import schemas, database
+from app import schemas, database, services
 from app.lib.errors import CustomException
 from app.models import DSAQuestion, Job, QuizQuestion, Recruiter
-from app.dependencies.authorization import authorize_recruiter
+from app.dependencies.authorization import (
+    RecruiterPrincipal,
+    authorize_recruiter,
+    authorize_recruiter_principal,
+    job_ids_cache,
+)
 from app.configs import openai
 
 router = APIRouter()
@@ -17,6 +22,7 @@ router = APIRouter()
 @router.post("")
 async def create_job(
     job_data: schemas.CreateJob,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(database.get_db),
     recruiter_id=Depends(authorize_recruiter),
 ):
@@ -47,6 +53,9 @@ async def create_job(
     db.add(job)
     db.commit()
     db.refresh(job)
+    background_tasks.add_task(
+        services.question_pool.schedule_question_pool_generation, job.id
+    )
     return job
 
 
@@ -284,6 +293,7 @@ async def generate_requirements(generate_jr_data: schemas.GenerateJobRequirement
 @router.put("")
 async def update_job(
     job_data: schemas.UpdateJob,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(database.get_db),
     recruiter_id=Depends(authorize_recruiter),
 ):
@@ -314,6 +324,10 @@ async def update_job(
     result = db.execute(stmt)
     db.commit()
     job = result.all()[0]._mapping
+    if job_data.keys() & {"title", "description", "requirements"}:
+        background_tasks.add_task(
+            services.question_pool.schedule_question_pool_generation, job_id
+        )
     return job
 
 
@@ -321,20 +335,19 @@ async def update_job(
 async def delete_job(
     id: str,
     db: Session = Depends(database.get_db),
-    recruiter_id=Depends(authorize_recruiter),
+    recruiter: RecruiterPrincipal = Depends(authorize_recruiter_principal),
 ):
-    stmt = select(Job).where(and_(Job.id == int(id), Job.company_id == recruiter_id))
-    result = db.execute(stmt)
-    job = result.scalar_one_or_none()
-
-    if not job:
+    if not recruiter.owns_job(id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Job not found or you don't have permission to delete it",
         )
 
     # Delete the job
-    stmt = delete(Job).where(and_(Job.id == int(id), Job.company_id == recruiter_id))
+    stmt = delete(Job).where(and_(Job.id == int(id), Job.company_id == recruiter.id))
     db.execute(stmt)
     db.commit()
+    # Other workers keep listing the job until their entry is evicted, which
+    # only lets requests through to queries that no longer find it.
+    job_ids_cache.delete(recruiter.id)
     return
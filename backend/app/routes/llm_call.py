@@ -0,0 +1,48 @@
+import datetime
+from fastapi import APIRouter, Depends
+from sqlalchemy import desc, func, select
+from sqlalchemy.orm import Session
+
+from app import database
+from app.dependencies.authorization import authorize_operator
+from app.models import LLMCall
+
+router = APIRouter()
+
+
+@router.get("/stats")
+async def get_llm_call_stats(
+    since_hours: int = 24,
+    db: Session = Depends(database.get_db),
+    operator=Depends(authorize_operator),
+):
+    since = datetime.datetime.now() - datetime.timedelta(hours=since_hours)
+
+    stmt = (
+        select(
+            LLMCall.route,
+            LLMCall.model,
+            LLMCall.endpoint,
+            func.count(LLMCall.id).label("calls"),
+            func.count(LLMCall.id)
+            .filter(LLMCall.outcome != "success")
+            .label("errors"),
+            func.sum(LLMCall.retries).label("retries"),
+            func.percentile_cont(0.5)
+            .within_group(LLMCall.latency_ms)
+            .label("p50_latency_ms"),
+            func.percentile_cont(0.95)
+            .within_group(LLMCall.latency_ms)
+            .label("p95_latency_ms"),
+            func.percentile_cont(0.99)
+            .within_group(LLMCall.latency_ms)
+            .label("p99_latency_ms"),
+            func.sum(LLMCall.prompt_tokens).label("prompt_tokens"),
+            func.sum(LLMCall.completion_tokens).label("completion_tokens"),
+            func.sum(LLMCall.cost_usd).label("cost_usd"),
+        )
+        .where(LLMCall.created_at >= since)
+        .group_by(LLMCall.route, LLMCall.model, LLMCall.endpoint)
+        .order_by(desc("calls"))
+    )
+    return db.execute(stmt).mappings().all()
@@ -0,0 +1,11 @@
+from fastapi import APIRouter, Request
+
+from app.configs.storage import storage
+from app.lib import media
+
+router = APIRouter()
+
+
+@router.get("/{key:path}")
+async def get_media(key: str, request: Request):
+    return await media.serve(storage, key, request)
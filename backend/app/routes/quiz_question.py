@@ -1,14 +1,16 @@
-import os
 from typing import Annotated, Optional
 from fastapi import APIRouter, Depends, File, Form, HTTPException, Response, UploadFile
 from sqlalchemy import delete, select, update
 from sqlalchemy.orm import Session
-from os import path
 
-from app import config, database, schemas
+from app import database, schemas
+from app.configs.storage import storage
+from app.lib.storage import content_key
 from app.dependencies.authorization import (
+    RecruiterPrincipal,
     authorize_candidate,
     authorize_recruiter,
+    authorize_recruiter_principal,
 )
 from app.models import Interview, Job, QuizOption, QuizQuestion
 
@@ -24,7 +26,7 @@ async def create_quiz_question(
     time_seconds: Optional[int] = Form(None),
     image: UploadFile = File(None),
     db: Session = Depends(database.get_db),
-    recruiter_id=Depends(authorize_recruiter),
+    recruiter: RecruiterPrincipal = Depends(authorize_recruiter_principal),
 ):
     quiz_question = QuizQuestion(
         description=description,
@@ -33,23 +35,17 @@ async def create_quiz_question(
         job_id=job_id,
         time_seconds=time_seconds,
     )
-    db.add(quiz_question)
-    db.commit()
+    with recruiter.writing_to_job(job_id):
+        db.add(quiz_question)
+        db.commit()
     db.refresh(quiz_question)
 
     if image and image.filename:
-        if not path.exists(path.join("uploads", "image")):
-            os.makedirs(path.join("uploads", "image"))
+        data = await image.read()
+        key = content_key("image/quiz", data, "png")
+        await storage.put(key, data, "image/png")
 
-        with open(
-            path.join("uploads", "image", f"quiz_{quiz_question.id}.png"), "wb"
-        ) as f:
-            for chunk in image.file:
-                f.write(chunk)
-
-        quiz_question.image_url = (
-            f"{config.settings.URL}/uploads/image/quiz_{quiz_question.id}.png"
-        )
+        quiz_question.image_url = storage.url(key)
         db.commit()
         db.refresh(quiz_question)
 
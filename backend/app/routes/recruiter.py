@@ -1,14 +1,23 @@
 import datetime
-from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    Request,
+    Response,
+    status,
+)
 from sqlalchemy.orm import Session
 from sqlalchemy import Float, func, select, update
+from sqlalchemy.dialects.postgresql import insert
 import random
 
 from app import config, database, models, schemas
 from app import services
 from app.dependencies.authorization import authorize_recruiter
 from app.lib.errors import CustomException
-from app.models import Recruiter
+from app.models import Recruiter, RetentionPolicy
 from app.services import brevo
 from app.utils import security
 from app.utils import jwt
@@ -111,6 +120,42 @@ async def get_recruiter(
     return recruiter
 
 
+@router.get("/retention-policy", response_model=schemas.RetentionPolicy)
+async def get_retention_policy(
+    db: Session = Depends(database.get_db),
+    recruiter_id=Depends(authorize_recruiter),
+):
+    stmt = select(RetentionPolicy).where(RetentionPolicy.recruiter_id == recruiter_id)
+    policy = db.execute(stmt).scalar_one_or_none()
+    if policy is None:
+        return schemas.RetentionPolicy(action=config.settings.RETENTION_DEFAULT_ACTION)
+    return policy
+
+
+@router.put("/retention-policy", response_model=schemas.RetentionPolicy)
+async def update_retention_policy(
+    policy_data: schemas.RetentionPolicy,
+    db: Session = Depends(database.get_db),
+    recruiter_id=Depends(authorize_recruiter),
+):
+    data = policy_data.model_dump()
+    for name, days in data.items():
+        if name.endswith("_days") and days is not None and days < 0:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"{name} cannot be negative",
+            )
+
+    stmt = insert(RetentionPolicy).values(recruiter_id=recruiter_id, **data)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[RetentionPolicy.recruiter_id],
+        set_={**data, "updated_at": func.now()},
+    ).returning(RetentionPolicy)
+    policy = db.execute(stmt).scalar_one()
+    db.commit()
+    return policy
+
+
 @router.put("")
 async def upate_recruiter(
     request: Request,
@@ -242,32 +287,50 @@ async def verify_otp(
 @router.post("/interview-question")
 async def create_interview_questions(
     interview_question_data: schemas.CreateInterviewQuestion,
+    background_tasks: BackgroundTasks,
     recruiter_id: int = Depends(authorize_recruiter),
     db: Session = Depends(database.get_db),
 ):
-    return services.interview_question.create_interview_question(
+    interview_question = services.interview_question.create_interview_question(
         interview_question_data, db
     )
+    background_tasks.add_task(
+        services.question_pool.schedule_question_pool_generation,
+        interview_question["job_id"],
+    )
+    return interview_question
 
 
 @router.put("/interview-question")
 async def update_interview_question(
     interview_question_data: schemas.UpdateInterviewQuestion,
+    background_tasks: BackgroundTasks,
     recruiter_id: int = Depends(authorize_recruiter),
     db: Session = Depends(database.get_db),
 ):
-    return services.interview_question.update_interview_question(
+    job_id = services.interview_question.update_interview_question(
         interview_question_data, db
     )
+    if job_id:
+        background_tasks.add_task(
+            services.question_pool.schedule_question_pool_generation, job_id
+        )
+    return
 
 
 @router.delete("/interview-question")
 async def delete_interview_question(
     id: int,
+    background_tasks: BackgroundTasks,
     recruiter_id: int = Depends(authorize_recruiter),
     db: Session = Depends(database.get_db),
 ):
-    return services.interview_question.delete_interview_question(id, db)
+    job_id = services.interview_question.delete_interview_question(id, db)
+    if job_id:
+        background_tasks.add_task(
+            services.question_pool.schedule_question_pool_generation, job_id
+        )
+    return
 
 
 @router.get("/interview-question")
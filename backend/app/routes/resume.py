@@ -1,5 +1,5 @@
 import json
-from fastapi import APIRouter, File, Request, UploadFile
+from fastapi import APIRouter, File, HTTPException, Request, UploadFile, status
 from pypdf import PdfReader
 
 from app.configs import openai
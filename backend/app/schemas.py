@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import List, Literal, Optional
 from pydantic import BaseModel
 from pydantic import validator
 
@@ -32,6 +32,16 @@ class UpdateRecruiter(BaseModel):
     address: Optional[str] = None
 
 
+class RetentionPolicy(BaseModel):
+    # Days media is kept after the interview. None uses the default, 0 keeps
+    # it forever.
+    video_days: Optional[int] = None
+    screenshot_days: Optional[int] = None
+    resume_days: Optional[int] = None
+    report_days: Optional[int] = None
+    action: Literal["delete", "archive"] = "delete"
+
+
 class RecruiterLogin(BaseModel):
     email: str
     password: str
@@ -220,6 +230,7 @@ class CreateDSAResponse(BaseModel):
     language: str
     code: str
     question_id: int
+    mode: Literal["run", "submit"] = "submit"
 
 
 class UpdateDSAResponse(BaseModel):
@@ -1 +1,11 @@
-from . import interview_question, interview_question_response
+from . import (
+    answer_evaluation,
+    code_execution,
+    interview_question,
+    interview_question_response,
+    question_pool,
+    recording,
+    retention,
+    screenshot,
+    transcoding,
+)
@@ -0,0 +1,278 @@
+import asyncio
+import json
+import logging
+
+from sqlalchemy import and_, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app import database
+from app.configs import openai
+from app.models import (
+    AnswerEvaluation,
+    Interview,
+    InterviewQuestion,
+    InterviewQuestionAndResponse,
+    InterviewQuestionResponse,
+    Job,
+)
+
+logger = logging.getLogger(__name__)
+
+MAX_SUGGESTIONS = 5
+
+
+async def evaluate_answer(
+    interview_id: int,
+    answer: str,
+    question: str = None,
+    question_type: str = None,
+    question_order: int = None,
+    question_id: int = None,
+):
+    """Score a single answer right after it is submitted.
+
+    Runs as a background task so that by the time the interview ends every
+    answer already has a score, and `generate_feedback` only has to aggregate.
+    Answers to custom questions pass `question_id` and the question is looked up.
+    """
+    db = database.SessionLocal()
+    try:
+        if question is None:
+            stmt = select(
+                InterviewQuestion.question, InterviewQuestion.question_type
+            ).where(InterviewQuestion.id == question_id)
+            question, question_type = db.execute(stmt).one()
+
+        stmt = (
+            select(Job.title, Job.description, Job.requirements)
+            .join(Interview)
+            .where(Interview.id == interview_id)
+        )
+        job = db.execute(stmt).mappings().one()
+
+        prompt = f"""
+        You are evaluating one answer from an interview. The candidate is applying for a specific job. Carefully analyze the answer and assess it. Be critical, especially when the answer is insufficient or irrelevant.
+
+        Follow these rules:
+        - If the candidate gave a minimal response (e.g., just "hello" or didn't answer), clearly reflect this in the score and feedback.
+        - Use the job role's requirements (implied or given) to evaluate the answer.
+        - Do NOT be generous with scores if there is no evidence of skill.
+        - Score only the dimensions this answer gives evidence for, and use your best judgement for the others.
+
+        Return ONLY a JSON object with this exact format:
+        {{
+            "feedback_for_candidate": "One or two sentences of specific feedback on this answer",
+            "feedback_for_recruiter": "One or two sentences on what this answer shows about the candidate's suitability",
+            "score": number between 0 and 100,
+            "scoreBreakdown": {{
+                "technicalSkills": number between 0 and 100,
+                "communication": number between 0 and 100,
+                "problemSolving": number between 0 and 100,
+                "culturalFit": number between 0 and 100
+            }},
+            "suggestions": [
+                "Concrete, actionable suggestions for the candidate, if any"
+            ],
+            "keywords": [
+                {{
+                    "term": "string",
+                    "count": number,
+                    "sentiment": "positive" | "neutral" | "negative"
+                }}
+            ]
+        }}
+
+        Position: {job.title}
+
+        Recruiter: {question} (question type: {question_type})
+
+        Candidate: {answer}
+
+        Job Description:
+        {job.description}
+
+        Job Requirements:
+        {job.requirements}
+        """
+
+        response = await openai.client.chat.completions.create(
+            model="gpt-3.5-turbo",
+            messages=[
+                {
+                    "role": "system",
+                    "content": "You are an expert interviewer and evaluator. Provide concise, constructive feedback.",
+                },
+                {"role": "user", "content": prompt},
+            ],
+            temperature=0.1,
+            response_format={"type": "json_object"},
+        )
+        evaluation = json.loads(response.choices[0].message.content)
+
+        stmt = insert(AnswerEvaluation).values(
+            interview_id=interview_id,
+            question_order=question_order,
+            question_id=question_id,
+            score=int(evaluation["score"]),
+            technical_skills_score=int(evaluation["scoreBreakdown"]["technicalSkills"]),
+            communication_skills_score=int(
+                evaluation["scoreBreakdown"]["communication"]
+            ),
+            problem_solving_skills_score=int(
+                evaluation["scoreBreakdown"]["problemSolving"]
+            ),
+            cultural_fit_score=int(evaluation["scoreBreakdown"]["culturalFit"]),
+            feedback_for_candidate=evaluation["feedback_for_candidate"],
+            feedback_for_recruiter=evaluation["feedback_for_recruiter"],
+            suggestions=evaluation.get("suggestions") or [],
+            keywords=evaluation.get("keywords") or [],
+        )
+        db.execute(stmt.on_conflict_do_nothing())
+        db.commit()
+    except Exception as e:
+        logger.error(f"Failed to evaluate answer for interview {interview_id}: {e}")
+    finally:
+        db.close()
+
+
+def _unevaluated_answers(interview_id: int, db: Session):
+    """Submitted answers without an evaluation, as keyword arguments for
+    `evaluate_answer`."""
+    evaluated_order = (
+        select(AnswerEvaluation.id)
+        .where(
+            and_(
+                AnswerEvaluation.interview_id == interview_id,
+                AnswerEvaluation.question_order
+                == InterviewQuestionAndResponse.order_number,
+            )
+        )
+        .exists()
+    )
+    stmt = select(
+        InterviewQuestionAndResponse.question,
+        InterviewQuestionAndResponse.question_type,
+        InterviewQuestionAndResponse.order_number,
+        InterviewQuestionAndResponse.answer,
+    ).where(
+        and_(
+            InterviewQuestionAndResponse.interview_id == interview_id,
+            InterviewQuestionAndResponse.answer.is_not(None),
+            ~evaluated_order,
+        )
+    )
+    answers = [
+        {
+            "answer": row["answer"],
+            "question": row["question"],
+            "question_type": row["question_type"],
+            "question_order": row["order_number"],
+        }
+        for row in db.execute(stmt).mappings().all()
+    ]
+
+    evaluated_question = (
+        select(AnswerEvaluation.id)
+        .where(
+            and_(
+                AnswerEvaluation.interview_id == interview_id,
+                AnswerEvaluation.question_id == InterviewQuestionResponse.question_id,
+            )
+        )
+        .exists()
+    )
+    stmt = select(
+        InterviewQuestionResponse.question_id, InterviewQuestionResponse.answer
+    ).where(
+        and_(
+            InterviewQuestionResponse.interview_id == interview_id,
+            ~evaluated_question,
+        )
+    )
+    answers += [
+        {"answer": row["answer"], "question_id": row["question_id"]}
+        for row in db.execute(stmt).mappings().all()
+    ]
+    return answers
+
+
+async def evaluate_missing(interview_id: int, db: Session):
+    """Evaluate, all at once, the answers whose background evaluation has not
+    finished or failed, so the interview can be aggregated without waiting."""
+    answers = _unevaluated_answers(interview_id, db)
+    db.commit()
+    if answers:
+        await asyncio.gather(
+            *(evaluate_answer(interview_id, **answer) for answer in answers)
+        )
+
+
+def aggregate_evaluations(interview_id: int, db: Session):
+    """Combine per-answer evaluations into the shape `generate_feedback` returns.
+
+    Returns None while any submitted answer is still missing its evaluation, so
+    the caller can fall back to scoring the whole transcript. Call
+    `evaluate_missing` first so that only happens when an evaluation fails.
+    """
+    answered_count = db.execute(
+        select(func.count())
+        .select_from(InterviewQuestionAndResponse)
+        .where(
+            and_(
+                InterviewQuestionAndResponse.interview_id == interview_id,
+                InterviewQuestionAndResponse.answer.is_not(None),
+            )
+        )
+    ).scalar() + db.execute(
+        select(func.count())
+        .select_from(InterviewQuestionResponse)
+        .where(InterviewQuestionResponse.interview_id == interview_id)
+    ).scalar()
+
+    stmt = (
+        select(AnswerEvaluation)
+        .where(AnswerEvaluation.interview_id == interview_id)
+        .order_by(AnswerEvaluation.question_order, AnswerEvaluation.question_id)
+    )
+    evaluations = db.execute(stmt).scalars().all()
+
+    if not evaluations or len(evaluations) < answered_count:
+        return None
+
+    def average(column):
+        return round(sum(getattr(e, column) or 0 for e in evaluations) / len(evaluations))
+
+    suggestions = []
+    keywords = {}
+    for evaluation in evaluations:
+        for suggestion in evaluation.suggestions or []:
+            if suggestion and suggestion not in suggestions:
+                suggestions.append(suggestion)
+        for keyword in evaluation.keywords or []:
+            term = str(keyword.get("term", "")).strip()
+            if not term:
+                continue
+            merged = keywords.setdefault(
+                term.lower(),
+                {"term": term, "count": 0, "sentiment": keyword.get("sentiment")},
+            )
+            merged["count"] += int(keyword.get("count") or 1)
+
+    return {
+        "feedback_for_candidate": "\n\n".join(
+            e.feedback_for_candidate for e in evaluations if e.feedback_for_candidate
+        ),
+        "feedback_for_recruiter": "\n\n".join(
+            e.feedback_for_recruiter for e in evaluations if e.feedback_for_recruiter
+        ),
+        "score": average("score"),
+        "scoreBreakdown": {
+            "technicalSkills": average("technical_skills_score"),
+            "communication": average("communication_skills_score"),
+            "problemSolving": average("problem_solving_skills_score"),
+            "culturalFit": average("cultural_fit_score"),
+        },
+        "suggestions": suggestions[:MAX_SUGGESTIONS],
+        "keywords": sorted(keywords.values(), key=lambda k: k["count"], reverse=True),
+    }
@@ -0,0 +1,6 @@
+from .backends import backend, fermion_backend, local_backend, submit
+from .base import ExecutionBackend, ExecutionResult, unpack_output
+from .cache import source_hash
+from .fermion import parse_callback
+from .grading import process_result, process_results, result_batcher
+from .scheduler import schedule
@@ -0,0 +1,36 @@
+import logging
+from typing import List
+
+from app.config import settings
+from app.lib.errors import CustomException
+
+from . import grading
+from .base import ExecutionBackend
+from .fermion import FermionBackend
+from .local import LocalBackend
+
+logger = logging.getLogger(__name__)
+
+fermion_backend = FermionBackend()
+local_backend = LocalBackend(on_result=grading.result_batcher.add)
+
+backend: ExecutionBackend = (
+    local_backend if settings.CODE_EXECUTION_BACKEND == "local" else fermion_backend
+)
+
+
+async def submit(language: str, code: str, test_cases: List[dict]):
+    """Submit to the configured backend, falling back to the local runner when
+    Fermion is unreachable, `CODE_EXECUTION_FALLBACK_TO_LOCAL` is set and
+    the local runner is sandboxed."""
+    try:
+        return await backend.submit(language, code, test_cases)
+    except CustomException as e:
+        if backend is local_backend or not settings.CODE_EXECUTION_FALLBACK_TO_LOCAL:
+            raise
+        # Fallback traffic is real candidate code, so never run it unsandboxed.
+        if not await local_backend.sandboxed():
+            logger.error(f"{backend.name} unavailable ({e}), cannot fall back")
+            raise
+        logger.warning(f"{backend.name} unavailable ({e}), running locally")
+        return await local_backend.submit(language, code, test_cases)
@@ -0,0 +1,83 @@
+import base64
+import json
+import zlib
+from dataclasses import dataclass
+from typing import List, Optional
+
+from app.config import settings
+
+# Limits applied to every test case run, by both backends.
+CPU_TIME_LIMIT_MS = 2000
+WALL_TIME_LIMIT_MS = 5000
+MEMORY_LIMIT_KB = 131072
+STACK_SIZE_LIMIT_KB = 65536
+MAX_FILE_SIZE_KB = 1024
+MAX_PROCESSES = 60
+
+
+@dataclass
+class ExecutionResult:
+    """Outcome of running one test case, with every field already decoded."""
+
+    task_id: str
+    status: str
+    input: str = ""
+    stdout: str = ""
+    stderr: str = ""
+    compiler_output: str = ""
+    cpu_time_ms: Optional[int] = None
+    wall_time_ms: Optional[int] = None
+    memory_kb: Optional[int] = None
+
+
+class ExecutionBackend:
+    """Runs a submission against a question's test cases.
+
+    `submit` returns one task id per test case, in order, and results are
+    reported later through `grading.process_result`. Results may arrive as
+    soon as the caller next yields to the event loop, so the pending rows for
+    the returned task ids must be written before awaiting anything else.
+    """
+
+    name: str
+
+    async def submit(self, language: str, code: str, test_cases: List[dict]):
+        raise NotImplementedError
+
+
+def b64encode(value: str):
+    return base64.urlsafe_b64encode(value.encode()).decode().rstrip("=")
+
+
+def b64decode(value: Optional[str]):
+    if not value:
+        return ""
+    return base64.urlsafe_b64decode(value + "=" * (-len(value) % 4)).decode(
+        errors="replace"
+    )
+
+
+def truncate(text: str):
+    limit = settings.DSA_STORED_OUTPUT_MAX_CHARS
+    if not text or len(text) <= limit:
+        return text
+    return text[:limit] + f"\n... truncated {len(text) - limit} characters"
+
+
+def pack_output(result: ExecutionResult):
+    """Truncated output of a result, as compressed bytes for storage."""
+    return zlib.compress(
+        json.dumps(
+            {
+                "stdout": truncate(result.stdout),
+                "stderr": truncate(result.stderr),
+                "compiler_output": truncate(result.compiler_output),
+            }
+        ).encode()
+    )
+
+
+def unpack_output(output: Optional[bytes]):
+    if not output:
+        return {"stdout": "", "stderr": "", "compiler_output": ""}
+    return json.loads(zlib.decompress(output))
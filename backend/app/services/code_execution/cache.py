@@ -0,0 +1,114 @@
+import hashlib
+import uuid
+from typing import List
+
+from sqlalchemy import and_, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models import DSAExecutionCache
+
+from .base import ExecutionResult
+
+CACHE_TASK_PREFIX = "cache-"
+
+# Outcomes that depend on load or on the runner rather than on the code.
+UNCACHEABLE_STATUSES = {
+    "time-limit-exceeded",
+    "internal-isolate-error",
+    "unknown",
+    "unsupported-language",
+}
+
+
+def source_hash(code: str):
+    """Hash of the source with line endings and trailing whitespace normalized,
+    so that resubmitting the same code from another editor still hits."""
+    lines = [line.rstrip() for line in code.replace("\r\n", "\n").split("\n")]
+    normalized = "\n".join(lines).strip("\n")
+    return hashlib.sha256(normalized.encode()).hexdigest()
+
+
+def lookup(language: str, code_hash: str, test_cases: List[dict], db: Session):
+    """Cached results for the given test cases, keyed by test case id.
+
+    Each test case must carry its `revision`, so results recorded before the
+    test case was edited are never returned.
+    """
+    stmt = select(DSAExecutionCache).where(
+        and_(
+            DSAExecutionCache.language == language,
+            DSAExecutionCache.source_hash == code_hash,
+            tuple_(
+                DSAExecutionCache.dsa_test_case_id,
+                DSAExecutionCache.test_case_revision,
+            ).in_([(test_case["id"], test_case["revision"]) for test_case in test_cases]),
+        )
+    )
+    inputs = {test_case["id"]: test_case["input"] for test_case in test_cases}
+    return {
+        entry.dsa_test_case_id: ExecutionResult(
+            task_id=f"{CACHE_TASK_PREFIX}{uuid.uuid4()}",
+            status=entry.status,
+            input=inputs[entry.dsa_test_case_id],
+            stdout=entry.stdout,
+            stderr=entry.stderr,
+            compiler_output=entry.compiler_output,
+        )
+        for entry in db.execute(stmt).scalars().all()
+    }
+
+
+def insert_cte(response, test_case_response):
+    """A CTE caching freshly recorded results, for the statement recording them.
+
+    `response` returns the updated DSA response rows and `test_case_response`
+    the updated test case response rows along with their incoming results.
+    Results are cached under the test case revision that was dispatched, so
+    one for a case edited while it ran is never served for the new revision.
+    Uncacheable statuses and replayed cache hits are left out.
+    """
+    source = (
+        select(
+            response.c.language,
+            response.c.source_hash,
+            test_case_response.c.dsa_test_case_id,
+            test_case_response.c.test_case_revision,
+            test_case_response.c.status,
+            test_case_response.c.stdout,
+            test_case_response.c.stderr,
+            test_case_response.c.compiler_output,
+        )
+        .select_from(response)
+        .join(
+            test_case_response,
+            test_case_response.c.dsa_response_id == response.c.id,
+        )
+        .where(
+            and_(
+                response.c.language.is_not(None),
+                response.c.source_hash.is_not(None),
+                test_case_response.c.test_case_revision.is_not(None),
+                test_case_response.c.status.not_in(UNCACHEABLE_STATUSES),
+                test_case_response.c.task_id.not_like(f"{CACHE_TASK_PREFIX}%"),
+            )
+        )
+    )
+    stmt = insert(DSAExecutionCache).from_select(
+        [
+            "language",
+            "source_hash",
+            "dsa_test_case_id",
+            "test_case_revision",
+            "status",
+            "stdout",
+            "stderr",
+            "compiler_output",
+        ],
+        source,
+    )
+    return (
+        stmt.on_conflict_do_nothing()
+        .returning(DSAExecutionCache.dsa_test_case_id)
+        .cte("cached")
+    )
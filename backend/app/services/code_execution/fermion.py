@@ -0,0 +1,80 @@
+from typing import List
+
+from app import config
+from app.configs import fermion
+
+from .base import (
+    CPU_TIME_LIMIT_MS,
+    MAX_FILE_SIZE_KB,
+    MAX_PROCESSES,
+    MEMORY_LIMIT_KB,
+    STACK_SIZE_LIMIT_KB,
+    WALL_TIME_LIMIT_MS,
+    ExecutionBackend,
+    ExecutionResult,
+    b64decode,
+    b64encode,
+)
+
+
+class FermionBackend(ExecutionBackend):
+    """Remote execution through the Fermion batch API.
+
+    Results are posted back to `/dsa-response/callback` and parsed with
+    `parse_callback`.
+    """
+
+    name = "fermion"
+
+    async def submit(self, language: str, code: str, test_cases: List[dict]):
+        entries = []
+        for test_case in test_cases:
+            entries.append(
+                {
+                    "language": language,
+                    "runConfig": {
+                        "customMatcherToUseForExpectedOutput": "IgnoreWhitespaceAtStartAndEndForEveryLine",
+                        "expectedOutputAsBase64UrlEncoded": b64encode(
+                            test_case["expected_output"]
+                        ),
+                        "stdinStringAsBase64UrlEncoded": b64encode(test_case["input"]),
+                        "callbackUrlOnExecutionCompletion": config.settings.URL
+                        + "/dsa-response/callback",
+                        "shouldEnablePerProcessAndThreadCpuTimeLimit": False,
+                        "shouldEnablePerProcessAndThreadMemoryLimit": False,
+                        "shouldAllowInternetAccess": False,
+                        # "compilerFlagString": "",
+                        "maxFileSizeInKilobytesFilesCreatedOrModified": MAX_FILE_SIZE_KB,
+                        "stackSizeLimitInKilobytes": STACK_SIZE_LIMIT_KB,
+                        "cpuTimeLimitInMilliseconds": CPU_TIME_LIMIT_MS,
+                        "wallTimeLimitInMilliseconds": WALL_TIME_LIMIT_MS,
+                        "memoryLimitInKilobyte": MEMORY_LIMIT_KB,
+                        "maxProcessesAndOrThreads": MAX_PROCESSES,
+                    },
+                    "sourceCodeAsBase64UrlEncoded": b64encode(code),
+                }
+            )
+
+        result = await fermion.client.post_json(
+            "/request-dsa-code-execution-batch",
+            {"data": [{"data": {"entries": entries}}]},
+        )
+        return result[0]["output"]["data"]["taskIds"]
+
+
+def parse_callback(data: dict):
+    run_result = data["runResult"]
+    program_run_data = run_result["programRunData"] or {}
+    return ExecutionResult(
+        task_id=data["taskUniqueId"],
+        status=run_result["runStatus"],
+        input=b64decode(data["runConfig"]["stdinStringAsBase64UrlEncoded"]),
+        stdout=b64decode(program_run_data.get("stdoutBase64UrlEncoded")),
+        stderr=b64decode(program_run_data.get("stderrBase64UrlEncoded")),
+        compiler_output=b64decode(
+            run_result["compilerOutputAfterCompilationBase64UrlEncoded"]
+        ),
+        cpu_time_ms=program_run_data.get("cpuTimeUsedInMilliseconds"),
+        wall_time_ms=program_run_data.get("wallTimeUsedInMilliseconds"),
+        memory_kb=program_run_data.get("memoryUsedInKilobyte"),
+    )
@@ -0,0 +1,262 @@
+import asyncio
+import logging
+from collections import defaultdict
+from typing import List
+
+from sqlalchemy import (
+    Integer,
+    LargeBinary,
+    String,
+    and_,
+    cast,
+    column,
+    func,
+    select,
+    update,
+    values,
+)
+from sqlalchemy.orm import Session
+
+from app import database
+from app.config import settings
+from app.configs.pubsub import interview_connection_manager
+from app.lib.batcher import MicroBatcher
+from app.models import DSAResponse, DSATestCase, DSATestCaseResponse
+
+from . import cache, scheduler
+from .base import ExecutionResult, pack_output, truncate
+
+logger = logging.getLogger(__name__)
+
+
+def _record_statement(results: List[ExecutionResult]):
+    """One statement that records a batch of results and returns everything
+    needed to notify candidates and move their runs along.
+
+    Results are joined in as a VALUES list. A test case response only changes
+    while it is still pending, which makes duplicate callbacks no-ops, and the
+    counters on each DSA response are bumped once for all of its rows that
+    actually changed.
+
+    Postgres types a VALUES column that is NULL in every row as text, which
+    local results and cache hits (no CPU time or memory) always produce, so
+    the integer columns are cast back when they are written.
+    """
+    incoming = values(
+        column("task_id", String),
+        column("status", String),
+        column("stdout", String),
+        column("stderr", String),
+        column("compiler_output", String),
+        column("output", LargeBinary),
+        column("cpu_time_ms", Integer),
+        column("wall_time_ms", Integer),
+        column("memory_kb", Integer),
+        name="incoming",
+    ).data(
+        [
+            (
+                result.task_id,
+                result.status,
+                truncate(result.stdout),
+                truncate(result.stderr),
+                truncate(result.compiler_output),
+                pack_output(result),
+                result.cpu_time_ms,
+                result.wall_time_ms,
+                result.memory_kb,
+            )
+            for result in results
+        ]
+    )
+
+    updated = (
+        update(DSATestCaseResponse)
+        .values(
+            status=incoming.c.status,
+            output=incoming.c.output,
+            cpu_time_ms=cast(incoming.c.cpu_time_ms, Integer),
+            wall_time_ms=cast(incoming.c.wall_time_ms, Integer),
+            memory_kb=cast(incoming.c.memory_kb, Integer),
+        )
+        .where(
+            and_(
+                DSATestCaseResponse.task_id == incoming.c.task_id,
+                DSATestCaseResponse.status == "pending",
+            )
+        )
+        .returning(
+            DSATestCaseResponse.dsa_response_id,
+            DSATestCaseResponse.dsa_test_case_id,
+            DSATestCaseResponse.test_case_revision,
+            incoming.c.task_id,
+            incoming.c.status,
+            incoming.c.stdout,
+            incoming.c.stderr,
+            incoming.c.compiler_output,
+        )
+        .cte("updated")
+    )
+    tallied = (
+        select(
+            updated.c.dsa_response_id,
+            func.count().filter(updated.c.status == "successful").label("passed"),
+            func.count().filter(updated.c.status != "successful").label("failed"),
+        )
+        .group_by(updated.c.dsa_response_id)
+        .subquery("tallied")
+    )
+    counted = (
+        update(DSAResponse)
+        .values(
+            passed_count=DSAResponse.passed_count + tallied.c.passed,
+            failed_count=DSAResponse.failed_count + tallied.c.failed,
+            passed=and_(
+                DSAResponse.passed_count + tallied.c.passed == DSAResponse.total_count,
+                DSAResponse.failed_count + tallied.c.failed == 0,
+            ),
+        )
+        .where(DSAResponse.id == tallied.c.dsa_response_id)
+        .returning(
+            DSAResponse.id,
+            DSAResponse.interview_id,
+            DSAResponse.language,
+            DSAResponse.code,
+            DSAResponse.source_hash,
+            DSAResponse.mode,
+            DSAResponse.passed,
+            DSAResponse.total_count,
+            DSAResponse.dispatched_count,
+            DSAResponse.passed_count,
+            DSAResponse.failed_count,
+        )
+        .cte("counted")
+    )
+    stmt = (
+        select(
+            counted,
+            updated.c.task_id,
+            updated.c.dsa_test_case_id,
+            DSATestCase.input.label("test_case_input"),
+            DSATestCase.expected_output,
+        )
+        .select_from(counted)
+        .join(updated, updated.c.dsa_response_id == counted.c.id)
+        .join(DSATestCase, DSATestCase.id == updated.c.dsa_test_case_id)
+        .add_cte(cache.insert_cte(counted, updated))
+    )
+    return stmt
+
+
+async def process_results(results: List[ExecutionResult], db: Session):
+    """Record test case results and notify the candidates.
+
+    Shared by the Fermion callbacks, the local runner and cache hits.
+    """
+    by_task_id = {result.task_id: result for result in results}
+    if not by_task_id:
+        return
+    rows = (
+        db.execute(_record_statement(list(by_task_id.values()))).mappings().all()
+    )
+    db.commit()
+
+    # Rows for task ids that are missing were duplicates, or belonged to a run
+    # that has since been resubmitted.
+    events = defaultdict(list)
+    responses = {}
+    for row in rows:
+        result = by_task_id[row["task_id"]]
+        entry = responses.setdefault(row["id"], {"row": row, "passed": True})
+        if result.status == "successful":
+            continue
+        entry["passed"] = False
+        events[row["interview_id"]].append(
+            {
+                "taskUID": result.task_id,
+                "input": result.input,
+                "event": "execution_result",
+                "status": "failed",
+                **_counts(row),
+                "failed_test_case": {
+                    "test_case_id": row["dsa_test_case_id"],
+                    "status": result.status,
+                    "execution_err": result.stderr,
+                    "compilation_output": result.compiler_output,
+                    "input": row["test_case_input"],
+                    "expected_output": row["expected_output"],
+                    "output": result.stdout,
+                },
+            }
+        )
+    for entry in responses.values():
+        if entry["row"]["passed"]:
+            events[entry["row"]["interview_id"]].append(
+                {
+                    "event": "execution_result",
+                    "status": "successful",
+                    **_counts(entry["row"]),
+                }
+            )
+
+    await asyncio.gather(
+        *(
+            interview_connection_manager.send_many(interview_id, interview_events)
+            for interview_id, interview_events in events.items()
+        )
+    )
+
+    for entry in responses.values():
+        try:
+            await scheduler.advance(entry["row"], entry["passed"], db)
+        except Exception as e:
+            logger.error(f"Failed to advance DSA response {entry['row']['id']}: {e!r}")
+            await _abandon(entry["row"], db)
+
+
+async def _abandon(row, db: Session):
+    """Fail a run that could not be moved along, and tell the candidate."""
+    try:
+        db.rollback()
+        scheduler.abandon(row["id"], db)
+        await interview_connection_manager.send_data(
+            row["interview_id"],
+            {
+                "event": "execution_result",
+                "status": "error",
+                "error": "Could not run the remaining test cases, "
+                "please run your code again",
+                **_counts(row),
+            },
+        )
+    except Exception as e:
+        logger.error(f"Failed to abandon DSA response {row['id']}: {e!r}")
+
+
+async def process_result(result: ExecutionResult, db: Session):
+    await process_results([result], db)
+
+
+def _counts(row):
+    return {
+        "passed_count": row["passed_count"],
+        "failed_count": row["failed_count"],
+        "total_count": row["total_count"],
+    }
+
+
+async def _record_batch(results: List[ExecutionResult]):
+    db = database.SessionLocal()
+    try:
+        await process_results(results, db)
+    finally:
+        db.close()
+
+
+# Callbacks and local results are buffered for a few milliseconds and written
+# together, so a burst of results costs one statement instead of one each.
+result_batcher = MicroBatcher(
+    _record_batch,
+    settings.DSA_RESULT_BATCH_WINDOW_MS / 1000,
+    settings.DSA_RESULT_BATCH_SIZE,
+)
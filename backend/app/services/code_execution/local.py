@@ -0,0 +1,407 @@
+import asyncio
+import contextlib
+import ctypes
+import logging
+import os
+import resource
+import shutil
+import signal
+import tempfile
+import time
+import uuid
+from typing import List
+
+from app.config import settings
+from app.lib.errors import CustomException
+
+from .base import (
+    CPU_TIME_LIMIT_MS,
+    MAX_FILE_SIZE_KB,
+    MAX_PROCESSES,
+    MEMORY_LIMIT_KB,
+    STACK_SIZE_LIMIT_KB,
+    WALL_TIME_LIMIT_MS,
+    ExecutionBackend,
+    ExecutionResult,
+)
+
+logger = logging.getLogger(__name__)
+
+COMPILE_TIMEOUT_SECONDS = 20
+MAX_OUTPUT_BYTES = 1024 * 1024
+
+# source file, compile command (None for interpreted languages), run command,
+# and whether the address space limit can be applied. The JVM reserves far more
+# virtual memory than it uses, so Java is limited through -Xmx instead.
+LANGUAGES = {
+    "C": ("main.c", ["gcc", "-O2", "-o", "main", "main.c", "-lm"], ["./main"], True),
+    "Cpp": ("main.cpp", ["g++", "-O2", "-o", "main", "main.cpp"], ["./main"], True),
+    "Python": ("main.py", None, ["python3", "main.py"], True),
+    "Nodejs": ("main.js", None, ["node", "main.js"], False),
+    "Java": (
+        "Main.java",
+        ["javac", "Main.java"],
+        ["java", f"-Xmx{MEMORY_LIMIT_KB // 1024}m", "-Xss64m", "Main"],
+        False,
+    ),
+    "Sqlite_3_48_0": ("main.sql", None, ["sqlite3", "-batch", ":memory:"], True),
+}
+
+SIGNAL_STATUSES = {
+    signal.SIGXCPU: "time-limit-exceeded",
+    signal.SIGKILL: "time-limit-exceeded",
+    signal.SIGSEGV: "died-sigsev",
+    signal.SIGXFSZ: "died-sigxfsz",
+    signal.SIGFPE: "died-sigfpe",
+    signal.SIGABRT: "died-sigabrt",
+}
+
+
+# Runs the command in its arguments and writes its wait status, wall time
+# and resource usage to the file descriptor in argv[1]. The peak memory wait4
+# reports includes what a process inherited from its parent when forked, so
+# test cases are forked from this small interpreter rather than from the API.
+REAPER = """\
+import os, sys, time
+fd = int(sys.argv[1])
+started = time.monotonic()
+pid = os.fork()
+if pid == 0:
+    os.close(fd)
+    try:
+        os.execvp(sys.argv[2], sys.argv[2:])
+    finally:
+        os._exit(127)
+_, status, usage = os.wait4(pid, 0)
+wall_ms = round((time.monotonic() - started) * 1000)
+cpu_ms = round((usage.ru_utime + usage.ru_stime) * 1000)
+# ru_maxrss is in kilobytes on Linux.
+os.write(fd, b"%d %d %d %d" % (status, wall_ms, cpu_ms, usage.ru_maxrss))
+"""
+
+CLONE_NEWNET = 0x40000000
+_libc = ctypes.CDLL(None, use_errno=True)
+
+
+def _environment(workdir: str):
+    """The only variables candidate code sees. Nothing from the API process,
+    whose environment holds the JWT secret and every credential."""
+    return {
+        "PATH": "/usr/local/bin:/usr/bin:/bin",
+        "LANG": "C.UTF-8",
+        "HOME": workdir,
+        "TMPDIR": workdir,
+    }
+
+
+def _sandbox(uid: int, limits: bool, limit_address_space: bool = False):
+    """preexec_fn for a compile or test case process.
+
+    With a `uid`, the process gets an empty network namespace and then drops
+    to that unprivileged user, which both needs root. RLIMIT_NPROC counts
+    every process of a user and is ignored for root, so each concurrent run
+    gets a uid of its own.
+    """
+    cpu_seconds = -(-CPU_TIME_LIMIT_MS // 1000)
+
+    def apply():
+        if uid is not None and _libc.unshare(CLONE_NEWNET) != 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"unshare: {os.strerror(errno)}")
+        if limits:
+            resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+            resource.setrlimit(
+                resource.RLIMIT_STACK, (STACK_SIZE_LIMIT_KB * 1024,) * 2
+            )
+            resource.setrlimit(
+                resource.RLIMIT_FSIZE, (MAX_FILE_SIZE_KB * 1024,) * 2
+            )
+            resource.setrlimit(resource.RLIMIT_NPROC, (MAX_PROCESSES,) * 2)
+            if limit_address_space:
+                resource.setrlimit(
+                    resource.RLIMIT_AS, (MEMORY_LIMIT_KB * 1024,) * 2
+                )
+        if uid is not None:
+            os.setgroups([])
+            os.setgid(uid)
+            os.setuid(uid)
+
+    return apply
+
+
+def _matches(output: str, expected_output: str):
+    """Same comparison as Fermion's IgnoreWhitespaceAtStartAndEndForEveryLine."""
+
+    def normalize(text):
+        return [line.strip() for line in text.strip().splitlines()]
+
+    return normalize(output) == normalize(expected_output)
+
+
+async def _read_limited(stream):
+    """Reads until EOF, keeping at most MAX_OUTPUT_BYTES."""
+    output = bytearray()
+    while chunk := await stream.read(65536):
+        output += chunk[: MAX_OUTPUT_BYTES - len(output)]
+    return bytes(output)
+
+
+async def _run(
+    command, cwd, stdin: str, timeout: float, preexec_fn=None, pass_fds=()
+):
+    """Returns (returncode, stdout, stderr), with returncode None on timeout."""
+    process = await asyncio.create_subprocess_exec(
+        *command,
+        cwd=cwd,
+        env=_environment(cwd),
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        preexec_fn=preexec_fn,
+        start_new_session=True,
+        pass_fds=pass_fds,
+    )
+
+    async def communicate():
+        async def feed():
+            try:
+                process.stdin.write(stdin.encode())
+                await process.stdin.drain()
+                process.stdin.close()
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        _, stdout, stderr, _ = await asyncio.gather(
+            feed(),
+            _read_limited(process.stdout),
+            _read_limited(process.stderr),
+            process.wait(),
+        )
+        return stdout, stderr
+
+    try:
+        stdout, stderr = await asyncio.wait_for(communicate(), timeout)
+    except asyncio.TimeoutError:
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        await process.wait()
+        return None, "", ""
+    return (
+        process.returncode,
+        stdout.decode(errors="replace"),
+        stderr.decode(errors="replace"),
+    )
+
+
+async def _run_measured(command, cwd, stdin: str, timeout: float, preexec_fn=None):
+    """Run `command` under REAPER.
+
+    Returns (returncode, stdout, stderr, usage), with returncode None on
+    timeout and usage None when the command was not reaped, such as on
+    timeout. usage is (wall_time_ms, cpu_time_ms, memory_kb).
+    """
+    read_fd, write_fd = os.pipe()
+    try:
+        returncode, stdout, stderr = await _run(
+            ["python3", "-I", "-S", "-c", REAPER, str(write_fd), *command],
+            cwd,
+            stdin,
+            timeout,
+            preexec_fn=preexec_fn,
+            pass_fds=(write_fd,),
+        )
+        os.close(write_fd)
+        write_fd = None
+        # Every writer has exited, so this does not block.
+        report = os.read(read_fd, 256).split()
+    finally:
+        os.close(read_fd)
+        if write_fd is not None:
+            os.close(write_fd)
+    if returncode is None or len(report) != 4:
+        return returncode, stdout, stderr, None
+    status, *usage = (int(value) for value in report)
+    return os.waitstatus_to_exitcode(status), stdout, stderr, tuple(usage)
+
+
+class LocalBackend(ExecutionBackend):
+    """Runs submissions in resource limited subprocesses on this machine.
+
+    Each test case gets the same CPU time, memory, stack, file size and process
+    limits that are sent to Fermion, plus a wall clock timeout. Test cases run
+    in parallel, at most `LOCAL_EXECUTION_CONCURRENCY` at a time (one per core
+    by default).
+
+    Every process is sandboxed: it gets a minimal environment, no network,
+    and runs as an unprivileged uid of its own, starting from
+    `LOCAL_EXECUTION_UID_BASE`. The last two need the API to run as root.
+    When they are not available the runner refuses submissions, unless
+    `LOCAL_EXECUTION_ALLOW_UNSANDBOXED` is set for development.
+    """
+
+    name = "local"
+
+    def __init__(self, on_result):
+        self.on_result = on_result
+        self._uids = asyncio.Queue()
+        concurrency = settings.LOCAL_EXECUTION_CONCURRENCY or os.cpu_count() or 1
+        for slot in range(concurrency):
+            self._uids.put_nowait(settings.LOCAL_EXECUTION_UID_BASE + slot)
+        self._sandboxed = None
+        self._tasks = set()
+
+    async def sandboxed(self) -> bool:
+        """Whether processes can be sandboxed, found out once by trying."""
+        if self._sandboxed is None:
+            self._sandboxed = await self._probe_sandbox()
+            if not self._sandboxed:
+                logger.warning("Local code execution cannot be sandboxed")
+        return self._sandboxed
+
+    async def _probe_sandbox(self):
+        if os.geteuid() != 0:
+            return False
+        try:
+            returncode, _, _ = await _run(
+                ["true"],
+                tempfile.gettempdir(),
+                "",
+                COMPILE_TIMEOUT_SECONDS,
+                preexec_fn=_sandbox(settings.LOCAL_EXECUTION_UID_BASE, limits=False),
+            )
+        except Exception as e:
+            logger.warning(f"Sandbox check failed: {e!r}")
+            return False
+        return returncode == 0
+
+    @contextlib.asynccontextmanager
+    async def _slot(self):
+        """One of the concurrent slots, as the uid to run as, or None when
+        not sandboxed."""
+        uid = await self._uids.get()
+        try:
+            yield uid if self._sandboxed else None
+        finally:
+            self._uids.put_nowait(uid)
+
+    async def submit(self, language: str, code: str, test_cases: List[dict]):
+        allowed = settings.LOCAL_EXECUTION_ALLOW_UNSANDBOXED
+        if not await self.sandboxed() and not allowed:
+            raise CustomException("Local code execution is not sandboxed", code=503)
+        task_ids = [f"local-{uuid.uuid4()}" for _ in test_cases]
+        task = asyncio.create_task(self._execute(language, code, test_cases, task_ids))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task_ids
+
+    async def _execute(self, language, code, test_cases, task_ids):
+        workdir = tempfile.mkdtemp(prefix="dsa-")
+        # Readable by the test case processes, which run as other users.
+        os.chmod(workdir, 0o755)
+        try:
+            compiler_output = ""
+            if language not in LANGUAGES:
+                status = "unsupported-language"
+            else:
+                status, compiler_output = await self._compile(language, code, workdir)
+
+            if status:
+                await asyncio.gather(
+                    *(
+                        self._report(
+                            ExecutionResult(
+                                task_id=task_id,
+                                status=status,
+                                input=test_case["input"],
+                                compiler_output=compiler_output,
+                            )
+                        )
+                        for task_id, test_case in zip(task_ids, test_cases)
+                    )
+                )
+                return
+
+            await asyncio.gather(
+                *(
+                    self._run_test_case(language, code, workdir, task_id, test_case)
+                    for task_id, test_case in zip(task_ids, test_cases)
+                )
+            )
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    async def _compile(self, language, code, workdir):
+        """Returns (status, compiler_output), with status None on success."""
+        source_file, compile_command, _, _ = LANGUAGES[language]
+        with open(os.path.join(workdir, source_file), "w") as f:
+            f.write(code)
+        if not compile_command:
+            return None, ""
+
+        async with self._slot() as uid:
+            if uid is not None:
+                os.chown(workdir, uid, uid)
+            returncode, stdout, stderr = await _run(
+                compile_command,
+                workdir,
+                "",
+                COMPILE_TIMEOUT_SECONDS,
+                preexec_fn=_sandbox(uid, limits=False),
+            )
+        if returncode is None:
+            return "compilation-error", "Compilation timed out"
+        if returncode != 0:
+            return "compilation-error", stdout + stderr
+        return None, stdout + stderr
+
+    async def _run_test_case(self, language, code, workdir, task_id, test_case):
+        _, _, run_command, limit_address_space = LANGUAGES[language]
+        stdin = test_case["input"]
+        if language == "Sqlite_3_48_0":
+            stdin = stdin + "\n" + code
+
+        async with self._slot() as uid:
+            started = time.perf_counter()
+            returncode, stdout, stderr, usage = await _run_measured(
+                run_command,
+                workdir,
+                stdin,
+                WALL_TIME_LIMIT_MS / 1000,
+                preexec_fn=_sandbox(uid, True, limit_address_space),
+            )
+            wall_time_ms = round((time.perf_counter() - started) * 1000)
+        cpu_time_ms = memory_kb = None
+        if usage is not None:
+            wall_time_ms, cpu_time_ms, memory_kb = usage
+
+        if returncode is None:
+            status = "time-limit-exceeded"
+        elif returncode < 0:
+            status = SIGNAL_STATUSES.get(-returncode, "non-zero-exit-code")
+        elif returncode > 0:
+            status = "non-zero-exit-code"
+        elif _matches(stdout, test_case["expected_output"]):
+            status = "successful"
+        else:
+            status = "wrong-answer"
+
+        await self._report(
+            ExecutionResult(
+                task_id=task_id,
+                status=status,
+                input=test_case["input"],
+                stdout=stdout,
+                stderr=stderr,
+                cpu_time_ms=cpu_time_ms,
+                wall_time_ms=wall_time_ms,
+                memory_kb=memory_kb,
+            )
+        )
+
+    async def _report(self, result: ExecutionResult):
+        try:
+            await self.on_result(result)
+        except Exception as e:
+            logger.error(f"Failed to record local result {result.task_id}: {e!r}")
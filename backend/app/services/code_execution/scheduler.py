@@ -0,0 +1,256 @@
+from typing import List
+
+from sqlalchemy import and_, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import DSAResponse, DSATestCase, DSATestCaseResponse
+
+from . import backends, cache, grading
+
+# Input and expected output size stand in for how expensive a case is to run,
+# so small (sample) cases are dispatched first.
+TEST_CASE_COST = (
+    func.length(DSATestCase.input) + func.length(DSATestCase.expected_output)
+)
+
+
+async def schedule(
+    dsa_response_id: int,
+    question_id: int,
+    language: str,
+    code: str,
+    mode: str,
+    db: Session,
+):
+    """Queue every test case of the question and dispatch the first wave.
+
+    "submit" dispatches the whole suite at once. "run" dispatches
+    `DSA_RUN_FIRST_WAVE_SIZE` of the cheapest cases, then doubles the wave each
+    time every dispatched case has passed, and stops at the first failure.
+    """
+    stmt = select(DSATestCase.id).where(DSATestCase.dsa_question_id == question_id)
+    test_case_ids = db.execute(stmt).scalars().all()
+    if not test_case_ids:
+        return
+
+    stmt = insert(DSATestCaseResponse).values(
+        [
+            {
+                "status": "queued",
+                "dsa_response_id": dsa_response_id,
+                "task_id": None,
+                "dsa_test_case_id": test_case_id,
+            }
+            for test_case_id in test_case_ids
+        ]
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["dsa_response_id", "dsa_test_case_id"],
+        set_={
+            "status": "queued",
+            "task_id": None,
+            "test_case_revision": None,
+            "output": None,
+            "cpu_time_ms": None,
+            "wall_time_ms": None,
+            "memory_kb": None,
+        },
+    )
+    db.execute(stmt)
+    stmt = (
+        update(DSAResponse)
+        .values(
+            passed=False,
+            total_count=len(test_case_ids),
+            dispatched_count=0,
+            passed_count=0,
+            failed_count=0,
+        )
+        .where(DSAResponse.id == dsa_response_id)
+    )
+    db.execute(stmt)
+    db.commit()
+
+    wave_size = (
+        len(test_case_ids) if mode == "submit" else settings.DSA_RUN_FIRST_WAVE_SIZE
+    )
+    await dispatch(dsa_response_id, language, code, wave_size, db)
+
+
+async def dispatch(
+    dsa_response_id: int, language: str, code: str, wave_size: int, db: Session
+):
+    """Claim up to `wave_size` of the cheapest queued cases and submit them.
+
+    The cases are picked in a materialized CTE that the update joins. Inside
+    an IN subquery Postgres may rescan the pick once per row, and every
+    rescan skips the rows already claimed, so the limit kept refilling and
+    the whole suite went out in one wave.
+    """
+    claimable = (
+        select(DSATestCaseResponse.dsa_test_case_id)
+        .join(DSATestCase, DSATestCase.id == DSATestCaseResponse.dsa_test_case_id)
+        .where(
+            and_(
+                DSATestCaseResponse.dsa_response_id == dsa_response_id,
+                DSATestCaseResponse.status == "queued",
+            )
+        )
+        .order_by(TEST_CASE_COST, DSATestCase.id)
+        .limit(wave_size)
+        .with_for_update(of=DSATestCaseResponse, skip_locked=True)
+        .cte("claimable")
+        .prefix_with("MATERIALIZED")
+    )
+    claimed = (
+        update(DSATestCaseResponse)
+        .values(status="pending")
+        .where(
+            and_(
+                DSATestCaseResponse.dsa_response_id == dsa_response_id,
+                DSATestCaseResponse.dsa_test_case_id
+                == claimable.c.dsa_test_case_id,
+            )
+        )
+        .returning(DSATestCaseResponse.dsa_test_case_id)
+        .cte("claimed")
+    )
+    counted = (
+        update(DSAResponse)
+        .values(
+            dispatched_count=DSAResponse.dispatched_count
+            + select(func.count()).select_from(claimed).scalar_subquery()
+        )
+        .where(DSAResponse.id == dsa_response_id)
+        .returning(DSAResponse.id)
+        .cte("counted")
+    )
+    stmt = select(claimed.c.dsa_test_case_id).add_cte(counted)
+    claimed_ids = db.execute(stmt).scalars().all()
+    db.commit()
+    if not claimed_ids:
+        return
+
+    stmt = (
+        select(
+            DSATestCase.id,
+            DSATestCase.input,
+            DSATestCase.expected_output,
+            DSATestCase.revision,
+        )
+        .where(DSATestCase.id.in_(claimed_ids))
+        .order_by(TEST_CASE_COST, DSATestCase.id)
+    )
+    test_cases = [dict(row) for row in db.execute(stmt).mappings().all()]
+
+    cached = cache.lookup(language, cache.source_hash(code), test_cases, db)
+    task_ids = {
+        test_case_id: result.task_id for test_case_id, result in cached.items()
+    }
+    revisions = {test_case["id"]: test_case["revision"] for test_case in test_cases}
+    uncached = [test_case for test_case in test_cases if test_case["id"] not in cached]
+    if uncached:
+        try:
+            submitted = await backends.submit(language, code, uncached)
+        except Exception:
+            _requeue(dsa_response_id, claimed_ids, db)
+            raise
+        task_ids.update(
+            zip((test_case["id"] for test_case in uncached), submitted)
+        )
+
+    # Nothing may be awaited between submitting and committing the task ids,
+    # the local runner reports results as soon as this coroutine yields.
+    db.execute(
+        update(DSATestCaseResponse),
+        [
+            {
+                "dsa_response_id": dsa_response_id,
+                "dsa_test_case_id": test_case_id,
+                "task_id": task_id,
+                "test_case_revision": revisions[test_case_id],
+            }
+            for test_case_id, task_id in task_ids.items()
+        ],
+    )
+    db.commit()
+
+    if cached:
+        await grading.process_results(list(cached.values()), db)
+
+
+async def advance(response, passed: bool, db: Session):
+    """Move a "run" along after one of its results has been recorded.
+
+    `response` is the DSA response row returned when the result was recorded,
+    with its counters already updated.
+    """
+    if response["mode"] != "run":
+        return
+
+    if not passed:
+        stmt = (
+            update(DSATestCaseResponse)
+            .values(status="skipped")
+            .where(
+                and_(
+                    DSATestCaseResponse.dsa_response_id == response["id"],
+                    DSATestCaseResponse.status == "queued",
+                )
+            )
+        )
+        db.execute(stmt)
+        db.commit()
+        return
+
+    finished = response["passed_count"] + response["failed_count"]
+    if finished < response["dispatched_count"] or finished >= response["total_count"]:
+        return
+
+    await dispatch(
+        response["id"],
+        response["language"],
+        response["code"],
+        max(settings.DSA_RUN_FIRST_WAVE_SIZE, response["dispatched_count"]),
+        db,
+    )
+
+
+def abandon(dsa_response_id: int, db: Session):
+    """Give up on a run whose next wave could not be dispatched, so it does
+    not sit with queued cases forever. Resubmitting schedules it afresh."""
+    stmt = (
+        update(DSATestCaseResponse)
+        .values(status="skipped")
+        .where(
+            and_(
+                DSATestCaseResponse.dsa_response_id == dsa_response_id,
+                DSATestCaseResponse.status == "queued",
+            )
+        )
+    )
+    db.execute(stmt)
+    db.commit()
+
+
+def _requeue(dsa_response_id: int, test_case_ids: List[int], db: Session):
+    stmt = (
+        update(DSATestCaseResponse)
+        .values(status="queued")
+        .where(
+            and_(
+                DSATestCaseResponse.dsa_response_id == dsa_response_id,
+                DSATestCaseResponse.dsa_test_case_id.in_(test_case_ids),
+            )
+        )
+    )
+    db.execute(stmt)
+    stmt = (
+        update(DSAResponse)
+        .values(dispatched_count=DSAResponse.dispatched_count - len(test_case_ids))
+        .where(DSAResponse.id == dsa_response_id)
+    )
+    db.execute(stmt)
+    db.commit()
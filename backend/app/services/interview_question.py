@@ -47,14 +47,19 @@ def update_interview_question(
         update(InterviewQuestion)
         .where(InterviewQuestion.id == question_data.id)
         .values(question_data.model_dump(exclude_unset=True))
+        .returning(InterviewQuestion.job_id)
     )
-    db.execute(stmt)
+    job_id = db.execute(stmt).scalar_one_or_none()
     db.commit()
-    return
+    return job_id
 
 
 def delete_interview_question(id: int, db: Session):
-    stmt = delete(InterviewQuestion).where(InterviewQuestion.id == id)
-    db.execute(stmt)
+    stmt = (
+        delete(InterviewQuestion)
+        .where(InterviewQuestion.id == id)
+        .returning(InterviewQuestion.job_id)
+    )
+    job_id = db.execute(stmt).scalar_one_or_none()
     db.commit()
-    return
+    return job_id
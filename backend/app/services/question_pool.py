@@ -0,0 +1,227 @@
+import asyncio
+import json
+import logging
+import random
+from typing import Dict
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from app import config, database
+from app.configs import openai
+from app.models import InterviewQuestion, InterviewQuestionPool, Job
+
+logger = logging.getLogger(__name__)
+
+QUESTION_TYPES = [
+    "technical",
+    "technical",
+    "technical",
+    "behavioral",
+    "behavioral",
+    "problem_solving",
+    "problem_solving",
+    "problem_solving",
+]
+
+_pending_generations: Dict[int, asyncio.Task] = {}
+
+
+async def schedule_question_pool_generation(job_id: int):
+    """Regenerate the pool for a job once its edits settle.
+
+    Recruiters usually create a job and then add several custom questions in a
+    row, so generation is debounced per job instead of running once per edit.
+    """
+    pending = _pending_generations.get(job_id)
+    if pending and not pending.done():
+        pending.cancel()
+
+    async def run():
+        await asyncio.sleep(config.settings.QUESTION_POOL_DEBOUNCE_SECONDS)
+        try:
+            await generate_question_pool(job_id)
+        except Exception as e:
+            logger.error(f"Failed to generate question pool for job {job_id}: {e}")
+        finally:
+            if _pending_generations.get(job_id) is asyncio.current_task():
+                _pending_generations.pop(job_id, None)
+
+    _pending_generations[job_id] = asyncio.create_task(run())
+
+
+async def generate_question_pool(job_id: int):
+    db = database.SessionLocal()
+    try:
+        stmt = select(Job.title, Job.description, Job.requirements).where(
+            Job.id == job_id
+        )
+        job = db.execute(stmt).mappings().one_or_none()
+        if not job:
+            return
+
+        stmt = (
+            select(
+                InterviewQuestion.id,
+                InterviewQuestion.question,
+                InterviewQuestion.question_type,
+            )
+            .where(InterviewQuestion.job_id == job_id)
+            .order_by(InterviewQuestion.order_number, InterviewQuestion.id)
+        )
+        custom_questions = db.execute(stmt).mappings().all()
+
+        example_questions = ""
+        for number, question in enumerate(custom_questions, 1):
+            example_questions += f"""
+        Question {number}: {question.question} (question type: {question.question_type})
+"""
+
+        question_types = sorted(set(QUESTION_TYPES))
+        pool_size = config.settings.QUESTION_POOL_SIZE
+
+        system_prompt = f"""You are an expert technical interviewer for the position of {job.title}.
+Your task is to build a pool of interview questions for this position. Questions will be
+sampled from this pool for many different candidates, so they must not assume anything
+about a particular candidate's background.
+
+The questions should be:
+1. Clear and concise
+2. Relevant to the position
+3. Progressive in difficulty
+4. Natural and conversational
+5. Similar in style and focus to the custom questions provided
+
+Question types: {', '.join(question_types)}
+Number of questions to generate: {pool_size}, spread evenly across the question types
+
+Job Description:
+{job.description}
+
+Job Requirements:
+{job.requirements}
+
+Custom Questions to Enhance and Include:
+{example_questions}
+
+Instructions for Question Generation:
+1. First, analyze the custom questions provided and understand their style, focus, and complexity
+2. Include several rephrased variants of every custom question
+3. Then generate additional questions that follow the same style and focus as the custom questions
+4. Do not include greetings, the greeting is added when the interview starts
+
+Return the questions as a JSON array of objects with "question" and "type" fields.
+Variants of a custom question also have a "custom_question" field with its number."""
+
+        response = await openai.client.chat.completions.create(
+            model="gpt-4",
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": "Generate the interview question pool."},
+            ],
+            temperature=0.9,
+            max_tokens=3000,
+        )
+
+        questions = json.loads(response.choices[0].message.content)
+        custom_ids = {
+            str(number): question.id
+            for number, question in enumerate(custom_questions, 1)
+        }
+        pool = [
+            {
+                "question": question["question"],
+                "question_type": question["type"],
+                "interview_question_id": custom_ids.get(
+                    str(question.get("custom_question"))
+                ),
+                "job_id": job_id,
+            }
+            for question in questions
+            if question.get("question") and question.get("type")
+        ]
+        if not pool:
+            logger.error(f"Question pool generation for job {job_id} returned nothing")
+            return
+        # Every custom question is asked as written in some interviews.
+        pool += [
+            {
+                "question": question.question,
+                "question_type": question.question_type,
+                "interview_question_id": question.id,
+                "job_id": job_id,
+            }
+            for question in custom_questions
+        ]
+
+        db.execute(
+            delete(InterviewQuestionPool).where(InterviewQuestionPool.job_id == job_id)
+        )
+        db.execute(insert(InterviewQuestionPool).values(pool))
+        db.commit()
+        logger.info(f"Generated {len(pool)} pooled questions for job {job_id}")
+    finally:
+        db.close()
+
+
+def sample_questions(job_id: int, db: Session):
+    """Questions for one interview, sampled from the job's pool.
+
+    Every custom question of the job is asked, as written or as one of its
+    variants, and the remaining slots of QUESTION_TYPES are filled from the
+    rest of the pool. A custom question added since the pool was generated
+    is asked as written. Returns [] while the job has no pool.
+    """
+    stmt = select(
+        InterviewQuestionPool.question,
+        InterviewQuestionPool.question_type,
+        InterviewQuestionPool.interview_question_id,
+    ).where(InterviewQuestionPool.job_id == job_id)
+    pool = [dict(question) for question in db.execute(stmt).mappings().all()]
+    if not pool:
+        return []
+
+    stmt = (
+        select(
+            InterviewQuestion.id,
+            InterviewQuestion.question,
+            InterviewQuestion.question_type,
+        )
+        .where(InterviewQuestion.job_id == job_id)
+        .order_by(InterviewQuestion.order_number, InterviewQuestion.id)
+    )
+    custom_questions = db.execute(stmt).mappings().all()
+
+    random.shuffle(pool)
+    chosen = []
+    for custom_question in custom_questions:
+        variants = [
+            q for q in pool if q["interview_question_id"] == custom_question["id"]
+        ]
+        chosen.append(variants[0] if variants else dict(custom_question))
+
+    slots = list(QUESTION_TYPES)
+    for question in chosen:
+        if question["question_type"] in slots:
+            slots.remove(question["question_type"])
+        elif slots:
+            slots.pop()
+
+    pool = [q for q in pool if q["interview_question_id"] is None]
+    for question_type in slots:
+        candidates = [q for q in pool if q["question_type"] == question_type] or pool
+        if not candidates:
+            break
+        question = candidates[0]
+        pool.remove(question)
+        chosen.append(question)
+
+    def type_order(question):
+        if question["question_type"] in QUESTION_TYPES:
+            return QUESTION_TYPES.index(question["question_type"])
+        return len(QUESTION_TYPES)
+
+    return [
+        {"question": question["question"], "type": question["question_type"]}
+        for question in sorted(chosen, key=type_order)
+    ]
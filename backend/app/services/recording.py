@@ -0,0 +1,223 @@
+import asyncio
+import logging
+import os
+import tempfile
+import time
+import uuid
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.configs.storage import storage
+from app.models import InterviewRecording
+
+from . import transcoding
+
+logger = logging.getLogger(__name__)
+
+# Request bodies are written in blocks of this size, so a chunk is never held
+# in memory whole.
+WRITE_BLOCK_BYTES = 256 * 1024
+
+
+def recording_dir(interview_id: int):
+    """Local working directory where a recording is assembled and transcoded."""
+    return os.path.join(settings.RECORDING_SPOOL_DIR, str(interview_id))
+
+
+def video_path(interview_id: int):
+    return os.path.join(recording_dir(interview_id), "video.webm")
+
+
+def reset_video(interview_id: int):
+    """Start an empty video.webm in the working directory."""
+    os.makedirs(recording_dir(interview_id), exist_ok=True)
+    open(video_path(interview_id), "wb").close()
+
+
+def chunk_key(interview_id: int, seq: int):
+    return f"interview_video/{interview_id}/chunks/{seq:06d}.webm"
+
+
+async def _write_stream(stream, path: str):
+    """Write an async byte stream to `path` off the event loop.
+
+    Returns the number of bytes written.
+    """
+    f = await asyncio.to_thread(open, path, "wb")
+    size = 0
+    block = bytearray()
+    try:
+        async for data in stream:
+            block += data
+            size += len(data)
+            if len(block) >= WRITE_BLOCK_BYTES:
+                await asyncio.to_thread(f.write, bytes(block))
+                block.clear()
+        if block:
+            await asyncio.to_thread(f.write, bytes(block))
+    finally:
+        await asyncio.to_thread(f.close)
+    return size
+
+
+async def _contiguous_chunks(interview_id: int, start: int):
+    """Sequence number of the first chunk from `start` not yet in storage."""
+    seq = start
+    while await storage.exists(chunk_key(interview_id, seq)):
+        seq += 1
+    return seq
+
+
+async def assemble(interview_id: int, start: int, end: int):
+    """Append chunks `start` up to `end` from storage onto video.webm."""
+    f = await asyncio.to_thread(open, video_path(interview_id), "ab")
+    try:
+        for seq in range(start, end):
+            async for block in storage.stream(chunk_key(interview_id, seq)):
+                await asyncio.to_thread(f.write, block)
+        await asyncio.to_thread(f.flush)
+    finally:
+        await asyncio.to_thread(f.close)
+
+
+async def ingest_chunk(interview_id: int, seq: int, stream, db: Session):
+    """Store one MediaRecorder chunk under its sequence number.
+
+    Chunks go to storage rather than to this node's disk, since the next one
+    may well be received by another node. A retried chunk is dropped, and
+    `assembled_chunks` counts the chunks stored without a gap, which are the
+    ones a transcoder can use. Chunks from clients that send no sequence
+    number are numbered in arrival order.
+    """
+    stmt = insert(InterviewRecording).values(interview_id=interview_id)
+    db.execute(stmt.on_conflict_do_nothing())
+    db.commit()
+
+    part_path = os.path.join(tempfile.gettempdir(), f"{uuid.uuid4().hex}.part")
+    started = time.perf_counter()
+    try:
+        size = await _write_stream(stream, part_path)
+    except Exception:
+        # The client went away mid-chunk; it will be retried under the same seq.
+        await asyncio.to_thread(os.remove, part_path)
+        raise
+    receive_seconds = time.perf_counter() - started
+
+    # Lock the recording row so that only one request, on any node, stores a
+    # chunk and advances the contiguous count at a time.
+    stmt = (
+        select(InterviewRecording)
+        .where(InterviewRecording.interview_id == interview_id)
+        .with_for_update()
+    )
+    recording = db.execute(stmt).scalar_one()
+    try:
+        if seq is None:
+            seq = recording.received_chunks
+        key = chunk_key(interview_id, seq)
+        duplicate = seq < recording.assembled_chunks or await storage.exists(key)
+        first_assembled = False
+        if duplicate:
+            recording.duplicate_chunks += 1
+        else:
+            await storage.put_file(key, part_path, "video/webm")
+            recording.received_chunks += 1
+            recording.received_bytes += size
+            recording.receive_seconds += receive_seconds
+            first_assembled = recording.assembled_chunks == 0
+            recording.assembled_chunks = await _contiguous_chunks(
+                interview_id, recording.assembled_chunks
+            )
+            first_assembled = first_assembled and recording.assembled_chunks > 0
+        complete = _mark_complete_if_done(recording, db)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        await asyncio.to_thread(os.remove, part_path)
+
+    if complete:
+        transcoding.worker_pool.wake()
+    elif first_assembled:
+        await transcoding.live_transcoder.start(interview_id, db)
+    if not duplicate:
+        transcoding.live_transcoder.wake(interview_id)
+    return {"seq": seq, "duplicate": duplicate}
+
+
+async def finish(interview_id: int, expected_chunks: int, db: Session):
+    """Mark the recording as stopped.
+
+    With `expected_chunks` the recording completes once that many chunks have
+    been stored, which may be after this call when the last uploads are
+    still in flight. Without it, whatever has arrived is final.
+    """
+    stmt = insert(InterviewRecording).values(interview_id=interview_id)
+    db.execute(stmt.on_conflict_do_nothing())
+    stmt = (
+        select(InterviewRecording)
+        .where(InterviewRecording.interview_id == interview_id)
+        .with_for_update()
+    )
+    recording = db.execute(stmt).scalar_one()
+    if recording.status == "complete":
+        db.commit()
+        return
+    recording.expected_chunks = (
+        expected_chunks if expected_chunks is not None else recording.assembled_chunks
+    )
+    recording.status = "finalizing"
+    complete = _mark_complete_if_done(recording, db)
+    db.commit()
+
+    transcoding.live_transcoder.wake(interview_id)
+    if complete:
+        transcoding.worker_pool.wake()
+
+
+def _mark_complete_if_done(recording: InterviewRecording, db: Session):
+    if (
+        recording.status == "finalizing"
+        and recording.assembled_chunks >= recording.expected_chunks
+    ):
+        recording.status = "complete"
+        transcoding.enqueue(recording.interview_id, db)
+        return True
+    return False
+
+
+def get_stats(interview_id: int, db: Session):
+    stmt = select(InterviewRecording).where(
+        InterviewRecording.interview_id == interview_id
+    )
+    recording = db.execute(stmt).scalar_one()
+    wall_seconds = (
+        (recording.updated_at - recording.created_at).total_seconds()
+        if recording.updated_at and recording.created_at
+        else 0
+    )
+    return {
+        "interview_id": recording.interview_id,
+        "status": recording.status,
+        "received_chunks": recording.received_chunks,
+        "duplicate_chunks": recording.duplicate_chunks,
+        "assembled_chunks": recording.assembled_chunks,
+        "expected_chunks": recording.expected_chunks,
+        "received_bytes": recording.received_bytes,
+        # Throughput while bodies were actually being received.
+        "ingest_mbps": (
+            round(recording.received_bytes * 8 / recording.receive_seconds / 1e6, 3)
+            if recording.receive_seconds
+            else None
+        ),
+        # Average rate over the whole recording so far.
+        "average_mbps": (
+            round(recording.received_bytes * 8 / wall_seconds / 1e6, 3)
+            if wall_seconds
+            else None
+        ),
+    }
@@ -0,0 +1,391 @@
+import asyncio
+import datetime
+import logging
+import os
+import shutil
+
+from sqlalchemy import and_, delete, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app import database
+from app.config import settings
+from app.configs.storage import storage
+from app.lib.storage import LocalStorage
+from app.models import (
+    Interview,
+    InterviewRecording,
+    Job,
+    MediaDeletion,
+    MediaPurge,
+    RetentionCursor,
+    RetentionPolicy,
+    Screenshot,
+    TranscodeJob,
+)
+
+from . import recording
+
+logger = logging.getLogger(__name__)
+
+KINDS = ("video", "screenshots", "resume", "report")
+ARCHIVE_PREFIX = "archive"
+# Interviews deleted this recently may still be in a transaction that has not
+# committed, so their ids are left to the next sweep.
+ORPHAN_GRACE = datetime.timedelta(hours=1)
+MAX_ERROR_CHARS = 2000
+
+_wakeup = asyncio.Event()
+
+
+def _policy_days(kind: str):
+    """Days `kind` is kept for the recruiter joined in, None for forever."""
+    column, default = {
+        "video": (RetentionPolicy.video_days, settings.RETENTION_DEFAULT_VIDEO_DAYS),
+        "screenshots": (
+            RetentionPolicy.screenshot_days,
+            settings.RETENTION_DEFAULT_SCREENSHOT_DAYS,
+        ),
+        "resume": (
+            RetentionPolicy.resume_days,
+            settings.RETENTION_DEFAULT_RESUME_DAYS,
+        ),
+        "report": (
+            RetentionPolicy.report_days,
+            settings.RETENTION_DEFAULT_REPORT_DAYS,
+        ),
+    }[kind]
+    return func.nullif(func.coalesce(column, default), 0)
+
+
+def _media_keys(interview_id: int, kind: str, url: str = None):
+    """(key, is_prefix) of everything stored for one kind of media.
+
+    Resumes and reports saved before they were kept per interview are single
+    files found only through the URL on the interview.
+    """
+    prefix = {
+        "video": "interview_video",
+        "screenshots": "screenshot",
+        "resume": "resume",
+        "report": "report",
+    }[kind]
+    keys = [(f"{prefix}/{interview_id}", True)]
+    if url:
+        key = storage.key(url)
+        if not key.startswith(f"{prefix}/{interview_id}/"):
+            keys.append((key, False))
+    return keys
+
+
+def _queue(keys, action: str, db: Session):
+    if keys:
+        db.execute(
+            insert(MediaDeletion),
+            [
+                {"key": key, "is_prefix": is_prefix, "action": action}
+                for key, is_prefix in keys
+            ],
+        )
+
+
+def _mark_purged(interview_ids, kind: str, db: Session):
+    stmt = insert(MediaPurge).values(
+        [{"interview_id": id, "kind": kind} for id in interview_ids]
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[MediaPurge.interview_id, MediaPurge.kind],
+        set_={"purged_at": func.now()},
+    )
+    db.execute(stmt)
+
+
+def _written_at(kind: str):
+    """When `kind` of media of an interview was last written.
+
+    Media stored before this was recorded, or found only in storage, count
+    from when the interview was created.
+    """
+    written_at = {
+        "video": select(InterviewRecording.updated_at)
+        .where(InterviewRecording.interview_id == Interview.id)
+        .correlate(Interview)
+        .scalar_subquery(),
+        "screenshots": select(func.max(Screenshot.taken_at))
+        .where(Screenshot.interview_id == Interview.id)
+        .correlate(Interview)
+        .scalar_subquery(),
+        "resume": Interview.resume_uploaded_at,
+        "report": Interview.report_generated_at,
+    }[kind]
+    return func.coalesce(written_at, Interview.created_at)
+
+
+def queue_deleted_interview(interview, db: Session):
+    """Queue the deletion of all media of an interview that is being deleted.
+
+    Runs in the caller's transaction, so nothing is queued if the interview
+    is not deleted after all. `interview` has its id, resume_url and
+    report_file_url.
+    """
+    keys = []
+    for kind in KINDS:
+        url = {
+            "resume": interview["resume_url"],
+            "report": interview["report_file_url"],
+        }.get(kind)
+        keys += _media_keys(interview["id"], kind, url)
+    _queue(keys, "delete", db)
+    _mark_purged([interview["id"]], "all", db)
+
+
+def _remove_spool(interview_id: int):
+    """Remove the local working copy of a recording, unless it is the stored
+    copy itself, which the queued deletion takes care of."""
+    directory = os.path.abspath(recording.recording_dir(interview_id))
+    if (
+        isinstance(storage, LocalStorage)
+        and storage.path(f"interview_video/{interview_id}") == directory
+    ):
+        return
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+async def apply_policies(db: Session):
+    """Purge one batch of interviews per kind of media that is past the
+    retention of its recruiter's policy.
+
+    Each kind is aged from when it was last written, and interviews are
+    found through media_purges rather than storage: a kind is purged again
+    only if it was written after its last purge. Returns the number of
+    purges.
+    """
+    purged = 0
+    for kind in KINDS:
+        days = _policy_days(kind)
+        written_at = _written_at(kind)
+        action = func.coalesce(
+            RetentionPolicy.action, settings.RETENTION_DEFAULT_ACTION
+        )
+        already_purged = (
+            select(MediaPurge.interview_id)
+            .where(
+                and_(
+                    MediaPurge.interview_id == Interview.id,
+                    MediaPurge.kind.in_([kind, "all"]),
+                    MediaPurge.purged_at >= written_at,
+                )
+            )
+            .exists()
+        )
+        stmt = (
+            select(
+                Interview.id,
+                Interview.resume_url,
+                Interview.report_file_url,
+                action.label("action"),
+            )
+            .join(Job, Job.id == Interview.job_id)
+            .outerjoin(RetentionPolicy, RetentionPolicy.recruiter_id == Job.company_id)
+            .where(
+                and_(
+                    written_at < func.now() - func.make_interval(0, 0, 0, days),
+                    ~already_purged,
+                )
+            )
+            .order_by(Interview.id)
+            .limit(settings.RETENTION_BATCH_SIZE)
+            .with_for_update(of=Interview, skip_locked=True)
+        )
+        interviews = db.execute(stmt).mappings().all()
+        if not interviews:
+            db.commit()
+            continue
+
+        ids = [interview["id"] for interview in interviews]
+        for interview in interviews:
+            url = {
+                "resume": interview["resume_url"],
+                "report": interview["report_file_url"],
+            }.get(kind)
+            _queue(_media_keys(interview["id"], kind, url), interview["action"], db)
+        if kind == "video":
+            db.execute(
+                delete(TranscodeJob).where(TranscodeJob.interview_id.in_(ids))
+            )
+            db.execute(
+                delete(InterviewRecording).where(
+                    InterviewRecording.interview_id.in_(ids)
+                )
+            )
+        elif kind == "screenshots":
+            db.execute(delete(Screenshot).where(Screenshot.interview_id.in_(ids)))
+            db.execute(
+                update(Interview)
+                .where(Interview.id.in_(ids))
+                .values(legacy_screenshots=False)
+            )
+        elif kind == "resume":
+            db.execute(
+                update(Interview).where(Interview.id.in_(ids)).values(resume_url=None)
+            )
+        elif kind == "report":
+            db.execute(
+                update(Interview)
+                .where(Interview.id.in_(ids))
+                .values(report_file_url=None)
+            )
+        _mark_purged(ids, kind, db)
+        db.commit()
+
+        if kind == "video":
+            for id in ids:
+                await asyncio.to_thread(_remove_spool, id)
+        logger.info(f"Retention purged {kind} of {len(ids)} interviews")
+        purged += len(ids)
+    return purged
+
+
+def reconcile_orphans(db: Session):
+    """Queue the media of interviews that no longer exist, such as those
+    removed along with their job.
+
+    Walks interview ids in batches from a cursor kept in the database,
+    looking for gaps instead of listing storage, and starts over once it
+    reaches the newest interviews. Returns the number of orphans found.
+    """
+    db.execute(
+        insert(RetentionCursor).values(name="orphans").on_conflict_do_nothing()
+    )
+    db.commit()
+    stmt = (
+        select(RetentionCursor)
+        .where(RetentionCursor.name == "orphans")
+        .with_for_update(skip_locked=True)
+    )
+    cursor = db.execute(stmt).scalar_one_or_none()
+    if cursor is None:
+        # Another process is on this batch.
+        return 0
+
+    stmt = select(func.max(Interview.id)).where(
+        Interview.created_at < func.now() - ORPHAN_GRACE
+    )
+    last_id = db.execute(stmt).scalar()
+    start = cursor.position + 1
+    if last_id is None or start > last_id:
+        cursor.position = 0
+        db.commit()
+        return 0
+    end = min(start + settings.RETENTION_BATCH_SIZE - 1, last_id)
+
+    ids = func.generate_series(start, end).table_valued("id").render_derived()
+    stmt = select(ids.c.id).where(
+        and_(
+            ~select(Interview.id).where(Interview.id == ids.c.id).exists(),
+            ~select(MediaPurge.interview_id)
+            .where(
+                and_(MediaPurge.interview_id == ids.c.id, MediaPurge.kind == "all")
+            )
+            .exists(),
+        )
+    )
+    orphans = db.execute(stmt).scalars().all()
+    if orphans:
+        _queue(
+            [key for id in orphans for kind in KINDS for key in _media_keys(id, kind)],
+            "delete",
+            db,
+        )
+        _mark_purged(orphans, "all", db)
+        logger.info(f"Found media of {len(orphans)} deleted interviews")
+    cursor.position = end
+    db.commit()
+    return len(orphans)
+
+
+async def process_deletions(db: Session):
+    """Delete or archive one batch of queued media. Returns the batch size and
+    how many of the batch were done.
+
+    Failures are kept with their error and retried up to
+    MEDIA_DELETION_MAX_ATTEMPTS times, after a delay that doubles each time.
+    """
+    stmt = (
+        select(MediaDeletion)
+        .where(
+            and_(
+                MediaDeletion.attempts < settings.MEDIA_DELETION_MAX_ATTEMPTS,
+                or_(
+                    MediaDeletion.retry_after.is_(None),
+                    MediaDeletion.retry_after <= func.now(),
+                ),
+            )
+        )
+        .order_by(MediaDeletion.id)
+        .limit(settings.RETENTION_BATCH_SIZE)
+        .with_for_update(skip_locked=True)
+    )
+    deletions = db.execute(stmt).scalars().all()
+    done = []
+    for deletion in deletions:
+        try:
+            if deletion.action == "archive":
+                archived = f"{ARCHIVE_PREFIX}/{deletion.key}"
+                if deletion.is_prefix:
+                    await storage.move_prefix(deletion.key, archived)
+                else:
+                    await storage.move(deletion.key, archived)
+            elif deletion.is_prefix:
+                await storage.delete_prefix(deletion.key)
+            else:
+                await storage.delete(deletion.key)
+        except Exception as e:
+            logger.error(f"Failed to {deletion.action} {deletion.key}: {e!r}")
+            delay = settings.MEDIA_DELETION_RETRY_SECONDS * 2**deletion.attempts
+            deletion.attempts += 1
+            deletion.error = repr(e)[:MAX_ERROR_CHARS]
+            deletion.retry_after = func.now() + datetime.timedelta(seconds=delay)
+        else:
+            done.append(deletion.id)
+    if done:
+        db.execute(delete(MediaDeletion).where(MediaDeletion.id.in_(done)))
+    db.commit()
+    return len(deletions), len(done)
+
+
+async def run_once():
+    db = database.SessionLocal()
+    try:
+        await apply_policies(db)
+        reconcile_orphans(db)
+        # Keep going while full batches are being worked through, but not
+        # when storage is failing every deletion.
+        while True:
+            batch_size, done = await process_deletions(db)
+            if batch_size < settings.RETENTION_BATCH_SIZE or not done:
+                break
+    finally:
+        db.close()
+
+
+def wake():
+    """Process queued deletions now rather than at the next interval."""
+    _wakeup.set()
+
+
+async def run_retention():
+    while True:
+        try:
+            await run_once()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Retention run failed: {e!r}")
+        try:
+            await asyncio.wait_for(
+                _wakeup.wait(), timeout=settings.RETENTION_INTERVAL_SECONDS
+            )
+        except asyncio.TimeoutError:
+            pass
+        _wakeup.clear()
@@ -0,0 +1,121 @@
+import asyncio
+import io
+import logging
+
+from PIL import Image
+from sqlalchemy import and_, delete, desc, func, select, update
+
+from app import database
+from app.config import settings
+from app.configs.storage import storage
+from app.lib.storage import content_key
+from app.models import Screenshot
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPES = {"webp": "image/webp", "jpeg": "image/jpeg"}
+
+
+def dhash(image: Image.Image) -> int:
+    """64 bit difference hash: whether each pixel of a 9x8 greyscale copy is
+    brighter than its right neighbour. Near identical frames differ in only a
+    few bits."""
+    pixels = list(image.convert("L").resize((9, 8), Image.LANCZOS).getdata())
+    value = 0
+    for row in range(8):
+        for column in range(8):
+            left = pixels[row * 9 + column]
+            right = pixels[row * 9 + column + 1]
+            value = (value << 1) | (left > right)
+    return value
+
+
+def _encode(image: Image.Image, quality: int):
+    output = io.BytesIO()
+    image.save(output, format=settings.SCREENSHOT_FORMAT.upper(), quality=quality)
+    return output.getvalue()
+
+
+def _convert(data: bytes):
+    """Returns (hash, full size image, thumbnail), the images re-encoded."""
+    with Image.open(io.BytesIO(data)) as image:
+        image = image.convert("RGB")
+        thumbnail = image.copy()
+        width = settings.SCREENSHOT_THUMBNAIL_WIDTH
+        thumbnail.thumbnail((width, width * image.height // max(image.width, 1)))
+        return (
+            dhash(image),
+            _encode(image, settings.SCREENSHOT_QUALITY),
+            _encode(thumbnail, settings.SCREENSHOT_QUALITY),
+        )
+
+
+async def process(screenshot_id: int):
+    """Compress a saved screenshot and make its thumbnail, or drop it when it
+    is nearly identical to the previous kept frame of the same interview.
+
+    Runs after the upload has been answered. Until it has, the original is
+    served for both sizes.
+    """
+    db = database.SessionLocal()
+    try:
+        stmt = select(Screenshot).where(Screenshot.id == screenshot_id)
+        screenshot = db.execute(stmt).scalar_one_or_none()
+        if screenshot is None or screenshot.processed_at is not None:
+            return
+        original_key = screenshot.storage_key
+
+        data = await storage.get(original_key)
+        hash_value, image, thumbnail = await asyncio.to_thread(_convert, data)
+
+        stmt = (
+            select(Screenshot.dhash)
+            .where(
+                and_(
+                    Screenshot.interview_id == screenshot.interview_id,
+                    Screenshot.taken_at < screenshot.taken_at,
+                    Screenshot.dhash.is_not(None),
+                )
+            )
+            .order_by(desc(Screenshot.taken_at))
+            .limit(1)
+        )
+        previous = db.execute(stmt).scalar()
+        extension = "jpg" if settings.SCREENSHOT_FORMAT == "jpeg" else "webp"
+        directory = f"screenshot/{screenshot.interview_id}"
+        image_key = content_key(directory, image, extension)
+        thumbnail_key = content_key(f"{directory}/thumbs", thumbnail, extension)
+        stmt = select(Screenshot.id).where(Screenshot.storage_key == image_key)
+        duplicate = (
+            previous is not None
+            and bin(int(previous, 16) ^ hash_value).count("1")
+            <= settings.SCREENSHOT_DEDUP_DISTANCE
+        ) or db.execute(stmt).scalar() is not None
+        if duplicate:
+            db.execute(delete(Screenshot).where(Screenshot.id == screenshot_id))
+            db.commit()
+            await storage.delete(original_key)
+            return
+
+        content_type = CONTENT_TYPES.get(settings.SCREENSHOT_FORMAT)
+        await storage.put(image_key, image, content_type)
+        await storage.put(thumbnail_key, thumbnail, content_type)
+
+        stmt = (
+            update(Screenshot)
+            .where(Screenshot.id == screenshot_id)
+            .values(
+                storage_key=image_key,
+                thumbnail_key=thumbnail_key,
+                size=len(image),
+                dhash=f"{hash_value:016x}",
+                processed_at=func.now(),
+            )
+        )
+        db.execute(stmt)
+        db.commit()
+        await storage.delete(original_key)
+    except Exception as e:
+        logger.error(f"Failed to process screenshot {screenshot_id}: {e!r}")
+    finally:
+        db.close()
@@ -0,0 +1,473 @@
+import asyncio
+import datetime
+import logging
+import os
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app import database
+from app.config import settings
+from app.configs.storage import storage
+from app.models import InterviewRecording, TranscodeJob
+
+from . import recording
+
+logger = logging.getLogger(__name__)
+
+# Seconds before the first retry of a failed job, doubled for every attempt.
+RETRY_BACKOFF_SECONDS = 30
+MAX_ERROR_CHARS = 2000
+
+
+def enqueue(interview_id: int, db: Session):
+    """Queue the HLS conversion of an interview's recording.
+
+    Runs in the caller's transaction, so the job only becomes visible once the
+    recording it converts has been committed. Queueing an interview again
+    resets its job.
+    """
+    stmt = insert(TranscodeJob).values(interview_id=interview_id, status="queued")
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[TranscodeJob.interview_id],
+        set_={
+            "status": "queued",
+            "attempts": 0,
+            "error": None,
+            "run_after": stmt.excluded.run_after,
+            "started_at": None,
+            "finished_at": None,
+        },
+        # A live job converts the recording as it completes.
+        where=TranscodeJob.status != "live",
+    )
+    db.execute(stmt)
+
+
+def _claim(db: Session):
+    """Take the oldest runnable job, skipping jobs other workers hold.
+
+    Only jobs for finished recordings are runnable. Jobs left running longer
+    than twice the timeout, and live jobs whose heartbeat stopped, belonged to
+    a process that died, and are picked up again.
+    """
+    stale_before = func.now() - datetime.timedelta(
+        seconds=settings.TRANSCODE_TIMEOUT_SECONDS * 2
+    )
+    silent_since = func.now() - datetime.timedelta(
+        seconds=settings.TRANSCODE_POLL_SECONDS * 3
+    )
+    recording_complete = (
+        select(InterviewRecording.interview_id)
+        .where(
+            and_(
+                InterviewRecording.interview_id == TranscodeJob.interview_id,
+                InterviewRecording.status == "complete",
+            )
+        )
+        .exists()
+    )
+    candidate = (
+        select(TranscodeJob.id)
+        .where(
+            and_(
+                or_(
+                    and_(
+                        TranscodeJob.status == "queued",
+                        TranscodeJob.run_after <= func.now(),
+                    ),
+                    and_(
+                        TranscodeJob.status == "running",
+                        TranscodeJob.started_at < stale_before,
+                    ),
+                    and_(
+                        TranscodeJob.status == "live",
+                        TranscodeJob.heartbeat_at < silent_since,
+                    ),
+                ),
+                recording_complete,
+            )
+        )
+        .order_by(TranscodeJob.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    stmt = (
+        update(TranscodeJob)
+        .where(TranscodeJob.id == candidate)
+        .values(
+            status="running",
+            attempts=TranscodeJob.attempts + 1,
+            started_at=func.now(),
+        )
+        .returning(TranscodeJob.id, TranscodeJob.interview_id, TranscodeJob.attempts)
+    )
+    job = db.execute(stmt).mappings().one_or_none()
+    db.commit()
+    return job
+
+
+def _ffmpeg_command(interview_id: int, live: bool):
+    directory = recording.recording_dir(interview_id)
+    command = ["ffmpeg", "-y", "-loglevel", "error"]
+    if live:
+        # Keep reading video.webm as chunks are appended, and stop once it has
+        # not grown for LIVE_TRANSCODE_IDLE_SECONDS.
+        command += [
+            "-follow",
+            "1",
+            "-rw_timeout",
+            str(int(settings.LIVE_TRANSCODE_IDLE_SECONDS * 1_000_000)),
+        ]
+    command += ["-i", recording.video_path(interview_id)]
+    # One thread per process; the pools run one process per core instead.
+    command += ["-threads", "1", "-r", "30"]
+    if live:
+        command += ["-preset", "veryfast", "-hls_playlist_type", "event"]
+    command += [
+        "-hls_time",
+        "10",
+        "-hls_list_size",
+        "0",
+        "-f",
+        "hls",
+        os.path.join(directory, "video.m3u8"),
+    ]
+    return command
+
+
+async def _transcode(interview_id: int, live: bool = False, timeout: float = None):
+    process = await asyncio.create_subprocess_exec(
+        *_ffmpeg_command(interview_id, live),
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    try:
+        _, stderr = await asyncio.wait_for(process.communicate(), timeout)
+    except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+        process.kill()
+        await process.wait()
+        if isinstance(e, asyncio.CancelledError):
+            raise
+        raise RuntimeError("ffmpeg timed out")
+    if process.returncode != 0:
+        raise RuntimeError(stderr.decode(errors="replace")[-MAX_ERROR_CHARS:])
+
+
+async def _assemble(interview_id: int, db: Session):
+    """Rebuild video.webm in this node's working directory from the chunks in
+    storage, which may have been received by any node.
+
+    Recordings received before chunks were kept in storage only exist as the
+    video.webm they were appended to.
+    """
+    if not await storage.exists(recording.chunk_key(interview_id, 0)):
+        if os.path.exists(recording.video_path(interview_id)):
+            return
+    stmt = select(InterviewRecording.assembled_chunks).where(
+        InterviewRecording.interview_id == interview_id
+    )
+    chunks = db.execute(stmt).scalar()
+    await asyncio.to_thread(recording.reset_video, interview_id)
+    await recording.assemble(interview_id, 0, chunks)
+
+
+async def _publish(interview_id: int):
+    """Copy the HLS output to storage, playlist last so it never points at
+    segments that are not there yet."""
+    directory = recording.recording_dir(interview_id)
+    names = sorted(name for name in os.listdir(directory) if name.endswith(".ts"))
+    for name in names + ["video.m3u8"]:
+        await storage.put_file(
+            f"interview_video/{interview_id}/{name}",
+            os.path.join(directory, name),
+            "application/vnd.apple.mpegurl" if name.endswith(".m3u8") else "video/mp2t",
+        )
+
+
+def _finish(job, error: str, db: Session):
+    if error is None:
+        values = {"status": "done", "error": None}
+    elif job["attempts"] >= settings.TRANSCODE_MAX_ATTEMPTS:
+        values = {"status": "failed", "error": error}
+    else:
+        backoff = RETRY_BACKOFF_SECONDS * 2 ** (job["attempts"] - 1)
+        values = {
+            "status": "queued",
+            "error": error,
+            "run_after": func.now() + datetime.timedelta(seconds=backoff),
+        }
+    stmt = (
+        update(TranscodeJob)
+        .where(TranscodeJob.id == job["id"])
+        .values(finished_at=func.now(), **values)
+    )
+    db.execute(stmt)
+    db.commit()
+
+
+def _progress(interview_id: int):
+    """Status of a recording and the number of chunks stored without a gap."""
+    db = database.SessionLocal()
+    try:
+        stmt = select(
+            InterviewRecording.status, InterviewRecording.assembled_chunks
+        ).where(InterviewRecording.interview_id == interview_id)
+        return db.execute(stmt).one()
+    finally:
+        db.close()
+
+
+async def _cancel(*tasks):
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+class TranscodeWorkerPool:
+    """Runs queued transcode jobs, at most `size` ffmpeg processes at a time.
+
+    Jobs live in the transcode_jobs table, so every app process runs its own
+    pool against the same queue and a job queued by one can be picked up by
+    any of them. Workers poll every `TRANSCODE_POLL_SECONDS` and are woken
+    straight away when this process queues a job.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._wakeup = asyncio.Event()
+        self._workers = []
+
+    async def start(self):
+        self._workers = [
+            asyncio.create_task(self._work()) for _ in range(self.size)
+        ]
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def wake(self):
+        self._wakeup.set()
+
+    async def _work(self):
+        while True:
+            try:
+                ran = await self._run_next()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Transcode worker failed: {e!r}")
+                ran = False
+            if ran:
+                continue
+            try:
+                await asyncio.wait_for(
+                    self._wakeup.wait(), settings.TRANSCODE_POLL_SECONDS
+                )
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def _run_next(self):
+        db = database.SessionLocal()
+        try:
+            job = _claim(db)
+            if job is None:
+                return False
+            logger.info(
+                f"Transcoding interview {job['interview_id']} "
+                f"(attempt {job['attempts']})"
+            )
+            try:
+                await _assemble(job["interview_id"], db)
+                await _transcode(
+                    job["interview_id"], timeout=settings.TRANSCODE_TIMEOUT_SECONDS
+                )
+                await _publish(job["interview_id"])
+            except asyncio.CancelledError:
+                # Shutting down; hand the job back without using up an attempt.
+                stmt = (
+                    update(TranscodeJob)
+                    .where(TranscodeJob.id == job["id"])
+                    .values(status="queued", attempts=TranscodeJob.attempts - 1)
+                )
+                db.execute(stmt)
+                db.commit()
+                raise
+            except Exception as e:
+                logger.error(
+                    f"Transcode of interview {job['interview_id']} failed: {e}"
+                )
+                _finish(job, str(e) or repr(e), db)
+            else:
+                _finish(job, None, db)
+            return True
+        finally:
+            db.close()
+
+
+class LiveTranscoder:
+    """Segments recordings into HLS while they are still being uploaded.
+
+    Chunks are copied from storage onto a local video.webm as they are
+    stored, by whichever node, and ffmpeg follows that file, so the
+    conversion cost is spread over the interview and the playlist is final a
+    few seconds after the last chunk. At most `max_live` recordings are followed per process.
+    Recordings beyond that, and any whose live conversion fails or stops
+    early, are converted by the worker pool once the recording completes.
+    """
+
+    def __init__(self, max_live: int):
+        self.max_live = max_live
+        self._tasks = {}
+        self._wakeups = {}
+
+    async def start(self, interview_id: int, db: Session):
+        if interview_id in self._tasks or len(self._tasks) >= self.max_live:
+            return
+        stmt = (
+            insert(TranscodeJob)
+            .values(
+                interview_id=interview_id,
+                status="live",
+                started_at=func.now(),
+                heartbeat_at=func.now(),
+            )
+            .on_conflict_do_nothing()
+            .returning(TranscodeJob.id)
+        )
+        job_id = db.execute(stmt).scalar()
+        db.commit()
+        if job_id is None:
+            return
+        self._wakeups[interview_id] = asyncio.Event()
+        task = asyncio.create_task(self._follow(job_id, interview_id))
+        self._tasks[interview_id] = task
+        task.add_done_callback(lambda _: self._forget(interview_id))
+
+    def _forget(self, interview_id: int):
+        self._tasks.pop(interview_id, None)
+        self._wakeups.pop(interview_id, None)
+
+    def wake(self, interview_id: int):
+        """Copy newly stored chunks of a recording followed here right away."""
+        wakeup = self._wakeups.get(interview_id)
+        if wakeup is not None:
+            wakeup.set()
+
+    async def stop(self):
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _follow(self, job_id: int, interview_id: int):
+        await asyncio.to_thread(recording.reset_video, interview_id)
+        mirror = asyncio.create_task(self._mirror(interview_id))
+        transcode = asyncio.create_task(_transcode(interview_id, live=True))
+        error = None
+        try:
+            while not transcode.done():
+                await asyncio.wait({transcode}, timeout=settings.TRANSCODE_POLL_SECONDS)
+                self._heartbeat(job_id)
+                if mirror.done():
+                    # Raises if chunks could not be copied from storage.
+                    mirror.result()
+            transcode.result()
+            if not mirror.done():
+                raise RuntimeError("Recording stalled while live")
+            mirror.result()
+        except asyncio.CancelledError:
+            await _cancel(transcode, mirror)
+            await self._end(job_id, interview_id, "Stopped while live")
+            raise
+        except Exception as e:
+            error = str(e) or repr(e)
+        await _cancel(transcode, mirror)
+        await self._end(job_id, interview_id, error)
+
+    async def _mirror(self, interview_id: int):
+        """Append chunks onto video.webm as they are stored, until the
+        recording is complete.
+
+        Nodes that store a chunk of a recording followed here wake this
+        straight away, others are caught up with every poll.
+        """
+        wakeup = self._wakeups[interview_id]
+        appended = 0
+        while True:
+            status, assembled = _progress(interview_id)
+            if assembled > appended:
+                await recording.assemble(interview_id, appended, assembled)
+                appended = assembled
+            if status == "complete":
+                return
+            try:
+                await asyncio.wait_for(wakeup.wait(), settings.TRANSCODE_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            wakeup.clear()
+
+    def _heartbeat(self, job_id: int):
+        db = database.SessionLocal()
+        try:
+            stmt = (
+                update(TranscodeJob)
+                .where(and_(TranscodeJob.id == job_id, TranscodeJob.status == "live"))
+                .values(heartbeat_at=func.now())
+            )
+            db.execute(stmt)
+            db.commit()
+        except Exception as e:
+            logger.error(f"Failed to record live transcode heartbeat: {e!r}")
+        finally:
+            db.close()
+
+    async def _end(self, job_id: int, interview_id: int, error: str):
+        """Mark the job done, or hand it to the worker pool.
+
+        ffmpeg also stops cleanly when uploads stall mid-interview, so its
+        output only counts if the recording had completed by then.
+        """
+        db = database.SessionLocal()
+        try:
+            stmt = select(InterviewRecording.status).where(
+                InterviewRecording.interview_id == interview_id
+            )
+            if error is None and db.execute(stmt).scalar() != "complete":
+                error = "Recording stalled while live"
+            if error is None:
+                try:
+                    await _publish(interview_id)
+                except Exception as e:
+                    error = f"Failed to publish: {e!r}"
+            if error is None:
+                values = {"status": "done", "error": None}
+            else:
+                logger.warning(
+                    f"Live transcode of interview {interview_id} ended early: {error}"
+                )
+                values = {"status": "queued", "error": error, "run_after": func.now()}
+            stmt = (
+                update(TranscodeJob)
+                .where(and_(TranscodeJob.id == job_id, TranscodeJob.status == "live"))
+                .values(finished_at=func.now(), **values)
+            )
+            db.execute(stmt)
+            db.commit()
+        except Exception as e:
+            logger.error(f"Failed to finish live transcode of {interview_id}: {e!r}")
+        finally:
+            db.close()
+        if error is not None:
+            worker_pool.wake()
+
+
+worker_pool = TranscodeWorkerPool(settings.TRANSCODE_WORKERS or os.cpu_count() or 1)
+live_transcoder = LiveTranscoder(settings.LIVE_TRANSCODE_MAX or os.cpu_count() or 1)
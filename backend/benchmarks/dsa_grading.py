@@ -0,0 +1,450 @@
+"""DSA grading throughput benchmark.
+
+Starts the API with uvicorn against the database in DATABASE_URL and a fake
+Fermion server, then drives concurrent candidates through
+submit -> execution callbacks -> WebSocket result, and reports throughput and
+latency percentiles.
+
+Point DATABASE_URL at a disposable Postgres. The benchmark seeds its own
+recruiter, job, question and interviews and deletes them afterwards.
+
+    cd backend
+    DATABASE_URL=postgresql://... python -m benchmarks.dsa_grading \
+        --candidates 200 --test-cases 20 --latency-ms 150 --failure-rate 0.05
+
+`--backend local` grades with the local runner instead of the fake Fermion.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import uuid
+
+import aiohttp
+from aiohttp import web
+from dotenv import load_dotenv
+from sqlalchemy import delete
+
+load_dotenv()
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from app import database  # noqa: E402
+from app.models import (  # noqa: E402
+    DSAQuestion,
+    DSATestCase,
+    Interview,
+    Job,
+    Recruiter,
+)
+from app.utils import jwt  # noqa: E402
+
+SOLUTION = "import sys\nprint(sys.stdin.read().strip())\n"
+
+
+def percentiles(samples):
+    if not samples:
+        return "n/a"
+    samples = sorted(samples)
+
+    def at(p):
+        return samples[min(len(samples) - 1, int(len(samples) * p))]
+
+    return (
+        f"p50={at(0.50):.0f}ms p95={at(0.95):.0f}ms "
+        f"p99={at(0.99):.0f}ms max={samples[-1]:.0f}ms"
+    )
+
+
+class FakeFermion:
+    """Accepts execution batches and posts a callback per entry back to the
+    URL in its runConfig, like the real service."""
+
+    def __init__(
+        self,
+        latency_ms,
+        callback_delay_ms,
+        failure_rate,
+        batch_callbacks,
+        secret,
+        metrics=True,
+    ):
+        self.latency_ms = latency_ms
+        self.callback_delay_ms = callback_delay_ms
+        self.failure_rate = failure_rate
+        self.batch_callbacks = batch_callbacks
+        self.secret = secret
+        self.metrics = metrics
+        self.session = None
+        self.tasks = set()
+        self.stats = {"batches": 0, "callbacks": 0, "callback_errors": 0}
+
+    async def handle_batch(self, request):
+        body = await request.json()
+        entries = body["data"][0]["data"]["entries"]
+        self.stats["batches"] += 1
+        await asyncio.sleep(self.latency_ms / 1000)
+
+        task_ids = [str(uuid.uuid4()) for _ in entries]
+        task = asyncio.create_task(self.send_callbacks(entries, task_ids))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        return web.json_response([{"output": {"data": {"taskIds": task_ids}}}])
+
+    def callback_for(self, entry, task_id):
+        run_config = entry["runConfig"]
+        failed = random.random() < self.failure_rate
+        expected = run_config["expectedOutputAsBase64UrlEncoded"]
+        program_run_data = {
+            "stdoutBase64UrlEncoded": "" if failed else expected,
+            "stderrBase64UrlEncoded": "",
+        }
+        if self.metrics:
+            program_run_data.update(
+                cpuTimeUsedInMilliseconds=random.randint(5, 50),
+                wallTimeUsedInMilliseconds=random.randint(10, 80),
+                memoryUsedInKilobyte=random.randint(8000, 20000),
+            )
+        return {
+            "taskUniqueId": task_id,
+            "runConfig": run_config,
+            "runResult": {
+                "runStatus": "wrong-answer" if failed else "successful",
+                "compilerOutputAfterCompilationBase64UrlEncoded": "",
+                "programRunData": program_run_data,
+            },
+        }
+
+    async def send_callbacks(self, entries, task_ids):
+        callback_url = entries[0]["runConfig"]["callbackUrlOnExecutionCompletion"]
+        callbacks = [
+            self.callback_for(entry, task_id)
+            for entry, task_id in zip(entries, task_ids)
+        ]
+        if self.batch_callbacks:
+            await asyncio.sleep(random.uniform(0, self.callback_delay_ms) / 1000)
+            await self.post(callback_url + "/batch", callbacks, len(callbacks))
+            return
+        await asyncio.gather(
+            *(self.delayed_post(callback_url, callback) for callback in callbacks)
+        )
+
+    async def delayed_post(self, url, callback):
+        await asyncio.sleep(random.uniform(0, self.callback_delay_ms) / 1000)
+        await self.post(url, callback, 1)
+
+    async def post(self, url, payload, count):
+        body = json.dumps(payload).encode()
+        signature = hmac.new(self.secret.encode(), body, hashlib.sha256).hexdigest()
+        headers = {
+            "Content-Type": "application/json",
+            "X-Callback-Signature": signature,
+        }
+        try:
+            async with self.session.post(url, data=body, headers=headers) as response:
+                if response.status >= 400:
+                    self.stats["callback_errors"] += count
+                else:
+                    self.stats["callbacks"] += count
+        except aiohttp.ClientError:
+            self.stats["callback_errors"] += count
+
+    async def start(self, port):
+        self.session = aiohttp.ClientSession()
+        app = web.Application()
+        app.router.add_post("/request-dsa-code-execution-batch", self.handle_batch)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, "127.0.0.1", port).start()
+
+    async def stop(self):
+        if self.tasks:
+            await asyncio.gather(*self.tasks, return_exceptions=True)
+        await self.runner.cleanup()
+        await self.session.close()
+
+
+def seed(candidates, test_cases):
+    db = database.SessionLocal()
+    try:
+        recruiter = Recruiter(
+            name="Benchmark",
+            email=f"benchmark-{uuid.uuid4()}@example.com",
+            password_hash="-",
+        )
+        db.add(recruiter)
+        db.flush()
+        job = Job(title="Benchmark", company_id=recruiter.id)
+        db.add(job)
+        db.flush()
+        question = DSAQuestion(title="Echo", description="Echo stdin", job_id=job.id)
+        db.add(question)
+        db.flush()
+        db.add_all(
+            DSATestCase(
+                input=f"{i}\n" * (i + 1),
+                expected_output=f"{i}\n" * (i + 1),
+                dsa_question_id=question.id,
+            )
+            for i in range(test_cases)
+        )
+        interviews = [
+            Interview(
+                first_name="Candidate",
+                last_name=str(i),
+                email=f"candidate-{i}@example.com",
+                job_id=job.id,
+            )
+            for i in range(candidates)
+        ]
+        db.add_all(interviews)
+        db.commit()
+        return recruiter.id, question.id, [interview.id for interview in interviews]
+    finally:
+        db.close()
+
+
+def cleanup(recruiter_id):
+    db = database.SessionLocal()
+    try:
+        db.execute(delete(Recruiter).where(Recruiter.id == recruiter_id))
+        db.commit()
+    finally:
+        db.close()
+
+
+async def wait_until_up(base_url, timeout=60):
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as session:
+        while time.monotonic() < deadline:
+            try:
+                async with session.get(base_url + "/api") as response:
+                    if response.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.5)
+    raise RuntimeError("API did not start")
+
+
+async def candidate(session, base_url, interview_id, question_id, args, results):
+    token = jwt.encode({"interview_id": interview_id})
+    ws_url = base_url.replace("http", "ws", 1) + f"/api/dsa-response?i_token={token}"
+    async with session.ws_connect(ws_url) as ws:
+        started = time.perf_counter()
+        async with session.post(
+            base_url + "/api/dsa-response",
+            headers={"Authorization": f"Bearer {token}"},
+            json={
+                "language": "Python",
+                # Unique per candidate unless measuring the execution cache.
+                "code": SOLUTION
+                if args.same_code
+                else SOLUTION + f"# candidate {interview_id}\n",
+                "question_id": question_id,
+                "mode": args.mode,
+            },
+        ) as response:
+            results["submit_ms"].append((time.perf_counter() - started) * 1000)
+            if response.status != 200:
+                results["errors"] += 1
+                return
+
+        # Heartbeat pings keep arriving while results are outstanding, so the
+        # timeout applies to the whole submission rather than to each message.
+        deadline = started + args.timeout
+        first_result = None
+        while True:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining <= 0:
+                    raise asyncio.TimeoutError
+                message = await ws.receive_json(timeout=remaining)
+            except (asyncio.TimeoutError, TypeError):
+                results["timeouts"] += 1
+                return
+            if message.get("event") == "ping":
+                await ws.send_json({"event": "pong"})
+                continue
+            if message.get("event") != "execution_result":
+                continue
+
+            if message["status"] == "error":
+                results["errors"] += 1
+                return
+
+            elapsed = (time.perf_counter() - started) * 1000
+            if first_result is None:
+                first_result = elapsed
+                results["first_result_ms"].append(elapsed)
+            finished = message.get("passed_count", 0) + message.get("failed_count", 0)
+            if (
+                message["status"] == "successful"
+                or (message["status"] == "failed" and args.mode == "run")
+                or finished >= message.get("total_count", float("inf"))
+            ):
+                results["complete_ms"].append(elapsed)
+                results[message["status"]] += 1
+                return
+
+
+async def drive(args, question_id, interview_ids, base_url):
+    results = {
+        "submit_ms": [],
+        "first_result_ms": [],
+        "complete_ms": [],
+        "successful": 0,
+        "failed": 0,
+        "errors": 0,
+        "timeouts": 0,
+    }
+    connector = aiohttp.TCPConnector(limit=0)
+    async with aiohttp.ClientSession(connector=connector) as session:
+
+        async def ramped(i, interview_id):
+            await asyncio.sleep(args.ramp_seconds * i / len(interview_ids))
+            await candidate(session, base_url, interview_id, question_id, args, results)
+
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(ramped(i, interview_id) for i, interview_id in enumerate(interview_ids))
+        )
+        results["elapsed_s"] = time.perf_counter() - started
+    return results
+
+
+def report(args, results, fermion):
+    completed = len(results["complete_ms"])
+    print()
+    print(
+        f"{args.candidates} candidates x {args.test_cases} test cases, "
+        f"mode={args.mode}, backend={args.backend}, workers={args.workers}"
+    )
+    print(
+        f"completed {completed} in {results['elapsed_s']:.1f}s "
+        f"({completed / results['elapsed_s']:.1f} submissions/s, "
+        f"{completed * args.test_cases / results['elapsed_s']:.0f} test cases/s)"
+    )
+    print(
+        f"passed {results['successful']}  failed {results['failed']}  "
+        f"errors {results['errors']}  timeouts {results['timeouts']}"
+    )
+    print(f"submit        {percentiles(results['submit_ms'])}")
+    print(f"first result  {percentiles(results['first_result_ms'])}")
+    print(f"end to end    {percentiles(results['complete_ms'])}")
+    if fermion:
+        print(
+            f"fake fermion  batches={fermion.stats['batches']} "
+            f"callbacks={fermion.stats['callbacks']} "
+            f"callback_errors={fermion.stats['callback_errors']}"
+        )
+
+
+async def main(args):
+    base_url = f"http://127.0.0.1:{args.app_port}"
+    recruiter_id, question_id, interview_ids = seed(args.candidates, args.test_cases)
+    callback_secret = uuid.uuid4().hex
+
+    fermion = None
+    if args.backend == "fermion":
+        fermion = FakeFermion(
+            args.latency_ms,
+            args.callback_delay_ms,
+            args.failure_rate,
+            args.batch_callbacks,
+            callback_secret,
+            metrics=not args.without_metrics,
+        )
+        await fermion.start(args.fermion_port)
+
+    env = {
+        **os.environ,
+        "URL": base_url + "/api",
+        "FERMION_API_URL": f"http://127.0.0.1:{args.fermion_port}",
+        "CODE_EXECUTION_BACKEND": args.backend,
+        # Only the benchmark's own code runs, so a non-root run still works.
+        "LOCAL_EXECUTION_ALLOW_UNSANDBOXED": "true",
+        "PUBSUB_BACKEND": "postgres" if args.workers > 1 else "memory",
+        "DSA_CALLBACK_SECRET": callback_secret,
+    }
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.main:app",
+            "--port",
+            str(args.app_port),
+            "--workers",
+            str(args.workers),
+            "--log-level",
+            "warning",
+        ],
+        env=env,
+    )
+    try:
+        await wait_until_up(base_url)
+        results = await drive(args, question_id, interview_ids, base_url)
+        report(args, results, fermion)
+    finally:
+        server.terminate()
+        server.wait()
+        if fermion:
+            await fermion.stop()
+        cleanup(recruiter_id)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--candidates", type=int, default=100)
+    parser.add_argument("--test-cases", type=int, default=10)
+    parser.add_argument("--mode", choices=["run", "submit"], default="submit")
+    parser.add_argument("--backend", choices=["fermion", "local"], default="fermion")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--ramp-seconds", type=float, default=0)
+    parser.add_argument(
+        "--latency-ms", type=float, default=100, help="fake Fermion batch latency"
+    )
+    parser.add_argument(
+        "--callback-delay-ms",
+        type=float,
+        default=500,
+        help="callbacks are spread uniformly over this window",
+    )
+    parser.add_argument(
+        "--failure-rate",
+        type=float,
+        default=0.0,
+        help="fraction of test cases the fake Fermion reports as wrong answers",
+    )
+    parser.add_argument(
+        "--batch-callbacks",
+        action="store_true",
+        help="post each batch's callbacks together to /callback/batch",
+    )
+    parser.add_argument(
+        "--without-metrics",
+        action="store_true",
+        help="report no CPU time, wall time or memory, like compile errors and "
+        "the local runner",
+    )
+    parser.add_argument(
+        "--same-code",
+        action="store_true",
+        help="submit identical code for every candidate to exercise the cache",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=60,
+        help="seconds each submission has to finish grading",
+    )
+    parser.add_argument("--app-port", type=int, default=8765)
+    parser.add_argument("--fermion-port", type=int, default=8766)
+    asyncio.run(main(parser.parse_args()))
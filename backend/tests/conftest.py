@@ -0,0 +1,92 @@
+"""Tests run against a throwaway Postgres database named by TEST_DATABASE_URL,
+and are skipped when it is not set. Its tables are created on first use and
+emptied after every test."""
+
+import os
+
+import pytest
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+os.environ["DATABASE_URL"] = TEST_DATABASE_URL or "postgresql+psycopg2://localhost/test"
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("PUBSUB_BACKEND", "memory")
+
+
+@pytest.fixture(scope="session")
+def engine():
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    from app import models  # noqa: F401, registers the tables
+    from app.database import Base, engine
+
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+@pytest.fixture
+def db(engine):
+    from sqlalchemy import text
+
+    from app.database import Base, SessionLocal
+
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.rollback()
+        tables = ", ".join(table.name for table in Base.metadata.sorted_tables)
+        session.execute(text(f"TRUNCATE {tables} RESTART IDENTITY CASCADE"))
+        session.commit()
+        session.close()
+
+
+@pytest.fixture
+def dsa_response(db):
+    """Makes a DSA response to a question with one test case per
+    (input, expected_output) pair. Returns its id and the test case ids."""
+    from app.models import (
+        DSAQuestion,
+        DSAResponse,
+        DSATestCase,
+        Interview,
+        Job,
+        Recruiter,
+    )
+
+    from app.services.code_execution import source_hash
+
+    def make(cases, mode="submit", language="Python", code="print(input())"):
+        recruiter = Recruiter(email="recruiter@example.com", password_hash="x")
+        db.add(recruiter)
+        db.flush()
+        job = Job(title="Engineer", company_id=recruiter.id)
+        db.add(job)
+        db.flush()
+        interview = Interview(
+            first_name="Test",
+            last_name="Candidate",
+            email="candidate@example.com",
+            job_id=job.id,
+        )
+        question = DSAQuestion(title="Echo", job_id=job.id)
+        db.add_all([interview, question])
+        db.flush()
+        test_cases = [
+            DSATestCase(
+                input=input, expected_output=expected_output, dsa_question_id=question.id
+            )
+            for input, expected_output in cases
+        ]
+        response = DSAResponse(
+            code=code,
+            language=language,
+            source_hash=source_hash(code),
+            mode=mode,
+            interview_id=interview.id,
+            question_id=question.id,
+        )
+        db.add_all(test_cases + [response])
+        db.commit()
+        return response.id, question.id, [test_case.id for test_case in test_cases]
+
+    return make
@@ -0,0 +1,119 @@
+import asyncio
+
+from sqlalchemy import insert
+
+from app import database
+from app.models import (
+    AnswerEvaluation,
+    Interview,
+    InterviewQuestion,
+    InterviewQuestionAndResponse,
+    InterviewQuestionResponse,
+    Job,
+    Recruiter,
+)
+from app.services import answer_evaluation
+
+
+def _interview(db):
+    recruiter = Recruiter(email="recruiter@example.com", password_hash="x")
+    db.add(recruiter)
+    db.flush()
+    job = Job(title="Engineer", company_id=recruiter.id)
+    db.add(job)
+    db.flush()
+    interview = Interview(
+        first_name="Test",
+        last_name="Candidate",
+        email="candidate@example.com",
+        job_id=job.id,
+    )
+    questions = [
+        InterviewQuestion(
+            question=f"Custom {n}",
+            question_type="custom",
+            order_number=n,
+            job_id=job.id,
+        )
+        for n in range(2)
+    ]
+    db.add_all([interview, *questions])
+    db.flush()
+    return interview.id, [question.id for question in questions]
+
+
+def _evaluation(interview_id, score, **key):
+    return {
+        "interview_id": interview_id,
+        "score": score,
+        "technical_skills_score": score,
+        "communication_skills_score": score,
+        "problem_solving_skills_score": score,
+        "cultural_fit_score": score,
+        "feedback_for_candidate": "ok",
+        "feedback_for_recruiter": "ok",
+        "suggestions": [],
+        "keywords": [],
+        **key,
+    }
+
+
+def test_missing_evaluations_are_made_before_aggregating(db, monkeypatch):
+    interview_id, question_ids = _interview(db)
+    db.execute(
+        insert(InterviewQuestionAndResponse),
+        [
+            {
+                "interview_id": interview_id,
+                "order_number": n,
+                "question": f"Question {n}",
+                "question_type": "technical",
+                "answer": f"Answer {n}" if n < 2 else None,
+            }
+            for n in range(3)
+        ],
+    )
+    db.execute(
+        insert(InterviewQuestionResponse),
+        [
+            {"interview_id": interview_id, "question_id": id, "answer": "Custom"}
+            for id in question_ids
+        ],
+    )
+    db.execute(
+        insert(AnswerEvaluation),
+        [
+            _evaluation(interview_id, 80, question_order=0),
+            _evaluation(interview_id, 80, question_id=question_ids[0]),
+        ],
+    )
+    db.commit()
+    assert answer_evaluation.aggregate_evaluations(interview_id, db) is None
+
+    evaluated = []
+
+    async def evaluate_answer(interview_id, answer, **key):
+        evaluated.append(dict(key))
+        key.pop("question", None)
+        key.pop("question_type", None)
+        with database.SessionLocal() as session:
+            session.execute(
+                insert(AnswerEvaluation).values(_evaluation(interview_id, 40, **key))
+            )
+            session.commit()
+
+    monkeypatch.setattr(answer_evaluation, "evaluate_answer", evaluate_answer)
+    asyncio.run(answer_evaluation.evaluate_missing(interview_id, db))
+
+    assert sorted(evaluated, key=str) == sorted(
+        [
+            {
+                "question": "Question 1",
+                "question_type": "technical",
+                "question_order": 1,
+            },
+            {"question_id": question_ids[1]},
+        ],
+        key=str,
+    )
+    assert answer_evaluation.aggregate_evaluations(interview_id, db)["score"] == 60
@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException, Request
+from sqlalchemy import delete
+
+from app import schemas
+from app.config import settings
+from app.dependencies.authorization import (
+    RecruiterPrincipal,
+    authorize_operator,
+    job_ids_cache,
+)
+from app.lib.errors import CustomException
+from app.models import Job, Recruiter
+from app.routes import dsa_question as dsa_question_routes
+from app.routes import job as job_routes
+
+
+def test_deleted_job_is_no_longer_owned(db):
+    recruiter = Recruiter(email="recruiter@example.com", password_hash="x")
+    db.add(recruiter)
+    db.flush()
+    job = Job(title="Engineer", company_id=recruiter.id)
+    db.add(job)
+    db.commit()
+    assert RecruiterPrincipal(recruiter.id, db).owns_job(job.id)
+
+    asyncio.run(
+        job_routes.delete_job(str(job.id), db, RecruiterPrincipal(recruiter.id, db))
+    )
+
+    assert job_ids_cache.get(recruiter.id) is None
+    assert not RecruiterPrincipal(recruiter.id, db).owns_job(job.id)
+
+
+def _request(headers):
+    return Request(
+        {
+            "type": "http",
+            "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+        }
+    )
+
+
+def test_stats_need_the_operator_key(monkeypatch):
+    monkeypatch.setattr(settings, "OPERATOR_API_KEY", "")
+    with pytest.raises(CustomException) as error:
+        authorize_operator(_request({"X-Operator-Key": ""}))
+    assert error.value.code == 403
+
+    monkeypatch.setattr(settings, "OPERATOR_API_KEY", "operator-key")
+    with pytest.raises(CustomException) as error:
+        authorize_operator(_request({"Authorization": "Bearer recruiter-token"}))
+    assert error.value.code == 401
+    authorize_operator(_request({"X-Operator-Key": "operator-key"}))
+
+
+def test_question_for_a_job_deleted_elsewhere_is_not_found(db):
+    recruiter = Recruiter(email="recruiter@example.com", password_hash="x")
+    db.add(recruiter)
+    db.flush()
+    job = Job(title="Engineer", company_id=recruiter.id)
+    db.add(job)
+    db.commit()
+    assert RecruiterPrincipal(recruiter.id, db).owns_job(job.id)
+    # Deleted by another worker, whose cache eviction this one never sees.
+    db.execute(delete(Job).where(Job.id == job.id))
+    db.commit()
+
+    question = schemas.CreateDSAQuestion(
+        title="Echo", description="", difficulty="easy", job_id=job.id, test_cases=[]
+    )
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(
+            dsa_question_routes.create_dsa_question(
+                question, db, RecruiterPrincipal(recruiter.id, db)
+            )
+        )
+
+    assert error.value.status_code == 404
+    assert job_ids_cache.get(recruiter.id) is None
@@ -0,0 +1,32 @@
+import asyncio
+import json
+
+from app.lib.connection_manager import InterviewConnectionManager
+
+
+class RecordingBroker:
+    MAX_PAYLOAD_BYTES = 300
+
+    def __init__(self):
+        self.messages = []
+
+    def subscribe(self, channel, handler):
+        pass
+
+    async def publish(self, channel, message):
+        self.messages.append(message)
+
+
+def test_send_many_splits_events_to_fit_payload_limit():
+    broker = RecordingBroker()
+    manager = InterviewConnectionManager(broker)
+    events = [{"event": "execution_result", "output": "x" * 60} for _ in range(10)]
+    events.append({"event": "execution_result", "output": "y" * 500})
+
+    asyncio.run(manager.send_many(7, events))
+
+    assert len(broker.messages) > 1
+    assert [event for m in broker.messages for event in m["events"]] == events
+    for message in broker.messages[:-1]:
+        assert len(json.dumps(message)) <= RecordingBroker.MAX_PAYLOAD_BYTES
+    assert broker.messages[-1]["events"] == events[-1:]
@@ -0,0 +1,79 @@
+import hashlib
+import hmac
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.routes import dsa_response
+from app.utils import jwt
+
+
+@pytest.fixture
+def client(monkeypatch):
+    received = []
+
+    async def add(result):
+        received.append(result)
+
+    monkeypatch.setattr(settings, "DSA_CALLBACK_SECRET", "secret")
+    monkeypatch.setattr(
+        dsa_response.services.code_execution.result_batcher, "add", add
+    )
+    monkeypatch.setattr(
+        dsa_response.services.code_execution, "parse_callback", lambda data: data
+    )
+    app = FastAPI()
+    app.include_router(dsa_response.router, prefix="/dsa-response")
+    client = TestClient(app)
+    client.received = received
+    return client
+
+
+def _post(client, body: bytes, signature: str):
+    return client.post(
+        "/dsa-response/callback/batch",
+        content=body,
+        headers={"X-Callback-Signature": signature},
+    )
+
+
+def test_batch_callback_accepts_signed_body(client):
+    body = json.dumps([{"taskUniqueId": "a"}, {"taskUniqueId": "b"}]).encode()
+    signature = hmac.new(b"secret", body, hashlib.sha256).hexdigest()
+
+    response = _post(client, body, signature)
+
+    assert response.status_code == 200
+    assert response.json() == {"received": 2}
+    assert len(client.received) == 2
+
+
+def test_batch_callback_rejects_bad_signature(client):
+    body = json.dumps([{"taskUniqueId": "a"}]).encode()
+
+    response = _post(client, body, "0" * 64)
+
+    assert response.status_code == 401
+    assert client.received == []
+
+
+def test_batch_callback_rejected_without_secret(client, monkeypatch):
+    monkeypatch.setattr(settings, "DSA_CALLBACK_SECRET", "")
+    body = json.dumps([]).encode()
+
+    response = _post(client, body, hmac.new(b"", body, hashlib.sha256).hexdigest())
+
+    assert response.status_code == 403
+
+
+def test_websocket_answers_messages_that_are_not_objects(client):
+    token = jwt.encode({"interview_id": 1})
+    with client.websocket_connect(f"/dsa-response?i_token={token}") as websocket:
+        websocket.send_json([1, 2])
+        assert websocket.receive_json() == {"message": "working..."}
+        websocket.send_json({"event": "pong"})
+        websocket.send_json("hello")
+        assert websocket.receive_json() == {"message": "working..."}
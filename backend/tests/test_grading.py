@@ -0,0 +1,71 @@
+from sqlalchemy import insert, select
+
+from app.models import DSAResponse, DSATestCaseResponse
+from app.services.code_execution.base import ExecutionResult
+from app.services.code_execution.grading import _record_statement
+
+
+def _pending(db, dsa_response_id, test_case_ids):
+    db.execute(
+        insert(DSATestCaseResponse),
+        [
+            {
+                "dsa_response_id": dsa_response_id,
+                "dsa_test_case_id": test_case_id,
+                "status": "pending",
+                "task_id": f"task-{test_case_id}",
+            }
+            for test_case_id in test_case_ids
+        ],
+    )
+    db.execute(
+        DSAResponse.__table__.update()
+        .where(DSAResponse.id == dsa_response_id)
+        .values(total_count=len(test_case_ids), dispatched_count=len(test_case_ids))
+    )
+    db.commit()
+
+
+def test_records_batch_without_any_metrics(db, dsa_response):
+    """Local results, cache hits and compile errors carry no CPU time,
+    wall time or memory at all."""
+    dsa_response_id, _, test_case_ids = dsa_response([("1", "1"), ("2", "2")])
+    _pending(db, dsa_response_id, test_case_ids)
+
+    results = [
+        ExecutionResult(task_id=f"task-{test_case_ids[0]}", status="successful"),
+        ExecutionResult(
+            task_id=f"task-{test_case_ids[1]}",
+            status="compilation-error",
+            compiler_output="error",
+        ),
+    ]
+    rows = db.execute(_record_statement(results)).mappings().all()
+    db.commit()
+
+    assert {row["task_id"] for row in rows} == {result.task_id for result in results}
+    assert rows[0]["passed_count"] == 1
+    assert rows[0]["failed_count"] == 1
+    stmt = select(
+        DSATestCaseResponse.status,
+        DSATestCaseResponse.cpu_time_ms,
+        DSATestCaseResponse.memory_kb,
+    ).order_by(DSATestCaseResponse.dsa_test_case_id)
+    assert [tuple(row) for row in db.execute(stmt)] == [
+        ("successful", None, None),
+        ("compilation-error", None, None),
+    ]
+
+
+def test_records_batch_with_partial_metrics(db, dsa_response):
+    dsa_response_id, _, test_case_ids = dsa_response([("1", "1")])
+    _pending(db, dsa_response_id, test_case_ids)
+
+    result = ExecutionResult(
+        task_id=f"task-{test_case_ids[0]}", status="successful", wall_time_ms=12
+    )
+    db.execute(_record_statement([result])).mappings().all()
+    db.commit()
+
+    stmt = select(DSATestCaseResponse.wall_time_ms, DSATestCaseResponse.cpu_time_ms)
+    assert tuple(db.execute(stmt).one()) == (12, None)
@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+from aiohttp import web
+
+from app.lib.errors import CustomException
+from app.lib.http_client import PooledHTTPClient
+
+
+async def _call(statuses, **kwargs):
+    """Posts once to a server answering with `statuses` in turn. Returns the
+    number of requests it received and the client."""
+    received = []
+
+    async def handle(request):
+        received.append(request)
+        status = statuses[min(len(received), len(statuses)) - 1]
+        return web.json_response({"ok": True}, status=status)
+
+    app = web.Application()
+    app.router.add_post("/batch", handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    client = PooledHTTPClient(
+        "Test", f"http://127.0.0.1:{port}", max_retries=2, failure_threshold=1
+    )
+    try:
+        try:
+            await client.post_json("/batch", {}, **kwargs)
+        except CustomException:
+            pass
+    finally:
+        await client.stop()
+        await runner.cleanup()
+    return len(received), client
+
+
+@pytest.mark.parametrize("status", [502, 504])
+def test_post_is_not_retried_after_it_may_have_been_processed(status):
+    requests, _ = asyncio.run(_call([status, 200]))
+    assert requests == 1
+
+
+def test_idempotent_post_is_retried():
+    requests, _ = asyncio.run(_call([502, 200], idempotent=True))
+    assert requests == 2
+
+
+def test_rejected_post_is_retried():
+    requests, _ = asyncio.run(_call([429, 200]))
+    assert requests == 2
+
+
+def test_client_errors_do_not_open_circuit():
+    _, client = asyncio.run(_call([400]))
+    assert client.breaker.state == "closed"
+
+
+def test_server_errors_open_circuit():
+    _, client = asyncio.run(_call([500]))
+    assert client.breaker.state == "open"
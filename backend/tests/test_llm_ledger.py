@@ -0,0 +1,56 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.lib import llm_ledger
+
+
+class FakeCompletions:
+    def __init__(self):
+        self.kwargs = None
+
+    async def create(self, **kwargs):
+        self.kwargs = kwargs
+
+        async def stream():
+            for content in ("Hel", "lo"):
+                delta = SimpleNamespace(content=content)
+                yield SimpleNamespace(
+                    choices=[SimpleNamespace(delta=delta)], usage=None
+                )
+            usage = SimpleNamespace(prompt_tokens=12, completion_tokens=2)
+            yield SimpleNamespace(choices=[], usage=usage)
+
+        return stream()
+
+
+@pytest.fixture
+def recorded(monkeypatch):
+    calls = []
+    monkeypatch.setattr(llm_ledger, "_buffer", calls)
+    return calls
+
+
+def test_streamed_completion_records_usage_from_final_chunk(recorded):
+    completions = FakeCompletions()
+    client = llm_ledger.InstrumentedOpenAI(
+        SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    )
+
+    async def run():
+        stream = await client.chat.completions.create(
+            model="gpt-4", messages=[], stream=True
+        )
+        assert recorded == []
+        return [chunk async for chunk in stream if chunk.choices]
+
+    chunks = asyncio.run(run())
+
+    assert len(chunks) == 2
+    assert completions.kwargs["stream_options"] == {"include_usage": True}
+    assert len(recorded) == 1
+    assert recorded[0]["outcome"] == "success"
+    assert recorded[0]["prompt_tokens"] == 12
+    assert recorded[0]["completion_tokens"] == 2
+    assert recorded[0]["cost_usd"] is not None
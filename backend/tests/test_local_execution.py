@@ -0,0 +1,42 @@
+import asyncio
+import shutil
+
+import pytest
+
+from app.services.code_execution import local
+
+pytestmark = pytest.mark.skipif(
+    shutil.which("python3") is None, reason="python3 is not installed"
+)
+
+
+def _run(code, stdin="", timeout=5):
+    return asyncio.run(
+        local._run_measured(["python3", "-c", code], "/tmp", stdin, timeout)
+    )
+
+
+def test_usage_is_the_test_case_own():
+    # Resident memory of this process, which a forked child would inherit.
+    ballast = bytearray(200 * 1024 * 1024)
+    ballast[::4096] = b"x" * len(ballast[::4096])
+
+    returncode, stdout, _, usage = _run(
+        "import sys\nx = bytearray(64 * 1024 * 1024)\n"
+        "x[::4096] = b'x' * len(x[::4096])\nprint(sys.stdin.read())",
+        stdin="hello",
+    )
+    *_, small_usage = _run("pass")
+
+    assert (returncode, stdout) == (0, "hello\n")
+    wall_time_ms, cpu_time_ms, memory_kb = usage
+    assert 0 < cpu_time_ms <= wall_time_ms + 5
+    assert 64 * 1024 < memory_kb < 150 * 1024
+    assert small_usage[2] < 64 * 1024
+
+
+def test_signals_and_timeouts():
+    returncode, _, _, usage = _run("import os\nos.kill(os.getpid(), 11)")
+    assert returncode == -11 and usage is not None
+
+    assert _run("while True: pass", timeout=0.5) == (None, "", "", None)
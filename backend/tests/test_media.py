@@ -0,0 +1,33 @@
+import asyncio
+
+from fastapi import Request
+
+from app.lib import media
+from app.lib.storage import LocalStorage
+
+HASH = "c" * 32
+
+
+def _cache_control(storage, key):
+    request = Request({"type": "http", "headers": []})
+    response = asyncio.run(media.serve(storage, key, request))
+    return response.headers["cache-control"]
+
+
+def test_only_public_assets_are_cached_for_good(tmp_path):
+    storage = LocalStorage(str(tmp_path), "http://api.test/uploads")
+    keys = [
+        f"image/quiz/{HASH}.png",
+        f"resume/1/{HASH}.pdf",
+        f"report/1/{HASH}.pdf",
+        f"screenshot/1/{HASH}.png",
+    ]
+    for key in keys:
+        asyncio.run(storage.put(key, b"data"))
+
+    assert [_cache_control(storage, key) for key in keys] == [
+        "public, max-age=31536000, immutable",
+        "private, no-cache",
+        "private, no-cache",
+        "private, no-cache",
+    ]
@@ -0,0 +1,38 @@
+import asyncio
+
+from app.database import engine
+from app.lib.pubsub import PostgresBroker
+
+
+def _dsn():
+    return engine.url.set(drivername="postgresql").render_as_string(
+        hide_password=False
+    )
+
+
+async def _roundtrip(message):
+    received = asyncio.Queue()
+
+    async def handler(message):
+        await received.put(message)
+
+    publisher = PostgresBroker(_dsn())
+    listener = PostgresBroker(_dsn())
+    listener.subscribe("test_events", handler)
+    await listener.start()
+    try:
+        await publisher.publish("test_events", message)
+        return await asyncio.wait_for(received.get(), timeout=5)
+    finally:
+        await listener.stop()
+        await publisher.stop()
+
+
+def test_delivers_small_message(db):
+    message = {"interview_id": 1, "events": [{"event": "ping"}]}
+    assert asyncio.run(_roundtrip(message)) == message
+
+
+def test_delivers_oversized_message_to_other_brokers(db):
+    message = {"interview_id": 1, "events": [{"output": "x" * 20000}]}
+    assert asyncio.run(_roundtrip(message)) == message
@@ -0,0 +1,83 @@
+from sqlalchemy import insert
+
+from app.models import InterviewQuestion, InterviewQuestionPool, Job, Recruiter
+from app.services import question_pool
+
+
+def _job(db, custom_types):
+    recruiter = Recruiter(email="recruiter@example.com", password_hash="x")
+    db.add(recruiter)
+    db.flush()
+    job = Job(title="Engineer", company_id=recruiter.id)
+    db.add(job)
+    db.flush()
+    custom_questions = [
+        InterviewQuestion(
+            question=f"Custom {n}",
+            question_type=question_type,
+            order_number=n,
+            job_id=job.id,
+        )
+        for n, question_type in enumerate(custom_types)
+    ]
+    db.add_all(custom_questions)
+    db.flush()
+    return job.id, custom_questions
+
+
+def _pool(db, job_id, entries):
+    db.execute(
+        insert(InterviewQuestionPool),
+        [
+            {
+                "question": question,
+                "question_type": question_type,
+                "interview_question_id": interview_question_id,
+                "job_id": job_id,
+            }
+            for question, question_type, interview_question_id in entries
+        ],
+    )
+    db.commit()
+
+
+def test_custom_questions_are_always_sampled(db):
+    job_id, custom = _job(db, ["technical", "custom"])
+    _pool(
+        db,
+        job_id,
+        [(f"Generated {n}", "technical", None) for n in range(20)]
+        + [(f"Behavioral {n}", "behavioral", None) for n in range(5)]
+        + [("Custom 0 variant", "technical", custom[0].id)]
+        + [("Custom 1", "custom", custom[1].id)],
+    )
+
+    for _ in range(20):
+        questions = question_pool.sample_questions(job_id, db)
+        texts = [question["question"] for question in questions]
+        assert len(questions) == len(question_pool.QUESTION_TYPES)
+        assert "Custom 1" in texts
+        assert "Custom 0" not in texts and "Custom 0 variant" in texts
+
+
+def test_custom_question_added_after_the_pool_is_sampled_as_written(db):
+    job_id, _ = _job(db, [])
+    _pool(db, job_id, [(f"Generated {n}", "technical", None) for n in range(20)])
+    db.add(
+        InterviewQuestion(
+            question="New custom", question_type="behavioral", job_id=job_id
+        )
+    )
+    db.commit()
+
+    texts = [q["question"] for q in question_pool.sample_questions(job_id, db)]
+
+    assert "New custom" in texts
+    assert len(texts) == len(question_pool.QUESTION_TYPES)
+
+
+def test_no_pool_samples_nothing(db):
+    job_id, _ = _job(db, ["technical"])
+    db.commit()
+
+    assert question_pool.sample_questions(job_id, db) == []
@@ -0,0 +1,135 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app.models import Interview, InterviewQuestionAndResponse, Job, Recruiter
+from app.routes import interview_question_and_response as routes
+from app.services import question_pool
+
+
+class FakeCompletions:
+    def __init__(self, pieces):
+        self.pieces = pieces
+
+    async def create(self, **kwargs):
+        async def stream():
+            for piece in self.pieces:
+                delta = SimpleNamespace(content=piece)
+                yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+        return stream()
+
+
+@pytest.fixture
+def interview(db, monkeypatch):
+    async def schedule(job_id):
+        pass
+
+    monkeypatch.setattr(question_pool, "schedule_question_pool_generation", schedule)
+
+    def make(resume_text="Five years of Python", pieces=()):
+        monkeypatch.setattr(
+            routes.openai,
+            "client",
+            SimpleNamespace(
+                chat=SimpleNamespace(completions=FakeCompletions(list(pieces)))
+            ),
+        )
+        recruiter = Recruiter(email="recruiter@example.com", password_hash="x")
+        db.add(recruiter)
+        db.flush()
+        job = Job(title="Engineer", company_id=recruiter.id)
+        db.add(job)
+        db.flush()
+        interview = Interview(
+            first_name="Test",
+            last_name="Candidate",
+            email="candidate@example.com",
+            job_id=job.id,
+            resume_text=resume_text,
+        )
+        db.add(interview)
+        db.commit()
+        return interview.id
+
+    return make
+
+
+def _events(interview_id, limit=None):
+    async def collect():
+        events = []
+        generator = routes._question_events(interview_id)
+        async for event in generator:
+            name, data = event.strip().split("\n")
+            events.append((name[len("event: ") :], json.loads(data[len("data: ") :])))
+            if len(events) == limit:
+                await generator.aclose()
+                break
+        return events
+
+    return asyncio.run(collect())
+
+
+def _saved(db, interview_id):
+    db.expire_all()
+    return db.query(InterviewQuestionAndResponse).filter_by(
+        interview_id=interview_id
+    ).count()
+
+
+QUESTIONS = (
+    '[{"question": "Hello! Tell me about Python.", "type": "technical"},',
+    ' {"question": "Why this role?", "type": "behavioral"}]',
+)
+
+
+def test_questions_are_saved_as_they_are_generated(db, interview):
+    interview_id = interview(pieces=QUESTIONS)
+
+    events = _events(interview_id, limit=1)
+
+    assert [name for name, _ in events] == ["question"]
+    assert _saved(db, interview_id) == 1
+
+
+def test_complete_set_is_replayed(db, interview):
+    interview_id = interview(pieces=QUESTIONS)
+    _events(interview_id)
+
+    events = _events(interview_id)
+
+    assert [name for name, _ in events] == ["question", "question", "done"]
+    assert _saved(db, interview_id) == 2
+
+
+def test_interrupted_set_is_generated_again(db, interview):
+    interview_id = interview(pieces=QUESTIONS)
+    _events(interview_id, limit=1)
+
+    events = _events(interview_id)
+
+    assert [name for name, _ in events] == ["question", "question", "done"]
+    assert [data["order_number"] for _, data in events[:2]] == [0, 1]
+    assert _saved(db, interview_id) == 2
+
+
+def test_malformed_question_sends_error(db, interview):
+    interview_id = interview(pieces=('[{"question": "Hi", "type": }]',))
+
+    events = _events(interview_id)
+
+    assert events[-1][0] == "error"
+    db.expire_all()
+    assert db.get(Interview, interview_id).questions_generated_at is None
+
+
+def test_default_question_without_resume_or_description(db, interview):
+    interview_id = interview(resume_text=None)
+
+    events = _events(interview_id)
+
+    assert [name for name, _ in events] == ["question", "done"]
+    assert events[0][1]["question"] == routes.DEFAULT_QUESTION["question"]
+    assert _saved(db, interview_id) == 1
@@ -0,0 +1,60 @@
+import asyncio
+
+from sqlalchemy import select
+
+from app.config import settings
+from app.lib.storage import LocalStorage
+from app.models import Interview, InterviewRecording, Job, Recruiter
+from app.services import recording, transcoding
+
+
+async def _body(data: bytes):
+    yield data[:3]
+    yield data[3:]
+
+
+def _interview(db):
+    recruiter = Recruiter(email="recruiter@example.com", password_hash="x")
+    db.add(recruiter)
+    db.flush()
+    job = Job(title="Engineer", company_id=recruiter.id)
+    db.add(job)
+    db.flush()
+    interview = Interview(
+        first_name="Test", last_name="Candidate", email="c@example.com", job_id=job.id
+    )
+    db.add(interview)
+    db.commit()
+    return interview.id
+
+
+def test_chunks_received_by_any_node_are_assembled(db, monkeypatch, tmp_path):
+    storage = LocalStorage(str(tmp_path / "storage"), "http://api.test/uploads")
+    monkeypatch.setattr(recording, "storage", storage)
+    monkeypatch.setattr(transcoding, "storage", storage)
+    monkeypatch.setattr(transcoding, "live_transcoder", transcoding.LiveTranscoder(0))
+    interview_id = _interview(db)
+
+    async def ingest(node, seq, data):
+        monkeypatch.setattr(settings, "RECORDING_SPOOL_DIR", str(tmp_path / node))
+        return await recording.ingest_chunk(interview_id, seq, _body(data), db)
+
+    async def run():
+        await ingest("a", 1, b"second chunk")
+        await ingest("b", 0, b"first chunk,")
+        assert (await ingest("a", 0, b"first chunk,"))["duplicate"]
+        await recording.finish(interview_id, 2, db)
+
+        monkeypatch.setattr(settings, "RECORDING_SPOOL_DIR", str(tmp_path / "c"))
+        await transcoding._assemble(interview_id, db)
+
+    asyncio.run(run())
+
+    stmt = select(InterviewRecording).where(
+        InterviewRecording.interview_id == interview_id
+    )
+    stored = db.execute(stmt).scalar_one()
+    assert (stored.assembled_chunks, stored.duplicate_chunks) == (2, 1)
+    assert stored.status == "complete"
+    with open(recording.video_path(interview_id), "rb") as f:
+        assert f.read() == b"first chunk,second chunk"
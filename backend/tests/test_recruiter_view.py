@@ -0,0 +1,45 @@
+import asyncio
+
+from app.lib.storage import LocalStorage
+from app.models import Interview, Job, Recruiter
+from app.routes import interview as interview_routes
+
+
+def test_only_legacy_interviews_list_stored_screenshots(db, monkeypatch, tmp_path):
+    storage = LocalStorage(str(tmp_path), "http://api.test/uploads")
+    monkeypatch.setattr(interview_routes, "storage", storage)
+    recruiter = Recruiter(email="recruiter@example.com", password_hash="x")
+    db.add(recruiter)
+    db.flush()
+    job = Job(title="Engineer", company_id=recruiter.id)
+    db.add(job)
+    db.flush()
+    interviews = [
+        Interview(
+            first_name="Test",
+            last_name="Candidate",
+            email=f"{n}@example.com",
+            job_id=job.id,
+            legacy_screenshots=legacy,
+        )
+        for n, legacy in enumerate([True, False])
+    ]
+    db.add_all(interviews)
+    db.commit()
+    for interview in interviews:
+        asyncio.run(storage.put(f"screenshot/{interview.id}/old.png", b"png"))
+
+    legacy, new = [
+        asyncio.run(
+            interview_routes.get_interview_recruiter_view(
+                str(interview.id), db, recruiter.id
+            )
+        )
+        for interview in interviews
+    ]
+
+    assert legacy["screenshot_urls"] == [
+        f"http://api.test/uploads/screenshot/{interviews[0].id}/old.png"
+    ]
+    assert (new["screenshot_urls"], new["screenshot_count"]) == ([], 0)
+    assert "legacy_screenshots" not in new
@@ -0,0 +1,111 @@
+import asyncio
+import datetime
+
+from sqlalchemy import insert, select, update
+
+from app.config import settings
+from app.models import (
+    Interview,
+    Job,
+    MediaDeletion,
+    MediaPurge,
+    Recruiter,
+    Screenshot,
+)
+from app.services import retention
+
+
+class FailingStorage:
+    def __init__(self):
+        self.calls = 0
+
+    async def delete_prefix(self, key):
+        self.calls += 1
+        raise OSError("storage unavailable")
+
+
+def _queue(db, count):
+    db.execute(
+        insert(MediaDeletion),
+        [{"key": f"video/{n}", "is_prefix": True} for n in range(count)],
+    )
+    db.commit()
+
+
+def test_failed_deletions_back_off(db, monkeypatch):
+    monkeypatch.setattr(retention, "storage", FailingStorage())
+    _queue(db, 2)
+
+    assert asyncio.run(retention.process_deletions(db)) == (2, 0)
+    assert asyncio.run(retention.process_deletions(db)) == (0, 0)
+
+    deletions = db.execute(select(MediaDeletion)).scalars().all()
+    assert [deletion.attempts for deletion in deletions] == [1, 1]
+    assert all(deletion.retry_after > deletion.created_at for deletion in deletions)
+
+
+def test_run_stops_when_a_batch_makes_no_progress(db, monkeypatch):
+    storage = FailingStorage()
+    monkeypatch.setattr(retention, "storage", storage)
+    monkeypatch.setattr(settings, "RETENTION_BATCH_SIZE", 2)
+    monkeypatch.setattr(settings, "MEDIA_DELETION_RETRY_SECONDS", 0)
+    _queue(db, 4)
+
+    asyncio.run(retention.run_once())
+
+    assert storage.calls == 2
+
+
+def _days_ago(days):
+    return datetime.datetime.now() - datetime.timedelta(days=days)
+
+
+def test_media_is_aged_from_when_it_was_written(db, monkeypatch):
+    monkeypatch.setattr(settings, "RETENTION_DEFAULT_SCREENSHOT_DAYS", 30)
+    recruiter = Recruiter(email="recruiter@example.com", password_hash="x")
+    db.add(recruiter)
+    db.flush()
+    job = Job(title="Engineer", company_id=recruiter.id)
+    db.add(job)
+    db.flush()
+    interviews = [
+        Interview(
+            first_name="Test",
+            last_name="Candidate",
+            email=f"{n}@example.com",
+            job_id=job.id,
+            created_at=_days_ago(40),
+        )
+        for n in range(2)
+    ]
+    db.add_all(interviews)
+    db.flush()
+    old, recent = [interview.id for interview in interviews]
+    db.add(
+        Screenshot(
+            interview_id=recent,
+            taken_at=_days_ago(5),
+            size=1,
+            storage_key="screenshot/recent.png",
+        )
+    )
+    db.commit()
+
+    # Nothing was stored for the old interview, which is purged all the same.
+    assert asyncio.run(retention.apply_policies(db)) == 1
+    assert asyncio.run(retention.apply_policies(db)) == 0
+
+    # Screenshots stored after that purge are purged once they are old too.
+    db.execute(update(MediaPurge).values(purged_at=_days_ago(38)))
+    db.add(
+        Screenshot(
+            interview_id=old,
+            taken_at=_days_ago(35),
+            size=1,
+            storage_key="screenshot/old.png",
+        )
+    )
+    db.commit()
+    assert asyncio.run(retention.apply_policies(db)) == 1
+    assert db.execute(select(Screenshot.interview_id)).scalars().all() == [recent]
+    assert asyncio.run(retention.apply_policies(db)) == 0
@@ -0,0 +1,121 @@
+import asyncio
+
+from sqlalchemy import select, update
+
+from app.config import settings
+from app.models import (
+    DSAExecutionCache,
+    DSAResponse,
+    DSATestCase,
+    DSATestCaseResponse,
+)
+from app.services.code_execution import backends, grading, scheduler
+from app.services.code_execution.base import ExecutionResult
+
+CASES = [(str(n), str(n)) for n in range(6)]
+
+
+class FakeSubmit:
+    def __init__(self):
+        self.batches = []
+        self.error = None
+
+    async def __call__(self, language, code, test_cases):
+        if self.error:
+            raise self.error
+        self.batches.append([test_case["id"] for test_case in test_cases])
+        return [f"task-{test_case['id']}" for test_case in test_cases]
+
+
+def _statuses(db, dsa_response_id):
+    stmt = (
+        select(DSATestCaseResponse.status)
+        .where(DSATestCaseResponse.dsa_response_id == dsa_response_id)
+        .order_by(DSATestCaseResponse.dsa_test_case_id)
+    )
+    return db.execute(stmt).scalars().all()
+
+
+def test_run_dispatches_first_wave_only(db, dsa_response, monkeypatch):
+    submit = FakeSubmit()
+    monkeypatch.setattr(backends, "submit", submit)
+    dsa_response_id, question_id, _ = dsa_response(CASES, mode="run")
+
+    asyncio.run(
+        scheduler.schedule(dsa_response_id, question_id, "Python", "code", "run", db)
+    )
+
+    assert [len(batch) for batch in submit.batches] == [
+        settings.DSA_RUN_FIRST_WAVE_SIZE
+    ]
+    stmt = select(DSAResponse.dispatched_count).where(DSAResponse.id == dsa_response_id)
+    assert db.execute(stmt).scalar() == settings.DSA_RUN_FIRST_WAVE_SIZE
+    assert _statuses(db, dsa_response_id).count("pending") == (
+        settings.DSA_RUN_FIRST_WAVE_SIZE
+    )
+
+
+def test_submit_dispatches_whole_suite(db, dsa_response, monkeypatch):
+    submit = FakeSubmit()
+    monkeypatch.setattr(backends, "submit", submit)
+    dsa_response_id, question_id, _ = dsa_response(CASES)
+
+    asyncio.run(
+        scheduler.schedule(dsa_response_id, question_id, "Python", "code", "submit", db)
+    )
+
+    assert [len(batch) for batch in submit.batches] == [len(CASES)]
+
+
+def test_run_is_abandoned_when_next_wave_fails(db, dsa_response, monkeypatch):
+    submit = FakeSubmit()
+    monkeypatch.setattr(backends, "submit", submit)
+    events = []
+
+    async def send_many(interview_id, interview_events):
+        events.extend(interview_events)
+
+    monkeypatch.setattr(grading.interview_connection_manager, "send_many", send_many)
+    dsa_response_id, question_id, _ = dsa_response(CASES, mode="run")
+    asyncio.run(
+        scheduler.schedule(dsa_response_id, question_id, "Python", "code", "run", db)
+    )
+
+    submit.error = RuntimeError("unreachable")
+    results = [
+        ExecutionResult(task_id=f"task-{test_case_id}", status="successful")
+        for test_case_id in submit.batches[0]
+    ]
+    asyncio.run(grading.process_results(results, db))
+
+    statuses = _statuses(db, dsa_response_id)
+    assert "queued" not in statuses
+    assert statuses.count("skipped") == len(CASES) - len(results)
+    assert events[-1]["status"] == "error"
+
+
+def test_result_is_cached_under_dispatched_revision(db, dsa_response, monkeypatch):
+    submit = FakeSubmit()
+    monkeypatch.setattr(backends, "submit", submit)
+    monkeypatch.setattr(grading.interview_connection_manager, "send_many", _ignore)
+    dsa_response_id, question_id, test_case_ids = dsa_response(CASES[:1])
+    asyncio.run(
+        scheduler.schedule(dsa_response_id, question_id, "Python", "code", "submit", db)
+    )
+
+    # The test case is edited while its result is on the way.
+    db.execute(
+        update(DSATestCase)
+        .where(DSATestCase.id == test_case_ids[0])
+        .values(revision=DSATestCase.revision + 1)
+    )
+    db.commit()
+    result = ExecutionResult(task_id=f"task-{test_case_ids[0]}", status="successful")
+    asyncio.run(grading.process_results([result], db))
+
+    stmt = select(DSAExecutionCache.test_case_revision)
+    assert db.execute(stmt).scalars().all() == [1]
+
+
+async def _ignore(*args):
+    pass
@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+
+moto = pytest.importorskip("moto")
+
+from app.lib.storage import S3Storage  # noqa: E402
+
+
+@pytest.fixture
+def storage(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    with moto.mock_aws():
+        storage = S3Storage(
+            "media",
+            "http://api.test/uploads",
+            region="us-east-1",
+            archive_storage_class="STANDARD_IA",
+        )
+        storage._client.create_bucket(Bucket="media")
+        yield storage
+
+
+async def _read(storage, key, start=0, end=None):
+    return b"".join([block async for block in storage.stream(key, start, end)])
+
+
+def test_s3_put_get_and_stat(storage):
+    asyncio.run(storage.put("resume/1/cv.pdf", b"resume", "application/pdf"))
+
+    assert asyncio.run(storage.get("resume/1/cv.pdf")) == b"resume"
+    info = asyncio.run(storage.stat("resume/1/cv.pdf"))
+    assert info.size == 6 and info.etag
+    assert asyncio.run(storage.stat("resume/1/missing.pdf")) is None
+    assert not asyncio.run(storage.exists("resume/1/missing.pdf"))
+
+
+def test_s3_put_file_and_range(storage, tmp_path):
+    path = tmp_path / "chunk.webm"
+    path.write_bytes(b"0123456789")
+    asyncio.run(storage.put_file("interview_video/1/chunks/000000.webm", str(path)))
+
+    key = "interview_video/1/chunks/000000.webm"
+    assert asyncio.run(_read(storage, key)) == b"0123456789"
+    assert asyncio.run(_read(storage, key, 2, 5)) == b"2345"
+    assert asyncio.run(_read(storage, key, 7)) == b"789"
+
+
+def test_s3_list_and_delete(storage):
+    for key in ("screenshot/1/a.png", "screenshot/1/b.png", "screenshot/1/x/c.png"):
+        asyncio.run(storage.put(key, b"png"))
+
+    assert sorted(asyncio.run(storage.list("screenshot/1"))) == [
+        "screenshot/1/a.png",
+        "screenshot/1/b.png",
+    ]
+    asyncio.run(storage.delete("screenshot/1/a.png"))
+    assert asyncio.run(storage.list("screenshot/1/")) == ["screenshot/1/b.png"]
+    asyncio.run(storage.delete_prefix("screenshot/1"))
+    assert not asyncio.run(storage.exists("screenshot/1/x/c.png"))
+
+
+def test_s3_move_prefix_archives(storage):
+    asyncio.run(storage.put("report/1/a.pdf", b"a"))
+    asyncio.run(storage.put("report/1/b/c.pdf", b"c"))
+    asyncio.run(storage.put("report/10/d.pdf", b"d"))
+
+    asyncio.run(storage.move_prefix("report/1", "archive/report/1"))
+
+    assert not asyncio.run(storage.exists("report/1/a.pdf"))
+    assert asyncio.run(storage.get("archive/report/1/b/c.pdf")) == b"c"
+    assert asyncio.run(storage.exists("report/10/d.pdf"))
+    head = storage._client.head_object(Bucket="media", Key="archive/report/1/a.pdf")
+    assert head["StorageClass"] == "STANDARD_IA"
+    # Moving what is not there does nothing.
+    asyncio.run(storage.move("report/1/a.pdf", "archive/report/1/a.pdf"))
+
+
+def test_s3_presign(storage):
+    asyncio.run(storage.put("image/quiz/q.png", b"png"))
+
+    url = asyncio.run(storage.presign("image/quiz/q.png", 60))
+
+    assert url.startswith("https://media.s3.amazonaws.com/image/quiz/q.png?")
+    assert "response-cache-control=public%2C%20no-cache" in url
+
+
+def test_s3_candidate_files_are_not_cached_publicly(storage):
+    resume_key = "resume/1/" + "a" * 32 + ".pdf"
+    quiz_key = "image/quiz/" + "b" * 32 + ".png"
+    asyncio.run(storage.put(resume_key, b"resume", "application/pdf"))
+    asyncio.run(storage.put(quiz_key, b"png", "image/png"))
+
+    head = storage._client.head_object(Bucket="media", Key=resume_key)
+    assert head["CacheControl"] == "private, no-cache"
+    assert head["ContentType"] == "application/pdf"
+    head = storage._client.head_object(Bucket="media", Key=quiz_key)
+    assert head["CacheControl"] == "public, max-age=31536000, immutable"
+    url = asyncio.run(storage.presign(resume_key, 60))
+    assert "response-cache-control=private%2C%20no-cache" in url
+    assert "X-Amz-Signature=" in url and "X-Amz-Expires=60" in url
@@ -1,5 +1,5 @@
 import { config } from "@/config";
-import { interviewAPI } from "@/services/interviewApi";
+import { GeneratedQuestion, interviewAPI } from "@/services/interviewApi";
 import axios from "axios";
 import { useState } from "react";
 import { toast } from "sonner";
@@ -22,17 +22,12 @@ interface ProcessResponseParams {
 export function useInterviewResponseProcessor() {
   const [isProcessing, setIsProcessing] = useState(false);
 
-  const generateQuestion = async (): Promise<
-    | {
-        question: string;
-        type: string;
-      }[]
-    | null
-  > => {
+  const generateQuestion = async (
+    onQuestion?: (question: GeneratedQuestion) => void
+  ): Promise<GeneratedQuestion[] | null> => {
     try {
       setIsProcessing(true);
-      const response = await interviewAPI.generateQuestions();
-      return response.data;
+      return await interviewAPI.generateQuestions(onQuestion);
     } catch (error) {
       console.error("Error generating question:", error);
       toast.error("Failed to generate question");
@@ -116,6 +116,38 @@ const InterviewDetail = () => {
   });
   const playerRef = React.useRef(null);
   const [interviews, setInterviews] = useState<InterviewData[]>([]);
+  const [loadingScreenshots, setLoadingScreenshots] = useState(false);
+
+  const loadMoreScreenshots = async () => {
+    if (!id || !interview) return;
+    setLoadingScreenshots(true);
+    try {
+      const res = await interviewAPI.getScreenshots(
+        id,
+        interview.screenshot_urls?.length || 0
+      );
+      setInterview((current) =>
+        current
+          ? {
+              ...current,
+              screenshots: [
+                ...(current.screenshots || []),
+                ...res.data.screenshots,
+              ],
+              screenshot_urls: [
+                ...(current.screenshot_urls || []),
+                ...res.data.screenshots.map((s: { url: string }) => s.url),
+              ],
+              screenshot_count: res.data.count,
+            }
+          : current
+      );
+    } catch (error) {
+      toast.error("Failed to load screenshots");
+    } finally {
+      setLoadingScreenshots(false);
+    }
+  };
 
   useEffect(() => {
     const fetchInterview = async () => {
@@ -741,7 +773,11 @@ const InterviewDetail = () => {
                 <div className="text-center p-10">
                   <Video className="h-12 w-12 mx-auto mb-4 text-muted-foreground" />
                   <p className="text-muted-foreground">
-                    No recordings available
+                    {interview.video_status === "queued" ||
+                    interview.video_status === "running" ||
+                    interview.video_status === "live"
+                      ? "Recording is being processed"
+                      : "No recordings available"}
                   </p>
                 </div>
               )}
@@ -791,22 +827,23 @@ const InterviewDetail = () => {
                 <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-4">
                   {interview.screenshot_urls.map(
                     (url: string, index: number) => {
-                      // Clean up the URL by removing any 'None' segments and ensuring proper path
-                      const cleanUrl = url
-                        .replace(/\/None\//g, "/")
-                        .replace(/\/+/g, "/");
-                      // Extract just the filename from the URL
-                      const filename = cleanUrl.split("/").pop();
-                      // Construct the full URL using the API base URL, ensuring no double /api
+                      // Rebuild the URL on the API base URL, so a missing URL
+                      // setting on the server ('None/...') does not matter
                       const baseUrl =
                         import.meta.env.VITE_API_BASE_URL ||
                         "http://localhost:8000";
-                      const imageUrl = `${baseUrl}/uploads/screenshot/${interview.id}/${filename}`;
+                      const mediaUrl = (u: string) =>
+                        `${baseUrl}/uploads/${u.split("/uploads/").pop()}`;
+                      const imageUrl = mediaUrl(url);
+                      const thumbnailUrl = mediaUrl(
+                        interview.screenshots?.[index]?.thumbnail_url || url
+                      );
 
                       return (
                         <div key={index} className="relative group">
                           <img
-                            src={imageUrl}
+                            src={thumbnailUrl}
+                            loading="lazy"
                             alt={`Interview screenshot ${index + 1}`}
                             className="w-full h-48 object-cover rounded-lg"
                             onError={(e) => {
@@ -829,6 +866,18 @@ const InterviewDetail = () => {
                       );
                     }
                   )}
+                  {(interview.screenshot_count || 0) >
+                    interview.screenshot_urls.length && (
+                    <div className="col-span-full text-center">
+                      <Button
+                        variant="outline"
+                        onClick={loadMoreScreenshots}
+                        disabled={loadingScreenshots}
+                      >
+                        {loadingScreenshots ? "Loading..." : "Load more"}
+                      </Button>
+                    </div>
+                  )}
                 </div>
               ) : (
                 <div className="text-center p-10">
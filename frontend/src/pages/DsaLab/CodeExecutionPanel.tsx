@@ -114,6 +114,7 @@ function CodeExecutionPanel({
                     language: selectedLanguage,
                     code: currentCode,
                     question_id: questionId,
+                    mode: "run",
                   }),
                 });
 
@@ -89,6 +89,11 @@ const DSAPlayground = () => {
     socket.onmessage = (e) => {
       const data = JSON.parse(e.data);
 
+      if (data.event == "ping") {
+        socket.send(JSON.stringify({ event: "pong" }));
+        return;
+      }
+
       if (data.event == "execution_result") {
         if (data.status == "successful") {
           console.log("Total Test Cases Passed: ", data.passed_count);
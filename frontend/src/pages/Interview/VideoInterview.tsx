@@ -39,7 +39,7 @@ import {
 import { Textarea } from "@/components/ui/textarea";
 import html2canvas from "html2canvas";
 import { RecruiterData } from "@/types/recruiter";
-import { interviewAPI } from "@/services/interviewApi";
+import { GeneratedQuestion, interviewAPI } from "@/services/interviewApi";
 import { config } from "@/config";
 import axios from "axios";
 
@@ -191,6 +191,9 @@ export default function VideoInterview() {
     useState(false);
   const fullInterviewRecorderRef = useRef<MediaRecorder | null>(null);
   const fullInterviewChunksRef = useRef<Blob[]>([]);
+  // Whether every question has arrived from the question stream
+  const questionsCompleteRef = useRef(false);
+  const fullInterviewSeqRef = useRef(0);
   const [isConvertingVideo, setIsConvertingVideo] = useState(false);
   const [isFullscreen, setIsFullscreen] = useState(false);
   const videoContainerRef = useRef<HTMLDivElement>(null);
@@ -715,6 +718,13 @@ export default function VideoInterview() {
   };
 
   const handleNextQuestion = () => {
+    if (
+      currentQuestionIndex >= interviewFlow.length - 1 &&
+      !questionsCompleteRef.current
+    ) {
+      toast.info("Preparing the next question, please try again in a moment");
+      return;
+    }
     if (currentQuestionIndex < interviewFlow.length - 1) {
       const nextIndex = currentQuestionIndex + 1;
       setCurrentQuestionIndex(nextIndex);
@@ -766,28 +776,25 @@ export default function VideoInterview() {
   const startInterview = async () => {
     setIsInterviewActive(true);
     setIsPreparing(true);
-
-    try {
-      const questions = await generateQuestion();
-
-      if (!questions || questions.length === 0) {
-        throw new Error("Failed to generate questions");
-      }
-
-      const interviewFlow = questions;
-      setCurrentQuestion(interviewFlow[0].question);
-      setConversationHistory([
-        { role: "assistant", content: interviewFlow[0].question },
-      ]);
-      setInterviewFlow(interviewFlow);
-
-      // Show AI preparation animation
+    setInterviewFlow([]);
+    questionsCompleteRef.current = false;
+    let devicesReady: Promise<unknown> | null = null;
+
+    // The first question is asked as soon as it arrives, the rest are
+    // queued while the candidate answers it.
+    const receiveQuestion = (question: GeneratedQuestion) => {
+      const item = { question: question.question, type: question.question_type };
+      setInterviewFlow((prev) => [...prev, item]);
+      if (question.order_number !== 0) return;
+
+      setCurrentQuestion(item.question);
+      setConversationHistory([{ role: "assistant", content: item.question }]);
       setIsPreparing(false);
       setIsAiTyping(true);
-      addAssistantMessage(interviewFlow[0].question);
+      addAssistantMessage(item.question);
 
       // Initialize camera and microphone
-      await initializeDevices();
+      devicesReady = initializeDevices();
 
       // Request fullscreen when interview starts
       const element = document.documentElement;
@@ -802,6 +809,16 @@ export default function VideoInterview() {
       } else if ((element as any).msRequestFullscreen) {
         (element as any).msRequestFullscreen();
       }
+    };
+
+    try {
+      const questions = await generateQuestion(receiveQuestion);
+
+      if (!questions || questions.length === 0) {
+        throw new Error("Failed to generate questions");
+      }
+      questionsCompleteRef.current = true;
+      await devicesReady;
     } catch (error) {
       console.error("Error starting interview:", error);
       toast.error("Failed to start interview");
@@ -1025,24 +1042,24 @@ export default function VideoInterview() {
 
       fullInterviewRecorder.ondataavailable = async (e) => {
         if (e.data.size > 0) {
-          // Send the video to the backend
-          try {
-            console.log("Starting video upload...");
-            const startTime = performance.now();
-
-            // First send the video data
-            await axios.post(
-              `${config.API_BASE_URL}/interview/record`,
-              await e.data.arrayBuffer(),
-              {
+          // Number chunks before any await so they keep recording order
+          const seq = fullInterviewSeqRef.current++;
+          const data = await e.data.arrayBuffer();
+          // Send the video to the backend, retrying once; the backend drops
+          // chunks it has already stored
+          for (let attempt = 0; attempt < 2; attempt++) {
+            try {
+              await axios.post(`${config.API_BASE_URL}/interview/record`, data, {
+                params: { seq },
                 headers: {
-                  "Content-Type": "multipart/form-data",
+                  "Content-Type": "application/octet-stream",
                   Authorization: `Bearer ${localStorage.getItem("i_token")}`,
                 },
-              }
-            );
-          } catch (error) {
-            console.error("Failed to upload interview clip:", error);
+              });
+              break;
+            } catch (error) {
+              console.error("Failed to upload interview clip:", error);
+            }
           }
         }
       };
@@ -1054,7 +1071,7 @@ export default function VideoInterview() {
 
           // Then send finished=true to trigger HLS conversion
           await axios.post(`${config.API_BASE_URL}/interview/record`, null, {
-            params: { finished: "true" },
+            params: { finished: "true", chunks: fullInterviewSeqRef.current },
             headers: {
               Authorization: `Bearer ${localStorage.getItem("i_token")}`,
             },
@@ -2,6 +2,14 @@ import axios from "axios";
 import { GetInterviewsParams, InterviewData } from "@/types/interview";
 import { config } from "@/config";
 
+export interface GeneratedQuestion {
+  question: string;
+  question_type: string;
+  order_number: number;
+  answer: string | null;
+  interview_id: number;
+}
+
 export const interviewAPI = {
   createInterview: async (data: InterviewData, jobId: number) => {
     const token = localStorage.getItem("token");
@@ -41,6 +49,17 @@ export const interviewAPI = {
     return response;
   },
 
+  getScreenshots: async (id: string, offset: number, limit: number = 24) => {
+    const response = await axios.get(
+      `${config.API_BASE_URL}/interview/screenshots`,
+      {
+        params: { id, offset, limit },
+        headers: { Authorization: `Bearer ${localStorage.getItem("token")}` },
+      }
+    );
+    return response;
+  },
+
   candidateGetInterview: async () => {
     const iToken = localStorage.getItem("i_token");
     const res = await axios.get(`${config.API_BASE_URL}/interview`, {
@@ -185,16 +204,54 @@ export const interviewAPI = {
     return res.data;
   },
 
-  generateQuestions: async () => {
+  // Questions arrive as server-sent events while they are generated.
+  // Resolves with all of them once the server reports it is done.
+  generateQuestions: async (
+    onQuestion?: (question: GeneratedQuestion) => void
+  ): Promise<GeneratedQuestion[]> => {
     const iToken = localStorage.getItem("i_token");
-    const res = await axios.post(
-      `${config.API_BASE_URL}/interview-question-and-response/generate-questions`,
-      undefined,
+    const res = await fetch(
+      `${config.API_BASE_URL}/interview-question-and-response/generate-questions/stream`,
       {
+        method: "POST",
         headers: { Authorization: `Bearer ${iToken}` },
       }
     );
-    return res;
+    if (!res.ok || !res.body) {
+      throw new Error(`Failed to generate questions (${res.status})`);
+    }
+
+    const questions: GeneratedQuestion[] = [];
+    const reader = res.body.pipeThrough(new TextDecoderStream()).getReader();
+    let buffer = "";
+    while (true) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffer += value;
+
+      let boundary: number;
+      while ((boundary = buffer.indexOf("\n\n")) !== -1) {
+        const message = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary + 2);
+        let event = "message";
+        let data = "";
+        for (const line of message.split("\n")) {
+          if (line.startsWith("event: ")) event = line.slice(7);
+          else if (line.startsWith("data: ")) data += line.slice(6);
+        }
+
+        if (event === "question") {
+          const question: GeneratedQuestion = JSON.parse(data);
+          questions.push(question);
+          onQuestion?.(question);
+        } else if (event === "done") {
+          return questions;
+        } else if (event === "error") {
+          throw new Error(JSON.parse(data).detail);
+        }
+      }
+    }
+    throw new Error("Question stream ended before all questions arrived");
   },
 
   getInterviewQuestionsAndResponses: async (interviewId: string) => {
@@ -24,7 +24,16 @@ export interface InterviewData {
   created_at?: string;
   job_id?: number;
   video_url?: string;
+  video_status?: "queued" | "running" | "live" | "done" | "failed" | null;
+  screenshots?: {
+    id: number;
+    taken_at: string;
+    size: number;
+    url: string;
+    thumbnail_url: string;
+  }[];
   screenshot_urls?: string[];
+  screenshot_count?: number;
   report_file_url?: string;
 }
 